@@ -1,9 +1,10 @@
-from .Docker import Docker, DockerCompilerFileTemplates
+from .Docker import Docker
 from seedemu.core import Emulator, ScopedRegistry, Node, Network
-from seedemu.core.enums import NodeRole
-from typing import Dict
+from seedemu.core.enums import NodeRole, LogLevel
+from typing import Dict, List
 from hashlib import md5
-from os import mkdir, chdir, rmdir
+from os import mkdir, rmdir, getcwd
+from os.path import join
 
 DistributedDockerCompilerFileTemplates: Dict[str, str] = {}
 
@@ -38,15 +39,19 @@ class DistributedDocker(Docker):
     This works by making every IX network overlay network. 
     """
 
-    def __init__(self, namingScheme: str = "as{asn}{role}-{name}-{primaryIp}"):
+    def __init__(self, namingScheme: str = "as{asn}{role}-{name}-{primaryIp}", workers: int = 1, workerProcesses: bool = False):
         """!
         @brief DistributedDocker compiler constructor.
 
         @param namingScheme (optional) node naming scheme. Avaliable variables
         are: {asn}, {role} (r - router, h - host, rs - route server), {name},
         {primaryIp}
+        @param workers (optional) number of workers used to compile nodes.
+        Default to 1.
+        @param workerProcesses (optional) use worker processes instead of
+        worker threads. Default to False.
         """
-        super().__init__(namingScheme)
+        super().__init__(namingScheme, workers = workers, workerProcesses = workerProcesses)
 
     def getName(self) -> str:
         return 'DistributedDocker'
@@ -68,57 +73,61 @@ class DistributedDocker(Docker):
 
     def _doCompile(self, emulator: Emulator):
         registry = emulator.getRegistry()
-        scopes = set()
-        for (scope, _, _) in registry.getAll().keys(): scopes.add(scope)
+        scopes = registry.getScopes()
 
         ix_nets = ''
 
         for ixnet in ScopedRegistry('ix', registry).getByType('net'):
             ix_nets += self.__compileIxNetWorker(ixnet)
 
-        for scope in scopes:
-            mkdir(scope)
-            chdir(scope)
+        root = getcwd()
+        self._setFileStore(root)
 
-            services = ''
-            networks = ''
+        for scope in scopes:
+            scope_dir = join(root, scope)
+            mkdir(scope_dir)
 
-            for ((_scope, type, name), obj) in registry.getAll().items():
-                if _scope != scope: continue
+            nodes: List[Node] = []
+            networks = self._openComposeSection()
+            services = self._openComposeSection()
 
+            for ((_scope, type, name), obj) in registry.iterByType({'rnode', 'hnode', 'rs', 'snode', 'net'}, scope):
                 if type == 'rnode':
-                    self._log('compiling router node {} for as{}...'.format(name, scope))
-                    services += self._compileNode(obj)
+                    self._log('compiling router node {} for as{}...', name, scope, level = LogLevel.Debug)
+                    nodes.append(obj)
 
                 if type == 'hnode':
-                    self._log('compiling host node {} for as{}...'.format(name, scope))
-                    services += self._compileNode(obj)
+                    self._log('compiling host node {} for as{}...', name, scope, level = LogLevel.Debug)
+                    nodes.append(obj)
 
                 if type == 'rs':
-                    self._log('compiling rs node for {}...'.format(name))
-                    services += self._compileNode(obj)
+                    self._log('compiling rs node for {}...', name, level = LogLevel.Debug)
+                    nodes.append(obj)
 
                 if type == 'snode':
-                    self._log('compiling service node {}...'.format(name))
-                    services += self._compileNode(obj)
+                    self._log('compiling service node {}...', name, level = LogLevel.Debug)
+                    nodes.append(obj)
 
                 if type == 'net':
-                    self._log('creating network: {}/{}...'.format(scope, name))
-                    networks += self.__compileIxNetMaster(obj) if scope == 'ix' else self._compileNet(obj)
-
-            if len(services) > 0 or len(networks) > 0 :
-                if scope != 'ix': networks += ix_nets
-                self._log('creating docker-compose.yml...'.format(scope, name))
-                print(DockerCompilerFileTemplates['compose'].format(
-                    services = services,
-                    networks = networks,
-                    dummies = self._makeDummies()
-                ), file=open('docker-compose.yml', 'w'))
+                    self._log('creating network: {}/{}...', scope, name, level = LogLevel.Debug)
+                    networks.write(self.__compileIxNetMaster(obj) if scope == 'ix' else self._compileNet(obj))
+
+            for service in self._compileNodes(nodes, scope_dir): services.write(service)
+
+            empty = services.tell() == 0 and networks.tell() == 0
+
+            if not empty:
+                if scope != 'ix': networks.write(ix_nets)
+                self._log('creating docker-compose.yml...')
+                self._writeComposeFile(join(scope_dir, 'docker-compose.yml'), self._makeDummies(scope_dir), services, networks)
 
                 self._used_images = set()
+                self._used_layers = set()
 
-                print('COMPOSE_PROJECT_NAME=sim_{}'.format(scope), file=open('.env', 'w'))
+                with open(join(scope_dir, '.env'), 'w') as f:
+                    print('COMPOSE_PROJECT_NAME=sim_{}'.format(scope), file=f)
 
-            chdir('..')
+            services.close()
+            networks.close()
 
-            if services == '' and networks == '': rmdir(scope)
+            if empty: rmdir(scope_dir)
@@ -1,13 +1,19 @@
 from __future__ import annotations
 from seedemu.core.Emulator import Emulator
 from seedemu.core import Node, Network, Compiler
-from seedemu.core.enums import NodeRole, NetworkType
-from typing import Dict, Generator, List, Set, Tuple
-from hashlib import md5
-from os import mkdir, chdir
-from re import sub
+from seedemu.core.enums import NodeRole, NetworkType, LogLevel
+from typing import Callable, Deque, Dict, FrozenSet, Generator, Iterable, Iterator, List, Set, TextIO, Tuple
+from hashlib import md5, sha256
+from os import mkdir, getcwd, link, replace, chmod
+from os.path import join, exists, dirname, samefile
+from uuid import uuid4
+from re import sub, match
 from ipaddress import IPv4Network, IPv4Address
-from shutil import copyfile
+from shutil import copyfile, copyfileobj
+from tempfile import SpooledTemporaryFile
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+from collections import deque
+from multiprocessing import get_context
 import json
 
 SEEDEMU_CLIENT_IMAGE = 'handsonsecurity/seedemu-map'
@@ -93,13 +99,92 @@ ip -j addr | jq -cr '.[]' | while read -r iface; do {
 }; done
 '''
 
-DockerCompilerFileTemplates['compose'] = """\
+DockerCompilerFileTemplates['compose_header'] = """\
 version: "3.4"
 services:
-{dummies}
-{services}
+"""
+
+DockerCompilerFileTemplates['compose_networks_header'] = """\
+
 networks:
-{networks}
+"""
+
+DockerCompilerFileTemplates['compose_network_external'] = """\
+    {netId}:
+        external:
+            name: {projectName}_{netId}
+"""
+
+DockerCompilerFileTemplates['shard_env'] = """\
+COMPOSE_PROJECT_NAME={projectName}
+"""
+
+DockerCompilerFileTemplates['shard_network_create'] = """\
+    docker network inspect {projectName}_{netId} > /dev/null 2>&1 || docker network create \\
+        --subnet {prefix} \\
+        --opt com.docker.network.driver.mtu={mtu}{labelList} \\
+        {projectName}_{netId} > /dev/null
+"""
+
+DockerCompilerFileTemplates['shard_network_label'] = ' \\\n        --label "org.seedsecuritylabs.seedemu.meta.{key}={value}"'
+
+DockerCompilerFileTemplates['shard_network_remove'] = """\
+    docker network rm {projectName}_{netId} > /dev/null 2>&1 || true
+"""
+
+DockerCompilerFileTemplates['shard_launcher'] = """\
+#!/bin/bash
+# create the networks and start the base project (base images) first, then the
+# shards, with up to the given number of shards brought up/down/built at once.
+#
+# usage: ./{launcherName} [up|down|build] [concurrency]
+
+set -e
+cd "`dirname "$0"`"
+
+action="${{1:-up}}"
+concurrency="${{2:-{concurrency}}}"
+shards=({shardList})
+
+if [ "${{#shards[@]}}" -eq 0 ]; then
+    echo "no shards to start." >&2
+    exit 1
+fi
+
+# networks are shared by all shards, so they are created here, not by compose.
+create_networks() {{
+    :
+{networkCreate}}}
+
+remove_networks() {{
+    :
+{networkRemove}}}
+
+each_shard() {{
+    printf '%s\\n' "${{shards[@]}}" | xargs -P "$concurrency" -I % docker-compose -p "{projectName}_%" -f "docker-compose.%.yml" "$@"
+}}
+
+case "$action" in
+    up)
+        create_networks
+        docker-compose -p {projectName} build
+        docker-compose -p {projectName} up -d
+        each_shard up -d
+        ;;
+    down)
+        each_shard down
+        docker-compose -p {projectName} down
+        remove_networks
+        ;;
+    build)
+        docker-compose -p {projectName} build
+        each_shard build
+        ;;
+    *)
+        echo "usage: $0 [up|down|build] [concurrency]" >&2
+        exit 1
+        ;;
+esac
 """
 
 DockerCompilerFileTemplates['compose_dummy'] = """\
@@ -108,6 +193,15 @@ DockerCompilerFileTemplates['compose_dummy'] = """\
             context: .
             dockerfile: dummies/{imageDigest}
         image: {imageDigest}
+{dependsOn}"""
+
+DockerCompilerFileTemplates['compose_depends_on'] = """\
+        depends_on:
+            - {service}
+"""
+
+DockerCompilerFileTemplates['base_layer_tier'] = """\
+RUN apt-get update && apt-get install -y --no-install-recommends {softList}
 """
 
 DockerCompilerFileTemplates['compose_service'] = """\
@@ -122,7 +216,7 @@ DockerCompilerFileTemplates['compose_service'] = """\
             - net.ipv4.conf.all.rp_filter=0
         privileged: true
         networks:
-{networks}{ports}{volumes}
+{networks}{ports}{volumes}{dependsOn}
         labels:
 {labelList}
 """
@@ -325,6 +419,34 @@ DefaultImages: List[DockerImage] = []
 DefaultImages.append(DockerImage('ubuntu:20.04', []))
 
 
+## size above which compose file sections are buffered on disk instead of in
+## memory while the compose file is being built.
+COMPOSE_SPOOL_SIZE = 4 * 1024 * 1024
+
+## number of compile jobs submitted to the worker pool per worker and not yet
+## consumed. Bounds memory used by results that are ready out of order.
+COMPILE_JOBS_PER_WORKER = 4
+
+## number of nodes in one compile job of a worker process.
+COMPILE_PROCESS_CHUNK_SIZE = 16
+
+## compile job shared with forked worker processes, see Docker._compileNodes.
+_worker_job: Tuple[Docker, List[Node], str] = None
+
+def _compileNodesInWorker(start: int) -> List[Tuple[str, Tuple[str, Tuple[Tuple[str, ...], ...]]]]:
+    """!
+    @brief compile a chunk of nodes of the current compile job in a worker
+    process.
+
+    @param start index of the first node of the chunk in the job.
+
+    @returns list of tuples of docker-compose service string and base layer
+    used.
+    """
+    (compiler, nodes, outputDir) = _worker_job
+
+    return [compiler._compileNodeInto(node, outputDir) for node in nodes[start:start + COMPILE_PROCESS_CHUNK_SIZE]]
+
 class Docker(Compiler):
     """!
     @brief The Docker compiler class.
@@ -333,8 +455,6 @@ class Docker(Compiler):
     containers.
     """
 
-    __services: str
-    __networks: str
     __naming_scheme: str
     __self_managed_network: bool
     __dummy_network_pool: Generator[IPv4Network, None, None]
@@ -349,6 +469,18 @@ class Docker(Compiler):
     __disable_images: bool
     __image_per_node_list: Dict[Tuple[str, str], DockerImage]
     _used_images: Set[str]
+    _used_layers: Set[Tuple[str, Tuple[Tuple[str, ...], ...]]]
+
+    __workers: int
+    __worker_processes: bool
+    __file_store: str
+    __shared_files: bool = True
+    __dummy_addresses: Dict[Tuple[str, str, str], Tuple[List[IPv4Address], str]]
+
+    __shard_ases: int
+    __shard_services: int
+    __shard_concurrency: int
+    __shard_project: str
 
     def __init__(
             self,
@@ -358,7 +490,10 @@ class Docker(Compiler):
             dummyNetworksMask: int = 24,
             clientEnabled: bool = False,
             clientPort: int = 8080,
-            clientHideServiceNet: bool = True
+            clientHideServiceNet: bool = True,
+            workers: int = 1,
+            workerProcesses: bool = False,
+            sharedFiles: bool = True
     ):
         """!
         @brief Docker compiler constructor.
@@ -388,9 +523,19 @@ class Docker(Compiler):
         @param clientPort (optional) set seedemu client port. Default to 8080.
         @param clientHideServiceNet (optional) hide service network for the
         client map by not adding metadata on the net. Default to True.
+        @param workers (optional) number of workers used to compile nodes.
+        Nodes are compiled one by one when set to 1. Default to 1.
+        @param workerProcesses (optional) use worker processes instead of
+        worker threads. Processes avoid the GIL but require fork(), so this
+        is only available on POSIX systems. Default to False.
+        @param sharedFiles (optional) keep identical files of different nodes
+        once, in a shared store, and hard-link them into node folders. Files in
+        node folders must then be replaced, not edited in place, or the change
+        shows up in every node that shares the file. Set to False to give each
+        node its own copy of every file. Default to True.
         """
-        self.__networks = ""
-        self.__services = ""
+        assert workers >= 1, 'invalid number of workers: {}.'.format(workers)
+
         self.__naming_scheme = namingScheme
         self.__self_managed_network = selfManagedNetwork
         self.__dummy_network_pool = IPv4Network(dummyNetworksPool).subnets(new_prefix=dummyNetworksMask)
@@ -404,8 +549,20 @@ class Docker(Compiler):
         self.__forced_image = None
         self.__disable_images = False
         self._used_images = set()
+        self._used_layers = set()
         self.__image_per_node_list = {}
 
+        self.__workers = workers
+        self.__worker_processes = workerProcesses
+        self.__dummy_addresses = {}
+        self.__file_store = None
+        self.__shared_files = sharedFiles
+
+        self.__shard_ases = 0
+        self.__shard_services = 0
+        self.__shard_concurrency = 4
+        self.__shard_project = 'seedemu'
+
         for image in DefaultImages:
             self.addImage(image)
 
@@ -480,70 +637,144 @@ class Docker(Compiler):
         name = node.getName()
         self.__image_per_node_list[(asn, name)] = imageName
 
+    def setSharding(self, asesPerShard: int = 0, servicesPerShard: int = 0, concurrency: int = 4, projectName: str = 'seedemu') -> Docker:
+        """!
+        @brief split the output into multiple compose projects.
+
+        docker-compose gets slow to parse and start a single compose file with
+        thousands of services. With sharding enabled, the nodes are written to
+        multiple compose files (docker-compose.shard<N>.yml), each started as
+        its own compose project. The base images and the seedemu client stay
+        in docker-compose.yml, which is the base project. Networks are shared
+        by all projects, so every compose file uses them as external networks.
+
+        A launcher script, shards.sh, is generated to create the networks and
+        bring the base project up first, then the shards, a few at a time.
+        The networks are removed again on down. Run "./shards.sh up",
+        "./shards.sh down" or "./shards.sh build", optionally followed by the
+        number of shards to process at once.
+
+        Set both asesPerShard and servicesPerShard to 0 to disable sharding.
+
+        @param asesPerShard (optional) put the nodes of this many autonomous
+        systems in each shard, in order of ASN. Other scopes (e.g., ix) count
+        as one AS each. Default to 0.
+        @param servicesPerShard (optional) put about this many nodes in each
+        shard. Nodes of the same scope are kept in the same shard unless the
+        scope alone has more nodes than this. Default to 0.
+        @param concurrency (optional) default number of shards the launcher
+        processes at once. Default to 4.
+        @param projectName (optional) compose project name of the base project.
+        Shards are named <projectName>_shard<N>. Default to seedemu.
+
+        @returns self, for chaining api calls.
+        """
+        assert asesPerShard >= 0 and servicesPerShard >= 0, 'invalid shard size.'
+        assert asesPerShard == 0 or servicesPerShard == 0, 'only one of asesPerShard and servicesPerShard can be set.'
+        assert concurrency >= 1, 'invalid concurrency: {}.'.format(concurrency)
+        assert match(r'^[a-z0-9][a-z0-9_-]*$', projectName), 'invalid project name: {}.'.format(projectName)
+
+        self.__shard_ases = asesPerShard
+        self.__shard_services = servicesPerShard
+        self.__shard_concurrency = concurrency
+        self.__shard_project = projectName
+
+        return self
+
+    def isSharded(self) -> bool:
+        """!
+        @brief test if the output is split into multiple compose projects.
+
+        @returns True if sharded.
+        """
+        return self.__shard_ases > 0 or self.__shard_services > 0
+
     def _groupSoftware(self, emulator: Emulator):
         """!
         @brief Group apt-get install calls to maximize docker cache.
 
+        Software used by the same number of nodes are installed together in
+        one tier, tiers with software used by more nodes first. The image
+        selected for each node is saved on the node too, so it does not need
+        to be selected again when the node is compiled.
+
         @param emulator emulator to load nodes from.
         """
 
         registry = emulator.getRegistry()
 
-        # { [imageName]: { [softName]: [nodeRef] } }
-        softGroups: Dict[str, Dict[str, List[Node]]] = {}
+        # { [imageName]: { [softName]: refCount } }
+        softCounts: Dict[str, Dict[str, int]] = {}
 
         # { [imageName]: useCount }
         groupIter: Dict[str, int] = {}
 
-        for ((scope, type, name), obj) in registry.getAll().items():
-            if type != 'rnode' and type != 'hnode' and type != 'snode' and type != 'rs' and type != 'snode':
-                continue
+        # { [software]: (image, missingSoftware) }, image selection only
+        # depends on the software of the node, unless image-per-node is set.
+        selections: Dict[FrozenSet[str], Tuple[DockerImage, Set[str]]] = {}
 
+        nodes: List[Tuple[Node, str]] = []
+
+        for ((scope, type, name), obj) in registry.iterNodes():
             node: Node = obj
+            nodeSoft = node.getSoftware()
+
+            if (node.getAsn(), node.getName()) in self.__image_per_node_list:
+                selection = self._selectImageFor(node)
+            else:
+                key = frozenset(nodeSoft)
+                if key not in selections: selections[key] = self._selectImageFor(node)
+                selection = selections[key]
+
+            node.setAttribute('__docker_image', selection)
+
+            imgName = selection[0].getName()
+            groupIter[imgName] = groupIter.get(imgName, 0) + 1
+
+            counts = softCounts.setdefault(imgName, {})
+            for soft in nodeSoft: counts[soft] = counts.get(soft, 0) + 1
 
-            (img, _) = self._selectImageFor(node)
-            imgName = img.getName()
+            nodes.append((node, imgName))
 
-            if not imgName in groupIter:
-                groupIter[imgName] = 0
+        # { [imageName]: { [refCount]: tier } }
+        tiers: Dict[str, Dict[int, Set[str]]] = {}
 
-            groupIter[imgName] += 1
+        # { [imageName]: { [refCount]: nodeCount } }
+        tierNodes: Dict[str, Dict[int, int]] = {}
 
-            if not imgName in softGroups:
-                softGroups[imgName] = {}
+        for (imgName, counts) in softCounts.items():
+            buckets = tiers[imgName] = {}
+            for (soft, count) in counts.items(): buckets.setdefault(count, set()).add(soft)
+            tierNodes[imgName] = {}
 
-            group = softGroups[imgName]
+        for (node, imgName) in nodes:
+            counts = softCounts[imgName]
+            levels = sorted(set(counts[soft] for soft in node.getSoftware()), reverse = True)
 
-            for soft in node.getSoftware():
-                if soft not in group:
-                    group[soft] = []
-                group[soft].append(node)
+            for level in levels: tierNodes[imgName][level] = tierNodes[imgName].get(level, 0) + 1
 
-        for (key, val) in softGroups.items():
-            maxIter = groupIter[key]
-            self._log('grouping software for image "{}" - {} references.'.format(key, maxIter))
-            step = 1
+            node.setAttribute('__soft_install_tiers', [tiers[imgName][level] for level in levels])
 
-            for commRequired in range(maxIter, 0, -1):
-                currentTier: Set[str] = set()
-                currentTierNodes: Set[Node] = set()
+        for (imgName, buckets) in tiers.items():
+            self._log('grouping software for image "{}" - {} references.', imgName, groupIter[imgName])
 
-                for (soft, nodes) in val.items():
-                    if len(nodes) == commRequired:
-                        currentTier.add(soft)
-                        for node in nodes: currentTierNodes.add(node)
+            for (step, level) in enumerate(sorted(buckets.keys(), reverse = True), start = 1):
+                self._log(
+                    'the following software has been grouped together in step {}: {} since they are referenced by {} nodes.',
+                    step, buckets[level], tierNodes[imgName][level])
 
-                for node in currentTierNodes:
-                    if not node.hasAttribute('__soft_install_tiers'):
-                        node.setAttribute('__soft_install_tiers', [])
+    def _getImageFor(self, node: Node) -> Tuple[DockerImage, Set[str]]:
+        """!
+        @brief get image for the given node, as selected by _groupSoftware.
+        Falls back to selecting the image if the node was not grouped.
+
+        @param node node.
 
-                    node.getAttribute('__soft_install_tiers').append(currentTier)
+        @returns tuple of selected image and set of missinge software.
+        """
+        if node.hasAttribute('__docker_image'): return node.getAttribute('__docker_image')
 
-                if len(currentTier) > 0:
-                    self._log(
-                        'the following software has been grouped together in step {}: {} since they are referenced by {} nodes.'.format(
-                            step, currentTier, len(currentTierNodes)))
-                    step += 1
+        return self._selectImageFor(node)
 
     def _selectImageFor(self, node: Node) -> Tuple[DockerImage, Set[str]]:
         """!
@@ -564,11 +795,11 @@ class Docker(Compiler):
 
             (image, _) = self.__images[image_name]
 
-            self._log('image-per-node configured, using {}'.format(image.getName()))
+            self._log('image-per-node configured, using {}', image.getName(), level = LogLevel.Debug)
             return (image, nodeSoft - image.getSoftware())
 
         if self.__disable_images:
-            self._log('disable-imaged configured, using base image.')
+            self._log('disable-imaged configured, using base image.', level = LogLevel.Debug)
             (image, _) = self.__images['ubuntu:20.04']
             return (image, nodeSoft - image.getSoftware())
 
@@ -578,7 +809,7 @@ class Docker(Compiler):
 
             (image, _) = self.__images[self.__forced_image]
 
-            self._log('force-image configured, using image: {}'.format(image.getName()))
+            self._log('force-image configured, using image: {}', image.getName(), level = LogLevel.Debug)
 
             return (image, nodeSoft - image.getSoftware())
 
@@ -605,11 +836,13 @@ class Docker(Compiler):
 
         return (selected, nodeSoft - selected.getSoftware())
 
-    def _getNetMeta(self, net: Network) -> str:
+    def _getNetMeta(self, net: Network, template: str = 'compose_label_meta') -> str:
         """!
         @brief get net metadata lables.
 
         @param net net object.
+        @param template (optional) name of the label template. Default to
+        compose_label_meta.
 
         @returns metadata lables string.
         """
@@ -619,39 +852,39 @@ class Docker(Compiler):
         labels = ''
 
         if self.__client_hide_svcnet and scope == 'seedemu' and name == '000_svc':
-            return DockerCompilerFileTemplates['compose_label_meta'].format(
+            return DockerCompilerFileTemplates[template].format(
                 key='dummy',
                 value='dummy label for hidden node/net'
             )
 
-        labels += DockerCompilerFileTemplates['compose_label_meta'].format(
+        labels += DockerCompilerFileTemplates[template].format(
             key='type',
             value='global' if scope == 'ix' else 'local'
         )
 
-        labels += DockerCompilerFileTemplates['compose_label_meta'].format(
+        labels += DockerCompilerFileTemplates[template].format(
             key='scope',
             value=scope
         )
 
-        labels += DockerCompilerFileTemplates['compose_label_meta'].format(
+        labels += DockerCompilerFileTemplates[template].format(
             key='name',
             value=name
         )
 
-        labels += DockerCompilerFileTemplates['compose_label_meta'].format(
+        labels += DockerCompilerFileTemplates[template].format(
             key='prefix',
             value=net.getPrefix()
         )
 
         if net.getDisplayName() != None:
-            labels += DockerCompilerFileTemplates['compose_label_meta'].format(
+            labels += DockerCompilerFileTemplates[template].format(
                 key='displayname',
                 value=net.getDisplayName()
             )
 
         if net.getDescription() != None:
-            labels += DockerCompilerFileTemplates['compose_label_meta'].format(
+            labels += DockerCompilerFileTemplates[template].format(
                 key='description',
                 value=net.getDescription()
             )
@@ -769,75 +1002,383 @@ class Docker(Compiler):
         """
         return '{}_{}_'.format(type, scope)
 
-    def _addFile(self, path: str, content: str) -> str:
+    def _getNetId(self, net: Network) -> str:
+        """!
+        @brief get the name of a network in the compose file.
+
+        @param net network.
+
+        @returns network name.
+        """
+        if net.getType() == NetworkType.Bridge: return net.getName()
+
+        (scope, _, _) = net.getRegistryInfo()
+
+        return '{}{}'.format(self._contextToPrefix(scope, 'net'), net.getName())
+
+    def _addFile(self, path: str, content: str, nodeDir: str = '.') -> str:
         """!
         @brief Stage file to local folder and return Dockerfile command.
 
         @param path path to file. (in container)
         @param content content of the file.
+        @param nodeDir (optional) folder of the node to stage the file in.
+        Default to the current working directory.
 
         @returns COPY expression for dockerfile.
         """
 
         staged_path = md5(path.encode('utf-8')).hexdigest()
-        print(content, file=open(staged_path, 'w'))
+        self._stageFile(join(nodeDir, staged_path), '{}\n'.format(content).encode('utf-8'))
         return 'COPY {} {}\n'.format(staged_path, path)
 
-    def _importFile(self, path: str, hostpath: str) -> str:
+    def _importFile(self, path: str, hostpath: str, nodeDir: str = '.') -> str:
         """!
         @brief Stage file to local folder and return Dockerfile command.
 
         @param path path to file. (in container)
         @param hostpath path to file. (on host)
+        @param nodeDir (optional) folder of the node to stage the file in.
+        Default to the current working directory.
 
         @returns COPY expression for dockerfile.
         """
 
         staged_path = md5(path.encode('utf-8')).hexdigest()
-        copyfile(hostpath, staged_path)
+
+        if self.__file_store == None: copyfile(hostpath, join(nodeDir, staged_path))
+        else:
+            with open(hostpath, 'rb') as f: self._stageFile(join(nodeDir, staged_path), f.read())
+
         return 'COPY {} {}\n'.format(staged_path, path)
 
-    def _compileNode(self, node: Node) -> str:
+    def _setFileStore(self, outputDir: str):
+        """!
+        @brief Create the shared file store.
+
+        Files staged for nodes are kept once in the store, named by the hash
+        of their content, and hard-linked into the folder of every node that
+        uses them. Identical files (start scripts, configuration fragments,
+        etc.) then take one inode in the output, no matter how many nodes use
+        them, while each node folder stays a self-contained build context.
+
+        Compile never writes to a file in a node folder in place. Files are
+        always created new, or replaced by rename, so the content of the store
+        is never changed through a node folder. See sharedFiles of the
+        constructor.
+
+        @param outputDir absolute path of the folder to create the store in.
+        Set to None to disable the store and write files to node folders
+        directly. Ignored, and the store disabled, if sharedFiles is False.
+        """
+        if outputDir == None or not self.__shared_files:
+            self.__file_store = None
+            return
+
+        self.__file_store = join(outputDir, 'files')
+        if not exists(self.__file_store): mkdir(self.__file_store)
+
+    def _stageFile(self, target: str, data: bytes):
+        """!
+        @brief Stage file content at the given path, through the shared file
+        store if one is set.
+
+        @param target path of the file to create.
+        @param data content of the file.
+        """
+        if self.__file_store == None:
+            with open(target, 'wb') as f: f.write(data)
+            return
+
+        stored = join(self.__file_store, sha256(data).hexdigest())
+
+        if not exists(stored):
+            # write to a temporary file and rename, so workers staging the
+            # same content at the same time never see a partial file.
+            tmp = '{}.{}'.format(stored, uuid4().hex)
+            with open(tmp, 'wb') as f: f.write(data)
+            replace(tmp, stored)
+
+        self.__linkFile(stored, target)
+
+    def __linkFile(self, stored: str, target: str):
+        """!
+        @brief Hard-link a file of the store to the given path, replacing what
+        is there by rename.
+
+        @param stored path of the file in the store.
+        @param target path to link the file to.
+        """
+        tmp = '{}.{}'.format(target, uuid4().hex)
+
+        try:
+            link(stored, tmp)
+        except OSError:
+            # no hard link support (e.g., some network filesystems.)
+            copyfile(stored, tmp)
+
+        replace(tmp, target)
+
+    def _mergeFile(self, source: str, target: str, output: str):
+        """!
+        @brief Move a new or changed file from the staging folder to the
+        output folder, during an incremental compile.
+
+        Files staged through the shared file store are linked from the store
+        of the output folder instead, so they keep sharing one inode with the
+        same file of other nodes, and with the store.
+
+        @param source path of the file in the staging folder.
+        @param target path of the file in the output folder.
+        @param output output folder.
+        """
+        if self.__file_store == None or samefile(dirname(source), self.__file_store):
+            replace(source, target)
+            return
+
+        with open(source, 'rb') as f: digest = sha256(f.read()).hexdigest()
+
+        stored = join(self.__file_store, digest)
+
+        if not exists(stored) or not samefile(source, stored):
+            replace(source, target)
+            return
+
+        store = join(output, 'files')
+        if not exists(store): mkdir(store)
+
+        if not exists(join(store, digest)): self.__linkFile(stored, join(store, digest))
+
+        self.__linkFile(join(store, digest), target)
+
+    def _assignDummyAddresses(self, node: Node):
+        """!
+        @brief Pick self-managed network dummy addresses for the interfaces of a
+        node.
+
+        Addresses are handed out in the order nodes are passed in, so this is
+        always done serially, before the nodes are compiled.
+
+        @param node node.
+        """
+        if not self.__self_managed_network: return
+
+        key = node.getRegistryInfo()
+        if key in self.__dummy_addresses: return
+
+        addresses: List[IPv4Address] = []
+        dummy_addr_map = ''
+
+        for iface in node.getInterfaces():
+            net = iface.getNet()
+
+            if net.getType() == NetworkType.Bridge:
+                addresses.append(None)
+                continue
+
+            d_index: int = net.getAttribute('dummy_prefix_index')
+            d_prefix: IPv4Network = net.getAttribute('dummy_prefix')
+            d_address: IPv4Address = d_prefix[d_index]
+
+            net.setAttribute('dummy_prefix_index', d_index + 1)
+
+            dummy_addr_map += '{}/{},{}/{}\n'.format(
+                d_address, d_prefix.prefixlen,
+                iface.getAddress(), iface.getNet().getPrefix().prefixlen
+            )
+
+            addresses.append(d_address)
+
+            self._log('using self-managed network: using dummy address {}/{} for {}/{} on as{}/{}',
+                d_address, d_prefix.prefixlen, iface.getAddress(), iface.getNet().getPrefix().prefixlen,
+                node.getAsn(), node.getName(), level = LogLevel.Debug
+            )
+
+        self.__dummy_addresses[key] = (addresses, dummy_addr_map)
+
+    def _compileNode(self, node: Node, outputDir: str = None) -> str:
         """!
         @brief Compile a single node. Will create folder for node and the
         dockerfile.
 
         @param node node to compile.
+        @param outputDir (optional) absolute path of the folder to create the
+        node folder in. Default to the current working directory.
 
         @returns docker-compose service string.
         """
+        self._assignDummyAddresses(node)
+
+        (service, layer) = self._compileNodeInto(node, outputDir if outputDir != None else getcwd())
+        self._useLayer(layer)
+
+        return service
+
+    def _compileNodes(self, nodes: List[Node], outputDir: str) -> Iterator[str]:
+        """!
+        @brief Compile a list of nodes, using the worker pool if configured.
+
+        Everything that depends on the order of the nodes (dummy addresses) is
+        done serially first. The nodes are then compiled by the workers, and
+        the results are yielded in the same order as the nodes, as soon as they
+        are ready, so they can be written out without holding all of them in
+        memory. At most COMPILE_JOBS_PER_WORKER jobs per worker are in flight,
+        so results that are ready out of order do not pile up. The iterator
+        must be consumed to the end.
+
+        @param nodes nodes to compile.
+        @param outputDir absolute path of the folder to create the node folders
+        in.
+
+        @returns iterator of docker-compose service strings.
+        """
+        for node in nodes: self._assignDummyAddresses(node)
+
+        if self.__workers <= 1 or len(nodes) <= 1:
+            for node in nodes:
+                (service, layer) = self._compileNodeInto(node, outputDir)
+                self._useLayer(layer)
+                yield service
+        elif self.__worker_processes:
+            global _worker_job
+            _worker_job = (self, nodes, outputDir)
+            try:
+                with ProcessPoolExecutor(self.__workers, get_context('fork')) as pool:
+                    for chunk in self.__mapBounded(pool, _compileNodesInWorker, range(0, len(nodes), COMPILE_PROCESS_CHUNK_SIZE)):
+                        for (service, layer) in chunk:
+                            self._useLayer(layer)
+                            yield service
+            finally:
+                _worker_job = None
+        else:
+            with ThreadPoolExecutor(self.__workers) as pool:
+                for (service, layer) in self.__mapBounded(pool, lambda node: self._compileNodeInto(node, outputDir), nodes):
+                    self._useLayer(layer)
+                    yield service
+
+    def __mapBounded(self, pool: Executor, fn: Callable[[object], object], jobs: Iterable[object]) -> Iterator[object]:
+        """!
+        @brief run jobs on a pool, with a bounded number of jobs in flight.
+
+        @param pool pool.
+        @param fn function to run for each job.
+        @param jobs jobs.
+
+        @returns iterator of results, in the same order as the jobs.
+        """
+        window = self.__workers * COMPILE_JOBS_PER_WORKER
+        pending: Deque[Future] = deque()
+
+        for job in jobs:
+            pending.append(pool.submit(fn, job))
+            if len(pending) >= window: yield pending.popleft().result()
+
+        while len(pending) > 0: yield pending.popleft().result()
+
+    def _openComposeSection(self) -> TextIO:
+        """!
+        @brief Open a buffer for a section (e.g., services or networks) of a
+        compose file. The buffer is kept in memory while small, and moved to a
+        temporary file when it grows past COMPOSE_SPOOL_SIZE.
+
+        @returns buffer.
+        """
+        return SpooledTemporaryFile(max_size = COMPOSE_SPOOL_SIZE, mode = 'w+')
+
+    def _writeComposeFile(self, path: str, dummies: str, services: TextIO, networks: TextIO):
+        """!
+        @brief Write a compose file, streaming the services and networks
+        sections from their buffers.
+
+        @param path path of the compose file.
+        @param dummies dummy services section. Empty for shards.
+        @param services buffer of the services section.
+        @param networks buffer of the networks section.
+        """
+        with open(path, 'w') as f:
+            f.write(DockerCompilerFileTemplates['compose_header'])
+            f.write(dummies)
+            f.write('\n')
+
+            services.seek(0)
+            copyfileobj(services, f)
+
+            f.write(DockerCompilerFileTemplates['compose_networks_header'])
+
+            networks.seek(0)
+            copyfileobj(networks, f)
+
+            f.write('\n\n')
+
+    def _useLayer(self, layer: Tuple[str, Tuple[Tuple[str, ...], ...]]):
+        """!
+        @brief Record a base layer used by a node, so it (and the image it
+        is built from) is added to the compose file.
+
+        @param layer tuple of image name and software tiers, or None if the
+        node does not use a base layer.
+        """
+        if layer == None: return
+
+        (image, tiers) = layer
+
+        self._used_images.add(image)
+
+        # also record every parent layer, each tier is built on top of the
+        # layer with the tiers before it.
+        for i in range(1, len(tiers) + 1): self._used_layers.add((image, tiers[:i]))
+
+    def _getLayerName(self, image: str, tiers: Tuple[Tuple[str, ...], ...]) -> str:
+        """!
+        @brief Get the name of the base layer image for an image and list of
+        software tiers.
+
+        @param image name of the image the layer is built from.
+        @param tiers software tiers installed in the layer, in order.
+
+        @returns name of the base layer image.
+        """
+        if len(tiers) == 0: return md5(image.encode('utf-8')).hexdigest()
+
+        key = '\n'.join([image] + [' '.join(tier) for tier in tiers])
+
+        return md5(key.encode('utf-8')).hexdigest()
+
+    def _compileNodeInto(self, node: Node, outputDir: str) -> Tuple[str, Tuple[str, Tuple[Tuple[str, ...], ...]]]:
+        """!
+        @brief Compile a single node into the given folder.
+
+        This only writes into the node's own folder and does not change the
+        working directory or any shared state, so it is safe to run for many
+        nodes at once. Dummy addresses must be assigned before calling this.
+
+        @param node node to compile.
+        @param outputDir absolute path of the folder to create the node folder
+        in.
+
+        @returns tuple of docker-compose service string and base layer used,
+        as tuple of image name and software tiers (None if the node does not
+        use a compiler-managed image).
+        """
         (scope, type, _) = node.getRegistryInfo()
         prefix = self._contextToPrefix(scope, type)
         real_nodename = '{}{}'.format(prefix, node.getName())
+        node_dir = join(outputDir, real_nodename)
         node_nets = ''
         dummy_addr_map = ''
+        used_layer = None
+        dependsOn = ''
 
-        for iface in node.getInterfaces():
+        if self.__self_managed_network:
+            (dummy_addresses, dummy_addr_map) = self.__dummy_addresses[node.getRegistryInfo()]
+
+        for (i, iface) in enumerate(node.getInterfaces()):
             net = iface.getNet()
-            (netscope, _, _) = net.getRegistryInfo()
-            net_prefix = self._contextToPrefix(netscope, 'net')
-            if net.getType() == NetworkType.Bridge: net_prefix = ''
-            real_netname = '{}{}'.format(net_prefix, net.getName())
+            real_netname = self._getNetId(net)
             address = iface.getAddress()
 
             if self.__self_managed_network and net.getType() != NetworkType.Bridge:
-                d_index: int = net.getAttribute('dummy_prefix_index')
-                d_prefix: IPv4Network = net.getAttribute('dummy_prefix')
-                d_address: IPv4Address = d_prefix[d_index]
-
-                net.setAttribute('dummy_prefix_index', d_index + 1)
-
-                dummy_addr_map += '{}/{},{}/{}\n'.format(
-                    d_address, d_prefix.prefixlen,
-                    iface.getAddress(), iface.getNet().getPrefix().prefixlen
-                )
-
-                address = d_address
-
-                self._log('using self-managed network: using dummy address {}/{} for {}/{} on as{}/{}'.format(
-                    d_address, d_prefix.prefixlen, iface.getAddress(), iface.getNet().getPrefix().prefixlen,
-                    node.getAsn(), node.getName()
-                ))
+                address = dummy_addresses[i]
 
             if address == None:
                 address = ""
@@ -887,20 +1428,20 @@ class Docker(Compiler):
             )
 
         dockerfile = DockerCompilerFileTemplates['dockerfile']
-        mkdir(real_nodename)
-        chdir(real_nodename)
+        mkdir(node_dir)
+
+        (image, soft) = self._getImageFor(node)
 
-        (image, soft) = self._selectImageFor(node)
+        # software is installed in shared base layer images, built once per
+        # distinct list of tiers instead of once per node.
+        tiers: Tuple[Tuple[str, ...], ...] = ()
 
         if not node.hasAttribute('__soft_install_tiers') and len(soft) > 0:
-            dockerfile += 'RUN apt-get update && apt-get install -y --no-install-recommends {}\n'.format(
-                ' '.join(sorted(soft)))
+            tiers = (tuple(sorted(soft)), )
 
         if node.hasAttribute('__soft_install_tiers'):
             softLists: List[List[str]] = node.getAttribute('__soft_install_tiers')
-            for softList in softLists:
-                dockerfile += 'RUN apt-get update && apt-get install -y --no-install-recommends {}\n'.format(
-                    ' '.join(sorted(softList)))
+            tiers = tuple(tuple(sorted(softList)) for softList in softLists)
 
         dockerfile += 'RUN curl -L https://grml.org/zsh/zshrc > /root/.zshrc\n'
 
@@ -908,8 +1449,15 @@ class Docker(Compiler):
         if 'host_rpki' in real_nodename:
             dockerfile = 'FROM {}\n'.format(rpki_image)
         else:
-            dockerfile = 'FROM {}\n'.format(md5(image.getName().encode('utf-8')).hexdigest()) + dockerfile            
-            self._used_images.add(image.getName())
+            dockerfile = 'FROM {}\n'.format(self._getLayerName(image.getName(), tiers)) + dockerfile            
+            used_layer = (image.getName(), tiers)
+
+            # the base layer is a service of the same compose file, except for
+            # shards, which are only brought up after the base file is built.
+            if not self.isSharded():
+                dependsOn = DockerCompilerFileTemplates['compose_depends_on'].format(
+                    service=self._getLayerName(image.getName(), tiers)
+                )
 
         for cmd in node.getBuildCommands(): dockerfile += 'RUN {}\n'.format(cmd)
 
@@ -918,9 +1466,9 @@ class Docker(Compiler):
         if self.__self_managed_network:
             start_commands += 'chmod +x /replace_address.sh\n'
             start_commands += '/replace_address.sh\n'
-            dockerfile += self._addFile('/replace_address.sh', DockerCompilerFileTemplates['replace_address_script'])
-            dockerfile += self._addFile('/dummy_addr_map.txt', dummy_addr_map)
-            dockerfile += self._addFile('/root/.zshrc.pre', DockerCompilerFileTemplates['zshrc_pre'])
+            dockerfile += self._addFile('/replace_address.sh', DockerCompilerFileTemplates['replace_address_script'], node_dir)
+            dockerfile += self._addFile('/dummy_addr_map.txt', dummy_addr_map, node_dir)
+            dockerfile += self._addFile('/root/.zshrc.pre', DockerCompilerFileTemplates['zshrc_pre'], node_dir)
 
         for (cmd, fork) in node.getStartCommands():
             start_commands += '{}{}\n'.format(cmd, ' &' if fork else '')
@@ -943,13 +1491,13 @@ class Docker(Compiler):
             dockerfile += self._addFile('/start.sh', DockerCompilerFileTemplates['start_script'].format(
                 startCommands=start_commands,
                 rtrServer='routinator server --rtr {ip}:3323 --refresh=300 --detach &\n'.format(
-                    ip=node.getInterfaces()[0].getAddress())))
+                    ip=node.getInterfaces()[0].getAddress())), node_dir)
         else:
             dockerfile += self._addFile('/start.sh', DockerCompilerFileTemplates['start_script'].format(
-                startCommands=start_commands, rtrServer='echo'))
+                startCommands=start_commands, rtrServer='echo'), node_dir)
         dockerfile += 'RUN apt install traceroute -y\n'     
-        dockerfile += self._addFile('/seedemu_sniffer', DockerCompilerFileTemplates['seedemu_sniffer'])
-        dockerfile += self._addFile('/seedemu_worker', DockerCompilerFileTemplates['seedemu_worker'])
+        dockerfile += self._addFile('/seedemu_sniffer', DockerCompilerFileTemplates['seedemu_sniffer'], node_dir)
+        dockerfile += self._addFile('/seedemu_worker', DockerCompilerFileTemplates['seedemu_worker'], node_dir)
 
         dockerfile += 'RUN chmod +x /start.sh\n'
         dockerfile += 'RUN chmod +x /seedemu_sniffer\n'
@@ -957,19 +1505,17 @@ class Docker(Compiler):
 
         for file in node.getFiles():
             (path, content) = file.get()
-            dockerfile += self._addFile(path, content)
+            dockerfile += self._addFile(path, content, node_dir)
 
         if node.getName() == 'rw':
             dockerfile += 'RUN chmod 0644 /etc/cron.d/bgp_updates_cron\n'
             dockerfile += 'RUN crontab /etc/cron.d/bgp_updates_cron\n'
 
         for (cpath, hpath) in node.getImportedFiles().items():
-            dockerfile += self._importFile(cpath, hpath)
+            dockerfile += self._importFile(cpath, hpath, node_dir)
 
         dockerfile += 'CMD ["/start.sh"]\n'
-        print(dockerfile, file=open('Dockerfile', 'w'))
-
-        chdir('..')
+        with open(join(node_dir, 'Dockerfile'), 'w') as f: print(dockerfile, file=f)
 
         name = self.__naming_scheme.format(
             asn=node.getAsn(),
@@ -981,15 +1527,35 @@ class Docker(Compiler):
 
         name = sub(r'[^a-zA-Z0-9_.-]', '_', name)
 
-        return DockerCompilerFileTemplates['compose_service'].format(
+        return (DockerCompilerFileTemplates['compose_service'].format(
             nodeId=real_nodename,
             nodeName=name,
             networks=node_nets,
             # privileged = 'true' if node.isPrivileged() else 'false',
             ports=ports,
             labelList=self._getNodeMeta(node),
-            volumes=volumes
-        )
+            volumes=volumes,
+            dependsOn=dependsOn
+        ), used_layer)
+
+    def _allocateNetPrefix(self, net: Network) -> str:
+        """!
+        @brief get the prefix of a network in docker. With self-managed
+        network, a new dummy prefix is assigned to the network, so this should
+        be called once per network.
+
+        @param net net object.
+
+        @returns prefix.
+        """
+        if not self.__self_managed_network or net.getType() == NetworkType.Bridge: return net.getPrefix()
+
+        pfx = next(self.__dummy_network_pool)
+        net.setAttribute('dummy_prefix', pfx)
+        net.setAttribute('dummy_prefix_index', 2)
+        self._log('self-managed network: using dummy prefix {}', pfx, level = LogLevel.Debug)
+
+        return pfx
 
     def _compileNet(self, net: Network) -> str:
         """!
@@ -999,86 +1565,261 @@ class Docker(Compiler):
 
         @returns docker-compose network string.
         """
-        (scope, _, _) = net.getRegistryInfo()
-        if self.__self_managed_network and net.getType() != NetworkType.Bridge:
-            pfx = next(self.__dummy_network_pool)
-            net.setAttribute('dummy_prefix', pfx)
-            net.setAttribute('dummy_prefix_index', 2)
-            self._log('self-managed network: using dummy prefix {}'.format(pfx))
-
-        net_prefix = self._contextToPrefix(scope, 'net')
-        if net.getType() == NetworkType.Bridge: net_prefix = ''
-
         return DockerCompilerFileTemplates['compose_network'].format(
-            netId='{}{}'.format(net_prefix, net.getName()),
-            prefix=net.getAttribute(
-                'dummy_prefix') if self.__self_managed_network and net.getType() != NetworkType.Bridge else net.getPrefix(),
+            netId=self._getNetId(net),
+            prefix=self._allocateNetPrefix(net),
             mtu=net.getMtu(),
             labelList=self._getNetMeta(net)
         )
 
-    def _makeDummies(self) -> str:
+    def _makeDummies(self, outputDir: str = None) -> str:
         """!
         @brief create dummy services to get around docker pull limits.
 
+        @param outputDir (optional) absolute path of the folder to create the
+        dummies folder in. Default to the current working directory.
+
         @returns docker-compose service string.
         """
-        mkdir('dummies')
-        chdir('dummies')
+        dummies_dir = join(outputDir if outputDir != None else getcwd(), 'dummies')
+        mkdir(dummies_dir)
 
         dummies = ''
 
         for image in self._used_images:
-            self._log('adding dummy service for image {}...'.format(image))
+            self._log('adding dummy service for image {}...', image)
 
             imageDigest = md5(image.encode('utf-8')).hexdigest()
 
             dummies += DockerCompilerFileTemplates['compose_dummy'].format(
-                imageDigest=imageDigest
+                imageDigest=imageDigest,
+                dependsOn=''
             )
 
             dockerfile = 'FROM {}\n'.format(image)
-            print(dockerfile, file=open(imageDigest, 'w'))
+            with open(join(dummies_dir, imageDigest), 'w') as f: print(dockerfile, file=f)
 
-        chdir('..')
+        for (image, tiers) in sorted(self._used_layers):
+            layerDigest = self._getLayerName(image, tiers)
+
+            self._log('adding base layer {} for image {} with software: {}...',
+                layerDigest, image, ' '.join(tiers[-1])
+            )
+
+            parentDigest = self._getLayerName(image, tiers[:-1])
+
+            # compose may build services in parallel, make sure the parent
+            # layer is built before the layer on top of it.
+            dummies += DockerCompilerFileTemplates['compose_dummy'].format(
+                imageDigest=layerDigest,
+                dependsOn=DockerCompilerFileTemplates['compose_depends_on'].format(
+                    service=parentDigest
+                )
+            )
+
+            dockerfile = 'FROM {}\n'.format(parentDigest)
+            dockerfile += 'ARG DEBIAN_FRONTEND=noninteractive\n'
+            dockerfile += DockerCompilerFileTemplates['base_layer_tier'].format(softList=' '.join(tiers[-1]))
+            with open(join(dummies_dir, layerDigest), 'w') as f: print(dockerfile, file=f)
 
         return dummies
 
+    def __getShards(self, nodes: List[Node]) -> List[List[Node]]:
+        """!
+        @brief split nodes into shards, see setSharding.
+
+        @param nodes nodes to split.
+
+        @returns list of shards, each a list of nodes.
+        """
+        groups: Dict[str, List[Node]] = {}
+
+        for node in nodes:
+            (scope, _, _) = node.getRegistryInfo()
+            if scope not in groups: groups[scope] = []
+            groups[scope].append(node)
+
+        # ASes in order of ASN, then other scopes by name.
+        scopes = sorted(groups.keys(), key = lambda scope: (0, int(scope), '') if scope.isdigit() else (1, 0, scope))
+
+        shards: List[List[Node]] = []
+
+        if self.__shard_ases > 0:
+            for i in range(0, len(scopes), self.__shard_ases):
+                shards.append([node for scope in scopes[i:i + self.__shard_ases] for node in groups[scope]])
+
+            return shards
+
+        size = self.__shard_services
+        current: List[Node] = []
+
+        for scope in scopes:
+            group = groups[scope]
+
+            if len(current) > 0 and len(current) + len(group) > size:
+                shards.append(current)
+                current = []
+
+            current += group
+
+            while len(current) >= size:
+                shards.append(current[:size])
+                current = current[size:]
+
+        if len(current) > 0: shards.append(current)
+
+        return shards
+
+    def __compileShard(self, shardName: str, nodes: List[Node], outputDir: str):
+        """!
+        @brief compile the nodes of a shard and write its compose file.
+
+        @param shardName name of the shard.
+        @param nodes nodes in the shard.
+        @param outputDir absolute path of the output folder.
+        """
+        services = self._openComposeSection()
+        networks = self._openComposeSection()
+
+        for service in self._compileNodes(nodes, outputDir): services.write(service)
+
+        netIds: Dict[str, None] = {}
+
+        for node in nodes:
+            for iface in node.getInterfaces(): netIds[self._getNetId(iface.getNet())] = None
+
+        for netId in netIds:
+            networks.write(DockerCompilerFileTemplates['compose_network_external'].format(
+                netId = netId,
+                projectName = self.__shard_project
+            ))
+
+        self._log('creating docker-compose.{}.yml with {} services...', shardName, len(nodes))
+        self._writeComposeFile(join(outputDir, 'docker-compose.{}.yml'.format(shardName)), '', services, networks)
+
+        services.close()
+        networks.close()
+
+    def __compileShardNet(self, net: Network) -> Tuple[str, str, str]:
+        """!
+        @brief compile a network for sharded output. The networks are shared by
+        all shards, so they are created by the launcher instead of compose,
+        and every compose file, including the base one, uses them as external
+        networks.
+
+        @param net net object.
+
+        @returns tuple of docker-compose network string, and launcher commands
+        to create and remove the network.
+        """
+        netId = self._getNetId(net)
+
+        return (
+            DockerCompilerFileTemplates['compose_network_external'].format(
+                netId = netId,
+                projectName = self.__shard_project
+            ),
+            DockerCompilerFileTemplates['shard_network_create'].format(
+                netId = netId,
+                projectName = self.__shard_project,
+                prefix = self._allocateNetPrefix(net),
+                mtu = net.getMtu(),
+                labelList = self._getNetMeta(net, 'shard_network_label')
+            ),
+            DockerCompilerFileTemplates['shard_network_remove'].format(
+                netId = netId,
+                projectName = self.__shard_project
+            )
+        )
+
+    def __writeLauncher(self, shardNames: List[str], networkCreate: str, networkRemove: str, outputDir: str):
+        """!
+        @brief write the .env file of the base project and the shard launcher.
+
+        @param shardNames names of the shards.
+        @param networkCreate commands to create the networks.
+        @param networkRemove commands to remove the networks.
+        @param outputDir absolute path of the output folder.
+        """
+        # the base project must have a known name, so shards can find its
+        # networks, even when it is started without the launcher.
+        with open(join(outputDir, '.env'), 'w') as f:
+            f.write(DockerCompilerFileTemplates['shard_env'].format(projectName = self.__shard_project))
+
+        launcher = join(outputDir, 'shards.sh')
+
+        with open(launcher, 'w') as f:
+            f.write(DockerCompilerFileTemplates['shard_launcher'].format(
+                launcherName = 'shards.sh',
+                concurrency = self.__shard_concurrency,
+                shardList = ' '.join(shardNames),
+                networkCreate = networkCreate,
+                networkRemove = networkRemove,
+                projectName = self.__shard_project
+            ))
+
+        chmod(launcher, 0o755)
+
     def _doCompile(self, emulator: Emulator):
         registry = emulator.getRegistry()
+        root = getcwd()
 
         self._groupSoftware(emulator)
+        self._setFileStore(root)
+
+        networks = self._openComposeSection()
+        services = self._openComposeSection()
+
+        networkCreate = ''
+        networkRemove = ''
+
+        for ((scope, type, name), obj) in registry.iterByType({'net'}):
+            self._log('creating network: {}/{}...', scope, name, level = LogLevel.Debug)
+
+            if not self.isSharded():
+                networks.write(self._compileNet(obj))
+                continue
 
-        for ((scope, type, name), obj) in registry.getAll().items():
+            (net, create, remove) = self.__compileShardNet(obj)
+            networks.write(net)
+            networkCreate += create
+            networkRemove += remove
 
-            if type == 'net':
-                self._log('creating network: {}/{}...'.format(scope, name))
-                self.__networks += self._compileNet(obj)
+        nodes: List[Node] = []
 
-        for ((scope, type, name), obj) in registry.getAll().items():
+        for ((scope, type, name), obj) in registry.iterNodes():
             if type == 'rnode':
-                self._log('compiling router node {} for as{}...'.format(name, scope))
-                self.__services += self._compileNode(obj)
+                self._log('compiling router node {} for as{}...', name, scope, level = LogLevel.Debug)
 
             if type == 'hnode':
-                self._log('compiling host node {} for as{}...'.format(name, scope))
-                self.__services += self._compileNode(obj)
+                self._log('compiling host node {} for as{}...', name, scope, level = LogLevel.Debug)
 
             if type == 'rs':
-                self._log('compiling rs node for {}...'.format(name))
-                self.__services += self._compileNode(obj)
+                self._log('compiling rs node for {}...', name, level = LogLevel.Debug)
 
             if type == 'snode':
-                self._log('compiling service node {}...'.format(name))
-                self.__services += self._compileNode(obj)
+                self._log('compiling service node {}...', name, level = LogLevel.Debug)
+
+            nodes.append(obj)
+
+        shardNames: List[str] = []
+
+        if self.isSharded():
+            for (i, shard) in enumerate(self.__getShards(nodes)):
+                shardNames.append('shard{}'.format(i))
+                self.__compileShard(shardNames[-1], shard, root)
+
+            assert len(shardNames) > 0, 'sharding is enabled, but there are no nodes to put in shards.'
+        else:
+            for service in self._compileNodes(nodes, root): services.write(service)
 
         if self.__client_enabled:
             self._log('enabling seedemu-client...')
 
-            self.__services += DockerCompilerFileTemplates['seedemu_client'].format(
+            services.write(DockerCompilerFileTemplates['seedemu_client'].format(
                 clientImage=SEEDEMU_CLIENT_IMAGE,
                 clientPort=self.__client_port
-            )
+            ))
 
         local_images = ''
 
@@ -1089,9 +1830,12 @@ class Docker(Compiler):
                 dirName=image.getDirName()
             )
 
-        self._log('creating docker-compose.yml...'.format(scope, name))
-        print(DockerCompilerFileTemplates['compose'].format(
-            services=self.__services,
-            networks=self.__networks,
-            dummies=local_images + self._makeDummies()
-        ), file=open('docker-compose.yml', 'w'))
+        self._log('creating docker-compose.yml...')
+        self._writeComposeFile(join(root, 'docker-compose.yml'), local_images + self._makeDummies(root), services, networks)
+
+        services.close()
+        networks.close()
+
+        if self.isSharded():
+            self._log('creating shard launcher for {} shards...', len(shardNames))
+            self.__writeLauncher(shardNames, networkCreate, networkRemove, root)
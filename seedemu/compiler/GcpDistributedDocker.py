@@ -235,10 +235,9 @@ class GcpDistributedDocker(Compiler):
 
         scopes = set()
 
-        for (scope, type, _) in registry.getAll().keys():
+        for ((scope, _, _), _) in registry.iterByType({'net', 'hnode', 'rnode', 'snode'}):
             if scope == 'ix': continue
-            if type == 'net' or type == 'hnode' or type == 'rnode' or type == 'snode':
-                scopes.add(scope)
+            scopes.add(scope)
 
         for scope in scopes:
             print(GcpDistributedDockerFileTemplates['worker_tf_template'].format(
@@ -25,5 +25,5 @@ class Graphviz(Compiler):
 
             graphs.createGraphs(emulator)
             for graph in graphs.getGraphs().values():
-                self._log('found graph: {}'.format(graph.name))
+                self._log('found graph: {}', graph.name)
                 print(graph.toGraphviz(), file=open('{}.dot'.format(self.__slugify(graph.name)), 'w'))
\ No newline at end of file
@@ -1,7 +1,67 @@
-from typing import Dict, Tuple
+from typing import Dict, List, Set, Tuple
+from heapq import heappush, heappop
 from .Printable import Printable
 from .enums import NodeRole
 
+class AddressBitmap:
+    """!
+    @brief bitmap of the address offsets used in a network.
+
+    One bit per address, so even a /16 takes 8 KiB, and marking, testing and
+    freeing an offset are constant time.
+    """
+
+    __size: int
+    __bits: bytearray
+
+    def __init__(self, size: int):
+        """!
+        @brief create a new bitmap.
+
+        @param size number of addresses in the network.
+        """
+        self.__size = size
+        self.__bits = bytearray((size + 7) // 8)
+
+    def getSize(self) -> int:
+        """!
+        @brief get number of addresses in the network.
+
+        @returns size.
+        """
+        return self.__size
+
+    def isUsed(self, offset: int) -> bool:
+        """!
+        @brief test if an offset is used.
+
+        @param offset offset.
+
+        @returns True if used.
+        """
+        return self.__bits[offset >> 3] & (1 << (offset & 7)) != 0
+
+    def use(self, offset: int):
+        """!
+        @brief mark an offset as used.
+
+        @param offset offset.
+
+        @throws AssertionError if the offset is out of range, or already used.
+        """
+        assert 0 <= offset < self.__size, 'offset {} out of range.'.format(offset)
+        assert not self.isUsed(offset), 'offset {} already in use.'.format(offset)
+
+        self.__bits[offset >> 3] |= 1 << (offset & 7)
+
+    def free(self, offset: int):
+        """!
+        @brief mark an offset as free.
+
+        @param offset offset.
+        """
+        self.__bits[offset >> 3] &= ~(1 << (offset & 7)) & 0xff
+
 class Assigner:
     """!
     @brief Default address assigner.
@@ -9,9 +69,12 @@ class Assigner:
     This replaces python's generator, as that cannot be dumped.
     """
 
+    __start: int = None
     __current: int
     __end: int
     __step: int
+    __released: List[int] = None
+    __released_set: Set[int] = None
 
     def __init__(self, start: int, end: int, step: int):
         """!
@@ -19,26 +82,70 @@ class Assigner:
         
         @param start start
         @param end end
-        @param step step
+        @param step step. With a step of 0, only start is handed out, once.
         """
+        self.__start = start
         self.__current = start
         self.__end = end
         self.__step = step
+        self.__released = []
+        self.__released_set = set()
 
     def next(self) -> int:
         """!
-        @brief get next.
+        @brief get next. Released values are handed out first, in the order
+        of the steps.
 
         @returns next value.
         """
+        if self.__released:
+            v = heappop(self.__released)
+            if self.__step < 0: v = -v
+            self.__released_set.discard(v)
+            return v
         if self.__step > 0 and self.__current > self.__end:
             assert False, 'out of range.'
         if self.__step < 0 and self.__current < self.__end:
             assert False, 'out of range.'
+        if self.__step == 0:
+            assert self.__current != None, 'out of range.'
+            v = self.__current
+            self.__current = None
+            return v
         v = self.__current
         self.__current += self.__step
         return v
 
+    def release(self, value: int):
+        """!
+        @brief give a value back, so it is handed out again. Released values
+        are kept in a heap, so releasing and reusing a value costs O(log n),
+        and values after it are not handed out again.
+
+        @param value value previously returned by next. Values never handed
+        out, or already released, are ignored.
+        """
+        if self.__start == None: return
+
+        if self.__step == 0:
+            if value == self.__start: self.__current = value
+            return
+
+        if (value - self.__start) % self.__step != 0: return
+
+        given = self.__start <= value < self.__current if self.__step > 0 else self.__current < value <= self.__start
+        if not given: return
+
+        # assigners loaded from dumps made before values could be released.
+        if self.__released == None:
+            self.__released = []
+            self.__released_set = set()
+
+        if value in self.__released_set: return
+
+        self.__released_set.add(value)
+        heappush(self.__released, value if self.__step > 0 else -value)
+
 class AddressAssignmentConstraint(Printable):
     """!
     AddressAssignmentConstraint class.
@@ -170,6 +277,16 @@ class AddressAssignmentConstraint(Printable):
 
         raise ValueError("IX IP assigment must done with mapIxAddress().")
 
+    def reserveOffset(self, offset: int):
+        """!
+        @brief tell the constraint about an address offset that was set by
+        hand, so it is not mapped to an IX member. The default constraint
+        maps ASNs to addresses directly and ignores it.
+
+        @param offset address offset in the network.
+        """
+        pass
+
     def mapIxAddress(self, asn: int) -> int:
         """!
         @brief Map ASN to IP address in IX peering LAN.
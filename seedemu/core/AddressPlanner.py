@@ -0,0 +1,452 @@
+from __future__ import annotations
+from .AddressAssignmentConstraint import AddressAssignmentConstraint
+from ipaddress import IPv4Network, IPv4Address
+from bisect import bisect_left, insort
+from typing import Dict, List, Set, Tuple
+
+class BuddyAllocator(object):
+    """!
+    @brief buddy allocator for IPv4 prefixes.
+
+    Prefixes of any length are allocated from a pool, lowest address first.
+    Allocating a prefix splits the smallest free block that can hold it in
+    halves until it has the right size, and releasing a prefix merges it back
+    with its buddy when the buddy is free, so the pool does not fragment.
+
+    Addresses are kept as integers, and only free blocks are stored, so a
+    nearly empty /4 pool takes a few dozen integers, not millions of prefixes.
+    """
+
+    __network: IPv4Network
+    __free: Dict[int, List[int]]
+    __allocated: Set[Tuple[int, int]]
+
+    def __init__(self, network: IPv4Network):
+        """!
+        @brief create a new allocator.
+
+        @param network pool to allocate prefixes from.
+        """
+        self.__network = network
+        self.__free = { network.prefixlen: [int(network.network_address)] }
+        self.__allocated = set()
+
+    def getNetwork(self) -> IPv4Network:
+        """!
+        @brief get the pool.
+
+        @returns pool.
+        """
+        return self.__network
+
+    def __take(self, prefixlen: int, start: int) -> bool:
+        """!
+        @brief remove a block from the free list, if it is free.
+
+        @param prefixlen prefix length of the block.
+        @param start first address of the block.
+
+        @returns True if the block was free.
+        """
+        blocks = self.__free.get(prefixlen)
+        if blocks == None: return False
+
+        i = bisect_left(blocks, start)
+        if i == len(blocks) or blocks[i] != start: return False
+
+        del blocks[i]
+
+        return True
+
+    def __give(self, prefixlen: int, start: int):
+        """!
+        @brief add a block to the free list.
+
+        @param prefixlen prefix length of the block.
+        @param start first address of the block.
+        """
+        if prefixlen not in self.__free: self.__free[prefixlen] = []
+        insort(self.__free[prefixlen], start)
+
+    def allocate(self, prefixlen: int) -> IPv4Network:
+        """!
+        @brief allocate a prefix.
+
+        @param prefixlen prefix length.
+
+        @returns allocated prefix.
+        @throws AssertionError if the pool has no free prefix of the length.
+        """
+        assert self.__network.prefixlen <= prefixlen <= 32, 'can not allocate /{} from {}.'.format(prefixlen, self.__network)
+
+        size = prefixlen
+        while size >= self.__network.prefixlen and len(self.__free.get(size, [])) == 0: size -= 1
+
+        assert size >= self.__network.prefixlen, 'out of addresses: no free /{} left in {}.'.format(prefixlen, self.__network)
+
+        start = self.__free[size].pop(0)
+
+        # keep the lower half, free the upper half, until small enough.
+        while size < prefixlen:
+            size += 1
+            self.__give(size, start + (1 << (32 - size)))
+
+        self.__allocated.add((start, prefixlen))
+
+        return IPv4Network((start, prefixlen))
+
+    def reserve(self, prefix: IPv4Network):
+        """!
+        @brief mark a prefix as allocated, so it will not be handed out.
+
+        @param prefix prefix, must be inside the pool.
+
+        @throws AssertionError if the prefix overlaps an allocated prefix.
+        """
+        assert prefix.subnet_of(self.__network), '{} is not in {}.'.format(prefix, self.__network)
+
+        start = int(prefix.network_address)
+
+        for size in range(prefix.prefixlen, self.__network.prefixlen - 1, -1):
+            block = start & ~((1 << (32 - size)) - 1)
+            if not self.__take(size, block): continue
+
+            # split the free block down to the prefix, freeing the halves
+            # that do not contain it.
+            while size < prefix.prefixlen:
+                size += 1
+                half = 1 << (32 - size)
+
+                if start >= block + half:
+                    self.__give(size, block)
+                    block += half
+                else:
+                    self.__give(size, block + half)
+
+            self.__allocated.add((start, prefix.prefixlen))
+
+            return
+
+        assert False, '{} overlaps an allocated prefix.'.format(prefix)
+
+    def release(self, prefix: IPv4Network):
+        """!
+        @brief return an allocated or reserved prefix to the pool.
+
+        @param prefix prefix.
+
+        @throws AssertionError if the prefix is not allocated.
+        """
+        start = int(prefix.network_address)
+        size = prefix.prefixlen
+
+        assert (start, size) in self.__allocated, '{} is not allocated.'.format(prefix)
+        self.__allocated.remove((start, size))
+
+        while size > self.__network.prefixlen:
+            buddy = start ^ (1 << (32 - size))
+            if not self.__take(size, buddy): break
+
+            start = min(start, buddy)
+            size -= 1
+
+        self.__give(size, start)
+
+    def isAllocated(self, prefix: IPv4Network) -> bool:
+        """!
+        @brief test if a prefix was allocated or reserved, as a whole.
+
+        @param prefix prefix.
+
+        @returns True if allocated.
+        """
+        return (int(prefix.network_address), prefix.prefixlen) in self.__allocated
+
+class IxAddressTable(AddressAssignmentConstraint):
+    """!
+    @brief address assignment constraint for IX peering LANs, mapping members
+    to addresses with a table instead of using the ASN as the address.
+
+    A member keeps using its ASN as the last part of its address if the ASN is
+    a free address in the peering LAN, so small emulations look the same as
+    with the default constraint. Other members get the lowest free address.
+    This works for any ASN, and for peering LANs with more than 254 members.
+    """
+
+    __size: int
+    __members: Dict[int, int]
+    __used: Set[int]
+    __next: int
+
+    def __init__(self, prefix: IPv4Network, start: int = 2):
+        """!
+        @brief create a new IX address table.
+
+        @param prefix prefix of the peering LAN.
+        @param start (optional) lowest address offset to hand out. Default to
+        2.
+        """
+        super().__init__()
+
+        self.__size = prefix.num_addresses
+        self.__members = {}
+        self.__used = set()
+        self.__next = start
+
+    def setMemberAddress(self, asn: int, offset: int) -> IxAddressTable:
+        """!
+        @brief set the address of a member.
+
+        @param asn ASN of the member.
+        @param offset address offset in the peering LAN.
+
+        @returns self, for chaining API calls.
+        """
+        assert asn not in self.__members, 'as{} already has an address.'.format(asn)
+        assert 0 < offset < self.__size - 1, 'invalid offset {}.'.format(offset)
+        assert offset not in self.__used, 'offset {} already used.'.format(offset)
+
+        self.__members[asn] = offset
+        self.__used.add(offset)
+
+        return self
+
+    def getMembers(self) -> Dict[int, int]:
+        """!
+        @brief get the address table.
+
+        @returns dict of ASN to address offset.
+        """
+        return self.__members
+
+    def reserveOffset(self, offset: int):
+        """!
+        @brief mark an address offset set by hand as used, so it is not
+        handed out to a member.
+
+        @param offset address offset in the peering LAN.
+        """
+        self.__used.add(offset)
+
+    def mapIxAddress(self, asn: int) -> int:
+        """!
+        @brief Map ASN to IP address in IX peering LAN.
+
+        @param asn ASN of IX participant.
+        @returns offset.
+        @throws AssertionError if the peering LAN is full.
+        """
+        if asn in self.__members: return self.__members[asn]
+
+        offset = asn
+
+        if offset < self.__next or offset >= self.__size - 1 or offset in self.__used:
+            while self.__next in self.__used: self.__next += 1
+            offset = self.__next
+
+        assert offset < self.__size - 1, "can't map ASN {} to IX address: peering LAN is full.".format(asn)
+
+        self.setMemberAddress(asn, offset)
+
+        return offset
+
+    def print(self, indent: int) -> str:
+        out = ' ' * indent
+        out += 'AddressAssignmentConstraint: IX address table ({} members)\n'.format(len(self.__members))
+
+        return out
+
+class AddressPlanner(object):
+    """!
+    @brief global address planner.
+
+    The default addressing of the base layer derives prefixes from numbers:
+    10.{asn}.0.0/16 for ASes, 10.{id}.0.0/24 for IXes, and the ASN for the
+    address of a member in an IX peering LAN. That only works for ASNs and IX
+    IDs up to 255. When a planner is set on the base layer, prefixes are
+    instead allocated from configurable pools, so any ASN and any number of
+    ASes, IXes, and IX members can be used.
+
+    Each AS gets a block from the AS pool when its first network is created,
+    and the AS's networks are allocated from that block. Each IX gets a peering LAN from the IX pool and an
+    IxAddressTable for member addresses. Link prefixes (e.g., for
+    router-to-router links or cross connects) can be allocated from the link
+    pool, and the routing layer takes loopback addresses from the loopback
+    pool. Derive from this class to change how prefixes are picked.
+    """
+
+    __as_pool: BuddyAllocator
+    __as_prefix_length: int
+    __ix_pool: BuddyAllocator
+    __ix_prefix_length: int
+    __link_pool: BuddyAllocator
+    __link_prefix_length: int
+    __loopback_pool: BuddyAllocator
+
+    __as_blocks: Dict[int, IPv4Network]
+    __ix_prefixes: Dict[int, IPv4Network]
+
+    def __init__(
+        self,
+        asPool: str = '16.0.0.0/4',
+        asPrefixLength: int = 20,
+        ixPool: str = '100.0.0.0/13',
+        ixPrefixLength: int = 24,
+        linkPool: str = '32.0.0.0/4',
+        linkPrefixLength: int = 24,
+        loopbackPool: str = '10.0.0.0/12'
+    ):
+        """!
+        @brief create a new address planner.
+
+        Pools should not overlap with each other or with any prefix set by
+        hand.
+
+        @param asPool (optional) pool of AS blocks. Default to 16.0.0.0/4.
+        @param asPrefixLength (optional) size of the block of each AS. Default
+        to 20, for 16 /24 networks in each of up to 65536 ASes.
+        @param ixPool (optional) pool of IX peering LANs. Default to
+        100.0.0.0/13.
+        @param ixPrefixLength (optional) default size of IX peering LANs.
+        Default to 24.
+        @param linkPool (optional) pool of link prefixes. Default to
+        32.0.0.0/4.
+        @param linkPrefixLength (optional) default size of link prefixes.
+        Default to 24, which fits the default address assignment constraint.
+        @param loopbackPool (optional) pool of router loopback addresses.
+        Default to 10.0.0.0/12.
+        """
+        self.__as_pool = BuddyAllocator(IPv4Network(asPool))
+        self.__as_prefix_length = asPrefixLength
+        self.__ix_pool = BuddyAllocator(IPv4Network(ixPool))
+        self.__ix_prefix_length = ixPrefixLength
+        self.__link_pool = BuddyAllocator(IPv4Network(linkPool))
+        self.__link_prefix_length = linkPrefixLength
+        self.__loopback_pool = BuddyAllocator(IPv4Network(loopbackPool))
+
+        # keep the network address of the pool out of use. The broadcast
+        # address is not reserved up front, as a free /32 at the top of the
+        # pool would be handed out before the blocks below it; it is only
+        # reached once everything else is taken.
+        self.__loopback_pool.reserve(IPv4Network((self.__loopback_pool.getNetwork().network_address, 32)))
+
+        self.__as_blocks = {}
+        self.__ix_prefixes = {}
+
+    def allocateAsBlock(self, asn: int, prefixLength: int = None) -> IPv4Network:
+        """!
+        @brief allocate the address block of an AS. Call this before creating
+        the first network of the AS to use a different size for a large AS.
+
+        @param asn ASN.
+        @param prefixLength (optional) size of the block. Default to the
+        planner's AS prefix length.
+
+        @returns block.
+        """
+        assert asn not in self.__as_blocks, 'as{} already has a block.'.format(asn)
+
+        self.__as_blocks[asn] = self.__as_pool.allocate(prefixLength if prefixLength != None else self.__as_prefix_length)
+
+        return self.__as_blocks[asn]
+
+    def getAsBlock(self, asn: int) -> IPv4Network:
+        """!
+        @brief get the address block of an AS, allocating it if needed.
+
+        @param asn ASN.
+
+        @returns block.
+        """
+        if asn not in self.__as_blocks: return self.allocateAsBlock(asn)
+
+        return self.__as_blocks[asn]
+
+    def allocateIxPrefix(self, ixId: int, prefixLength: int = None) -> IPv4Network:
+        """!
+        @brief allocate the peering LAN prefix of an IX. Call this before
+        creating the IX to use a different size for a large IX.
+
+        @param ixId IX ID.
+        @param prefixLength (optional) size of the peering LAN. Default to the
+        planner's IX prefix length.
+
+        @returns prefix.
+        """
+        assert ixId not in self.__ix_prefixes, 'ix{} already has a prefix.'.format(ixId)
+
+        self.__ix_prefixes[ixId] = self.__ix_pool.allocate(prefixLength if prefixLength != None else self.__ix_prefix_length)
+
+        return self.__ix_prefixes[ixId]
+
+    def getIxPrefix(self, ixId: int) -> IPv4Network:
+        """!
+        @brief get the peering LAN prefix of an IX, allocating it if needed.
+
+        @param ixId IX ID.
+
+        @returns prefix.
+        """
+        if ixId not in self.__ix_prefixes: return self.allocateIxPrefix(ixId)
+
+        return self.__ix_prefixes[ixId]
+
+    def createIxConstraint(self, ixId: int, prefix: IPv4Network) -> AddressAssignmentConstraint:
+        """!
+        @brief create the address assignment constraint of an IX peering LAN.
+
+        @param ixId IX ID.
+        @param prefix prefix of the peering LAN.
+
+        @returns constraint.
+        """
+        return IxAddressTable(prefix)
+
+    def allocateLinkPrefix(self, prefixLength: int = None) -> IPv4Network:
+        """!
+        @brief allocate a link prefix.
+
+        @param prefixLength (optional) size of the prefix. Default to the
+        planner's link prefix length.
+
+        @returns prefix.
+        """
+        return self.__link_pool.allocate(prefixLength if prefixLength != None else self.__link_prefix_length)
+
+    def allocateLoopback(self) -> IPv4Address:
+        """!
+        @brief allocate a router loopback address.
+
+        @returns address.
+        @throws AssertionError if the loopback pool is full.
+        """
+        address = self.__loopback_pool.allocate(32).network_address
+
+        assert address != self.__loopback_pool.getNetwork().broadcast_address, 'out of loopback addresses in {}.'.format(self.__loopback_pool.getNetwork())
+
+        return address
+
+    def releaseLoopback(self, address: IPv4Address):
+        """!
+        @brief return a router loopback address to the pool.
+
+        @param address address.
+        """
+        self.__loopback_pool.release(IPv4Network((address, 32)))
+
+    def reserve(self, prefix: str) -> AddressPlanner:
+        """!
+        @brief reserve a prefix in whichever pool contains it, so the planner
+        does not hand it out. Use this for prefixes set by hand that are inside
+        a pool.
+
+        @param prefix prefix.
+
+        @returns self, for chaining API calls.
+        """
+        network = IPv4Network(prefix)
+
+        for pool in [self.__as_pool, self.__ix_pool, self.__link_pool, self.__loopback_pool]:
+            if network.subnet_of(pool.getNetwork()): pool.reserve(network)
+
+        return self
@@ -3,6 +3,7 @@ from .Graphable import Graphable
 from .Printable import Printable
 from .Network import Network
 from .AddressAssignmentConstraint import AddressAssignmentConstraint
+from .AddressPlanner import AddressPlanner, BuddyAllocator
 from .enums import NetworkType, NodeRole
 from .Node import Node
 from .Emulator import Emulator
@@ -23,6 +24,8 @@ class AutonomousSystem(Printable, Graphable, Configurable):
 
     __asn: int
     __subnets: List[IPv4Network]
+    __allocator: BuddyAllocator = None
+    __planner: AddressPlanner = None
     __routers: Dict[str, Node]
     __hosts: Dict[str, Node]
     __nets: Dict[str, Network]
@@ -44,6 +47,44 @@ class AutonomousSystem(Printable, Graphable, Configurable):
         self.__subnets = None if asn > 255 else list(IPv4Network(subnetTemplate.format(asn)).subnets(new_prefix = 24))
         self.__name_servers = []
 
+    def setAddressBlock(self, block: IPv4Network) -> AutonomousSystem:
+        """!
+        @brief set the address block of this AS. Networks created with the
+        "auto" prefix are allocated from the block instead of
+        "10.{asn}.0.0/16", which also allows "auto" for ASN > 255. See
+        AddressPlanner.
+
+        @param block address block.
+
+        @returns self, for chaining API calls.
+        """
+        self.__allocator = BuddyAllocator(block)
+        self.__subnets = None
+
+        return self
+
+    def setAddressPlanner(self, planner: AddressPlanner) -> AutonomousSystem:
+        """!
+        @brief set the address planner to get the address block of this AS
+        from. The block is only allocated when the first network of the AS is
+        created, so ASes without networks do not take up a block.
+
+        @param planner address planner.
+
+        @returns self, for chaining API calls.
+        """
+        self.__planner = planner
+
+        return self
+
+    def getAddressBlock(self) -> IPv4Network:
+        """!
+        @brief get the address block of this AS.
+
+        @returns address block, or None if not set (or not allocated yet).
+        """
+        return self.__allocator.getNetwork() if self.__allocator != None else None
+
     def setNameServers(self, servers: List[str]) -> AutonomousSystem:
         """!
         @brief set recursive name servers to use on nodes in this AS. Overwrites
@@ -150,7 +191,8 @@ class AutonomousSystem(Printable, Graphable, Configurable):
         @param name name of the new network.
         @param prefix optional. Network prefix of this network. If not set, a
         /24 subnet of "10.{asn}.{id}.0/24" will be used, where asn is ASN of
-        this AS, and id is a self-incremental value starts from 0.
+        this AS, and id is a self-incremental value starts from 0. If the AS
+        has an address block, the next free /24 of the block is used instead.
         @param direct optional. direct flag of the network. A direct network
         will be added to RIB of routing daemons. Default to true.
         @param aac optional. AddressAssignmentConstraint to use. Default to
@@ -159,10 +201,21 @@ class AutonomousSystem(Printable, Graphable, Configurable):
         @returns Network.
         @throws StopIteration if subnet exhausted.
         """
-        assert prefix != "auto" or self.__asn <= 255, "can't use auto: asn > 255"
-
-        network = IPv4Network(prefix) if prefix != "auto" else self.__subnets.pop(0)
         assert name not in self.__nets, 'Network with name {} already exist.'.format(name)
+
+        if self.__allocator == None and self.__planner != None:
+            self.setAddressBlock(self.__planner.getAsBlock(self.__asn))
+
+        assert prefix != "auto" or self.__asn <= 255 or self.__allocator != None, "can't use auto: asn > 255"
+
+        if self.__allocator != None:
+            if prefix == "auto": network = self.__allocator.allocate(24)
+            else:
+                network = IPv4Network(prefix)
+                if network.subnet_of(self.__allocator.getNetwork()): self.__allocator.reserve(network)
+        else:
+            network = IPv4Network(prefix) if prefix != "auto" else self.__subnets.pop(0)
+
         self.__nets[name] = Network(name, NetworkType.Local, network, aac, direct)
 
         return self.__nets[name]
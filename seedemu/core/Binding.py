@@ -3,11 +3,18 @@ from .Printable import Printable
 from .Emulator import Emulator
 from .Node import Node
 from enum import Enum
-from typing import List, Callable
-from ipaddress import IPv4Network, IPv4Address
-from sys import stderr
+from .Registry import Registry
+from typing import List, Dict, Set, Tuple, Callable, Pattern, Iterator
+from ipaddress import IPv4Network
+from bisect import bisect_left, bisect_right, insort
+from .Logger import getLogger
+from .enums import LogLevel
 import re, random, string
 
+## characters that make a binding source a regular expression rather than a
+## literal name.
+REGEX_SPECIAL_CHARS = set('.^$*+?{}[]\\|()')
+
 class Action(Enum):
     """!
     @brief actions to take when a binding matches a node.
@@ -42,6 +49,8 @@ class Filter(Printable):
     allowBound: bool
     custom: Callable[[str, Node], bool]
 
+    __name_re: Pattern = None
+
     def __init__(
         self, asn: int = None, nodeName: str = None, ip: str = None,
         prefix: str = None, custom: Callable[[str, Node], bool] = None,
@@ -85,6 +94,22 @@ class Filter(Printable):
         ## allow re-use already bound nodes
         self.allowBound = allowBound
 
+    def getNodeNamePattern(self) -> Pattern:
+        """!
+        @brief get the compiled node name pattern.
+
+        The pattern is compiled once and re-compiled only if nodeName has
+        changed since.
+
+        @returns compiled pattern, or None if nodeName is not set.
+        """
+        if self.nodeName == None: return None
+
+        if self.__name_re == None or self.__name_re.pattern != self.nodeName:
+            self.__name_re = re.compile(self.nodeName)
+
+        return self.__name_re
+
 class Binding(Printable):
     """!
     @brief Binding class. 
@@ -96,6 +121,8 @@ class Binding(Printable):
     action: Action
     filter: Filter
 
+    __source_re: Pattern = None
+
     def __init__(self, source, action = Action.RANDOM, filter = Filter()):
         """!
         @brief create new binding.
@@ -134,51 +161,37 @@ class Binding(Printable):
         assert f.asn == None or f.asn in base.getAsns(), 'binding: NEW: AS{} is set in filter but not in emulator.'.format(f.asn)
         assert f.ip == None or f.prefix == None, 'binding: NEW: both ip and prefix is set. Please set only one of them.'
 
-        if f.allowBound: self.__log('binding: NEW: WARN: allowBound has not effect when using Action.NEW')
+        if f.allowBound: self.__log('binding: NEW: WARN: allowBound has not effect when using Action.NEW', level = LogLevel.Warning)
 
         asn = f.asn
         netName = None
 
+        prefixes = base.getPrefixTree()
+
         # ip is set: find net matching the condition.
         if f.ip != None:
-            self.__log('binding: NEW: IP {} is given to host: finding networks with this IP in range.'.format(f.ip))
-            for _asn in base.getAsns():
-                hit = False
-                if f.asn != None and f.asn != _asn: continue
-                
-                asObject = base.getAutonomousSystem(_asn)
-                for net in asObject.getNetworks():
-                    netObject = asObject.getNetwork(net)
-
-                    if IPv4Address(f.ip) in netObject.getPrefix():
-                        self.__log('match found: as{}/{}'.format(_asn, net))
-                        asn = _asn
-                        netName = net
-                        hit = True
-                        break
-
-                if hit: break
+            self.__log('binding: NEW: IP {} is given to host: finding networks with this IP in range.', f.ip)
+            for (scope, net, _) in prefixes.getContaining(f.ip):
+                if scope == 'ix': continue
+                if f.asn != None and str(f.asn) != scope: continue
+
+                self.__log('match found: as{}/{}', scope, net)
+                asn = int(scope)
+                netName = net
+                break
         
         # prefix is set: find net matching the condition
         if f.prefix != None:
-            self.__log('binding: NEW: Prefix {} is given to host: finding networks in range.'.format(f.prefix))
-
-            for _asn in base.getAsns():
-                hit = False
-                if f.asn != None and f.asn != _asn: continue
-                
-                asObject = base.getAutonomousSystem(_asn)
-                for net in asObject.getNetworks():
-                    netObject = asObject.getNetwork(net)
+            self.__log('binding: NEW: Prefix {} is given to host: finding networks in range.', f.prefix)
 
-                    if IPv4Network(f.prefix).overlaps(netObject.getPrefix()):
-                        self.__log('binding: NEW: match found: as{}/{}'.format(_asn, net))
-                        asn = _asn
-                        netName = net
-                        hit = True
-                        break
+            for (scope, net, _) in prefixes.getOverlapping(f.prefix):
+                if scope == 'ix': continue
+                if f.asn != None and str(f.asn) != scope: continue
 
-                if hit: break
+                self.__log('binding: NEW: match found: as{}/{}', scope, net)
+                asn = int(scope)
+                netName = net
+                break
 
         if f.prefix != None or f.ip != None:
             assert netName != None, 'binding: NEW: cannot satisfy prefix/ip rule set by filter.'
@@ -186,14 +199,14 @@ class Binding(Printable):
         # no as selected: randomly choose one
         if asn == None:
             asn = random.choice(base.getAsns())
-            self.__log('binding: NEW: asn not set, using random as: {}'.format(asn))
+            self.__log('binding: NEW: asn not set, using random as: {}', asn)
 
         asObject = base.getAutonomousSystem(asn)
 
         # no net selected: randomly choose one
         if netName == None:
             netName = random.choice(asObject.getNetworks())
-            self.__log('binding: NEW: ip/prefix not set, using random net: as{}/{}'.format(asn, netName))
+            self.__log('binding: NEW: ip/prefix not set, using random net: as{}/{}', asn, netName)
 
 
         nodeName = f.nodeName
@@ -201,9 +214,11 @@ class Binding(Printable):
         # no nodename given: randomly create one
         if nodeName == None:
             nodeName = ''.join(random.choice(string.ascii_lowercase) for i in range(10))
-            self.__log('binding: NEW: nodeName not set, using random name: {}'.format(nodeName))
+            self.__log('binding: NEW: nodeName not set, using random name: {}', nodeName)
 
-        self.__log('binding: NEW: creating new host...'.format(nodeName))
+        self.__log('binding: NEW: creating new host...')
+
+        index = emulator.getCandidateIndex()
 
         # create the host in as
         host = asObject.createHost(nodeName)
@@ -220,6 +235,8 @@ class Binding(Printable):
         # configure - usually this is done by AS in configure stage, since we have passed that point, we need to do it ourself.
         host.configure(emulator)
 
+        index.add(host)
+
         return host
 
 
@@ -231,7 +248,35 @@ class Binding(Printable):
 
         @returns true if applies, false otherwise.
         """
-        return re.compile(self.source).match(vnode)
+        return self.getSourcePattern().match(vnode)
+
+    def getSourcePattern(self) -> Pattern:
+        """!
+        @brief get the compiled source pattern.
+
+        The pattern is compiled once and re-compiled only if source has changed
+        since.
+
+        @returns compiled pattern.
+        """
+        if self.__source_re == None or self.__source_re.pattern != self.source:
+            self.__source_re = re.compile(self.source)
+
+        return self.__source_re
+
+    def getLiteralSource(self) -> str:
+        """!
+        @brief get the source as a literal name, if it has no regexp special
+        characters. 
+
+        Since shoudBind uses match(), a literal source matches every vnode
+        name that starts with it.
+
+        @returns source, or None if source is a regexp.
+        """
+        if any(c in REGEX_SPECIAL_CHARS for c in self.source): return None
+
+        return self.source
 
     def getCandidate(self, vnode: str, emulator: Emulator, peek: bool = False) -> Node:
         """!
@@ -247,7 +292,7 @@ class Binding(Printable):
         @return candidate node, or none if not found.
         """
         if not self.shoudBind(vnode): return None
-        self.__log('looking for binding for {}'.format(vnode))
+        self.__log('looking for binding for {}', vnode)
 
         if self.action == Action.NEW:
             if peek: return None
@@ -257,58 +302,32 @@ class Binding(Printable):
 
             return node
             
-        registry = emulator.getRegistry()
-
         candidates: List[Node] = []
+        filter = self.filter
 
-        for (scope, type, name), obj in registry.getAll().items():
-            if type != 'hnode': continue
-            node: Node = obj
-            filter = self.filter
+        # asn, ip, prefix and literal name conditions are resolved by the
+        # index, the rest are tested one node at a time.
+        for node in emulator.getCandidateIndex().getCandidates(filter):
+            (scope, _, name) = node.getRegistryInfo()
 
-            self.__log('trying node as{}/{}...'.format(scope, name  ))
+            self.__log('trying node as{}/{}...', scope, name)
 
-            if filter.asn != None and node.getAsn() != filter.asn:
-                self.__log('node asn ({}) != filter asn ({}), trying next node.'.format(node.getAsn(), filter.asn))
-                continue
-            
-            if filter.nodeName != None and not re.compile(filter.nodeName).match(name):
-                self.__log('node name ({}) cat\'t match filter name ({}), trying next node.'.format(name, filter.nodeName))
+            if filter.nodeName != None and not filter.getNodeNamePattern().match(name):
+                self.__log('node name ({}) cat\'t match filter name ({}), trying next node.', name, filter.nodeName)
                 continue
 
-            if filter.ip != None:
-                has_match = False
-                for iface in node.getInterfaces():
-                    if str(iface.getAddress()) == filter.ip:
-                        has_match = True
-                        break
-                if not has_match:
-                    self.__log('node as{}/{} does not have IP {}, trying next node.'.format(scope, name, filter.ip))
-                    continue
-
-            if filter.prefix != None:
-                has_match = False
-                net = IPv4Network(filter.prefix)
-                for iface in node.getInterfaces():
-                    if iface.getAddress() in net.hosts():
-                        has_match = True
-                        break
-                if not has_match:
-                    self.__log('node as{}/{} not in prefix {}, trying next node.'.format(scope, name, filter.prefix))
-                    continue
-
             if filter.custom != None and not filter.custom(vnode, node):
-                self.__log('custom function returned false for node as{}/{}, trying next node.'.format(scope, name))
+                self.__log('custom function returned false for node as{}/{}, trying next node.', scope, name)
                 continue
 
             if node.hasAttribute('bound') and not filter.allowBound and not peek:
-                self.__log('node as{}/{} is already bound and re-bind is not allowed, trying next node.'.format(scope, name))
+                self.__log('node as{}/{} is already bound and re-bind is not allowed, trying next node.', scope, name)
                 continue
 
-            self.__log('node as{}/{} added as candidate. looking for more candidates.'.format(scope, name))
+            self.__log('node as{}/{} added as candidate. looking for more candidates.', scope, name)
 
             if self.action == Action.FIRST:
-                self.__log('{} as{}/{}.'.format('peek: picked' if peek else 'bound to', node.getAsn(), node.getName()))
+                self.__log('{} as{}/{}.', 'peek: picked' if peek else 'bound to', node.getAsn(), node.getName())
                 if not peek: node.setAttribute('bound', True)
                 return node
         
@@ -323,15 +342,253 @@ class Binding(Printable):
         if self.action == Action.RANDOM: node = random.choice(candidates)
 
         if node != None: 
-            self.__log('{} as{}/{}.'.format('peek: picked' if peek else 'bound to', node.getAsn(), node.getName()))
+            self.__log('{} as{}/{}.', 'peek: picked' if peek else 'bound to', node.getAsn(), node.getName())
             if not peek: node.setAttribute('bound', True)
 
         return node
 
-    def __log(self, message: str):
+    def __log(self, message: str, *args, level: LogLevel = LogLevel.Debug):
         """!
         @brief log to stderr.
 
-        @param message message.
+        @param message message, or format string if args are given.
+        @param args (optional) format arguments, only applied if the message
+        is printed.
+        @param level (optional) log level. Default to debug, as
+        bindings log several messages per node.
+        """
+        logger = getLogger()
+        if logger.isEnabled(level): logger.log(level, '==== Binding: {}'.format(self.source), message, *args)
+
+class VirtualNodeIndex(object):
+    """!
+    @brief index of virtual node names for matching bindings.
+
+    Binding sources without regexp special characters are matched with a
+    binary search on the sorted vnode names, other sources are matched with
+    their compiled pattern.
+    """
+
+    __vnodes: List[str]
+    __order: List[int]
+    __sorted: List[str]
+
+    def __init__(self, vnodes: List[str]):
+        """!
+        @brief create a new index.
+
+        @param vnodes list of virtual node names.
+        """
+        self.__vnodes = vnodes
+        self.__order = sorted(range(len(vnodes)), key = lambda i: vnodes[i])
+        self.__sorted = [vnodes[i] for i in self.__order]
+
+    def match(self, binding: Binding) -> List[str]:
+        """!
+        @brief get virtual nodes that the given binding applies to.
+
+        @param binding binding.
+
+        @returns list of virtual node names, in the order they were given to
+        the index.
+        """
+        literal = binding.getLiteralSource()
+
+        if literal == None:
+            pattern = binding.getSourcePattern()
+            return [vnode for vnode in self.__vnodes if pattern.match(vnode)]
+
+        hits: List[int] = []
+
+        for pos in range(bisect_left(self.__sorted, literal), len(self.__sorted)):
+            if not self.__sorted[pos].startswith(literal): break
+            hits.append(self.__order[pos])
+
+        return [self.__vnodes[i] for i in sorted(hits)]
+
+class CandidateIndex(object):
+    """!
+    @brief index of host nodes for resolving binding filters.
+
+    The index is built from the hnodes in the registry and answers the asn, ip,
+    prefix and (literal) node name conditions of a filter with lookups instead
+    of testing every host. Candidates are returned in registration order, same
+    as walking the registry.
+    """
+
+    __registry: Registry
+    __version: int = -1
+    __nodes: List[Node]
+    __names: List[Tuple[str, int]]
+    __asns: Dict[int, List[int]]
+    __ips: Dict[str, List[int]]
+    __addresses: List[Tuple[int, int]]
+
+    def __init__(self, registry: Registry):
+        """!
+        @brief build a new index.
+
+        @param registry registry to index hnodes from.
         """
-        print('==== Binding: {}: {}'.format(self.source, message), file=stderr)
\ No newline at end of file
+        self.__registry = registry
+        self.__nodes = []
+        self.__names = []
+        self.__asns = {}
+        self.__ips = {}
+        self.__addresses = []
+
+        for (_, obj) in registry.iterNodes({'hnode'}):
+            self.__index(obj)
+
+        self.__names.sort()
+        self.__addresses.sort()
+        self.__version = registry.getVersion()
+
+    def __index(self, node: Node):
+        """!
+        @brief add a node to the lookup tables. New name and address entries
+        are appended to the end of the sorted lists and need to be sorted by
+        the caller.
+
+        @param node node.
+        """
+        pos = len(self.__nodes)
+        self.__nodes.append(node)
+
+        (_, _, name) = node.getRegistryInfo()
+        self.__names.append((name, pos))
+        self.__asns.setdefault(node.getAsn(), []).append(pos)
+
+        for iface in node.getInterfaces():
+            address = iface.getAddress()
+            if address == None: continue
+            self.__ips.setdefault(str(address), []).append(pos)
+            self.__addresses.append((int(address), pos))
+
+    def isStale(self) -> bool:
+        """!
+        @brief test if objects have been registered since the index was built.
+
+        @returns True if the index needs to be rebuilt.
+        """
+        return self.__version != self.__registry.getVersion()
+
+    def add(self, node: Node):
+        """!
+        @brief add a newly registered (and configured) host to the index.
+
+        @param node node.
+        """
+        names = len(self.__names)
+        addresses = len(self.__addresses)
+
+        self.__index(node)
+
+        newNames = self.__names[names:]
+        del self.__names[names:]
+        for entry in newNames: insort(self.__names, entry)
+
+        newAddresses = self.__addresses[addresses:]
+        del self.__addresses[addresses:]
+        for entry in newAddresses: insort(self.__addresses, entry)
+
+        self.__version = self.__registry.getVersion()
+
+    def __inPrefix(self, prefix: str) -> Set[int]:
+        """!
+        @brief find nodes with an address in the host range of a prefix.
+
+        @param prefix prefix.
+
+        @returns set of node positions.
+        """
+        net = IPv4Network(prefix)
+        first = int(net.network_address)
+        last = int(net.broadcast_address)
+
+        # same range as net.hosts().
+        if net.prefixlen < 31:
+            first += 1
+            last -= 1
+
+        lo = bisect_left(self.__addresses, (first, -1))
+        hi = bisect_right(self.__addresses, (last, len(self.__nodes)))
+
+        return set(pos for (_, pos) in self.__addresses[lo:hi])
+
+    def __withName(self, literal: str) -> Set[int]:
+        """!
+        @brief find nodes with a name starting with the given string.
+
+        @param literal name prefix.
+
+        @returns set of node positions.
+        """
+        hits: Set[int] = set()
+
+        for i in range(bisect_left(self.__names, (literal, -1)), len(self.__names)):
+            (name, pos) = self.__names[i]
+            if not name.startswith(literal): break
+            hits.add(pos)
+
+        return hits
+
+    def __matches(self, node: Node, filter: Filter, net: IPv4Network, literal: str) -> bool:
+        """!
+        @brief test a node against the asn, ip, prefix and literal node name
+        conditions of a filter.
+
+        @param node node.
+        @param filter filter.
+        @param net network of the prefix condition, or None.
+        @param literal literal node name condition, or None.
+
+        @returns True if the node matches all of them.
+        """
+        if filter.asn != None and node.getAsn() != filter.asn: return False
+        if literal != None and not node.getRegistryInfo()[2].startswith(literal): return False
+
+        if filter.ip == None and net == None: return True
+
+        addresses = [iface.getAddress() for iface in node.getInterfaces() if iface.getAddress() != None]
+
+        if filter.ip != None and not any(str(address) == filter.ip for address in addresses): return False
+
+        # same range as net.hosts().
+        if net != None and not any(address in net and (net.prefixlen >= 31 or address not in (net.network_address, net.broadcast_address)) for address in addresses): return False
+
+        return True
+
+    def getCandidates(self, filter: Filter) -> Iterator[Node]:
+        """!
+        @brief get hosts matching the asn, ip, prefix and literal node name
+        conditions of a filter.
+
+        Nodes are produced one at a time, so a caller that stops at the first
+        match does not pay for the rest. The most selective condition is
+        answered by the index, and the others are tested as nodes are
+        produced.
+
+        Regexp node names, custom functions and the bound attribute are not
+        handled by the index and must be tested by the caller.
+
+        @param filter filter.
+
+        @returns iterator of nodes, in registration order.
+        """
+        literal = filter.nodeName
+        if literal != None and any(c in REGEX_SPECIAL_CHARS for c in literal): literal = None
+
+        net = IPv4Network(filter.prefix) if filter.prefix != None else None
+
+        # position lists of ip and asn are kept in registration order.
+        positions: List[int] = None
+
+        if filter.ip != None: positions = self.__ips.get(filter.ip, [])
+        elif filter.asn != None: positions = self.__asns.get(filter.asn, [])
+        elif net != None: positions = sorted(self.__inPrefix(filter.prefix))
+        elif literal != None: positions = sorted(self.__withName(literal))
+
+        if positions == None: return iter(self.__nodes)
+
+        return (self.__nodes[pos] for pos in positions if self.__matches(self.__nodes[pos], filter, net, literal))
@@ -1,8 +1,14 @@
 from seedemu.core.Emulator import Emulator
 from seedemu.core import Registry
-from os import mkdir, chdir, getcwd, path
+from os import mkdir, chdir, getcwd, path, walk, listdir, replace, remove
 from shutil import rmtree
-from sys import stderr, exit
+from tempfile import mkdtemp
+from filecmp import cmp
+from hashlib import md5
+from typing import Dict, Set, Tuple
+from sys import exit
+from .Logger import getLogger
+from .enums import LogLevel
 
 class Compiler:
     """!
@@ -31,7 +37,7 @@ class Compiler:
         """
         raise NotImplementedError('getName not implemented.')
 
-    def compile(self, emulator: Emulator, output: str, override: bool = False):
+    def compile(self, emulator: Emulator, output: str, override: bool = False, incremental: bool = False):
         """!
         @brief Compile the simulation.
 
@@ -39,26 +45,171 @@ class Compiler:
         @param output output directory path.
         @param override (optional) override the output folder if it already
         exist. False by default.
+        @param incremental (optional) update the output folder in place if it
+        already exist: the emulation is compiled to a staging folder next to
+        it, and only files and folders whose content changed are written to
+        the output folder. Folders of nodes that no longer exist are removed.
+        Unchanged node folders are not touched, so docker only rebuilds
+        images that actually changed. False by default.
         """
         assert emulator.rendered(), 'Simulation needs to be rendered before compile.'
 
         cur = getcwd()
+        if incremental and path.isdir(output):
+            self.__compileIncremental(emulator, output)
+            return
+
         if path.exists(output):
             if override:
-                self._log('output folder "{}" already exist, overriding.'.format(output))
+                self._log('output folder "{}" already exist, overriding.', output)
                 rmtree(output)
             else:
-                self._log('output folder "{}" already exist. Set "override = True" when calling compile() to override.'.format(output))
+                self._log('output folder "{}" already exist. Set "override = True" when calling compile() to override.', output, level = LogLevel.Error)
                 exit(1)
         mkdir(output)
         chdir(output)
         self._doCompile(emulator)
         chdir(cur)
 
-    def _log(self, message: str) -> None:
+    def __compileIncremental(self, emulator: Emulator, output: str):
+        """!
+        @brief Compile the simulation to a staging folder, then merge changes
+        into the existing output folder.
+
+        @param emulator emulator object.
+        @param output output directory path.
+        """
+        output = path.abspath(output)
+
+        # stage next to the output folder, so relative paths used in the
+        # emulation resolve the same way and files can be moved, not copied.
+        staging = mkdtemp(prefix = '.{}.'.format(path.basename(output)), dir = path.dirname(output))
+
+        cur = getcwd()
+        try:
+            chdir(staging)
+            self._doCompile(emulator)
+            chdir(cur)
+
+            (new_prints, new_contexts) = self.__fingerprint(staging)
+            (old_prints, old_contexts) = self.__fingerprint(output)
+
+            self.__merge(staging, output, '.', new_prints, old_prints)
+        finally:
+            chdir(cur)
+            rmtree(staging, ignore_errors = True)
+
+        added = sorted(new_contexts - old_contexts)
+        removed = sorted(old_contexts - new_contexts)
+        changed = sorted(c for c in new_contexts & old_contexts if new_prints[c] != old_prints[c])
+        unchanged = len(new_contexts & old_contexts) - len(changed)
+
+        for context in added: self._log('incremental compile: added {}.', context, level = LogLevel.Debug)
+        for context in changed: self._log('incremental compile: changed {}.', context, level = LogLevel.Debug)
+        for context in removed: self._log('incremental compile: removed {}.', context, level = LogLevel.Debug)
+
+        self._log('incremental compile: {} added, {} changed, {} removed, {} unchanged.',
+            len(added), len(changed), len(removed), unchanged
+        )
+
+    def __fingerprint(self, root: str) -> Tuple[Dict[str, str], Set[str]]:
+        """!
+        @brief Hash the content of every folder in a tree.
+
+        @param root root of the tree.
+
+        @returns tuple of a dict of folder path (relative to root) to hash of
+        everything in the folder, and the set of folders that are build
+        contexts (i.e., has a Dockerfile in it).
+        """
+        prints: Dict[str, str] = {}
+        contexts: Set[str] = set()
+
+        for (dirpath, dirnames, filenames) in walk(root, topdown = False):
+            rel = path.relpath(dirpath, root)
+            digest = md5()
+
+            for name in sorted(filenames):
+                file_digest = md5()
+                with open(path.join(dirpath, name), 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 16), b''): file_digest.update(chunk)
+                digest.update('f {} {}\n'.format(name, file_digest.hexdigest()).encode('utf-8'))
+
+            for name in sorted(dirnames):
+                digest.update('d {} {}\n'.format(name, prints.get(path.join(rel, name) if rel != '.' else name, '')).encode('utf-8'))
+
+            prints[rel] = digest.hexdigest()
+            if 'Dockerfile' in filenames: contexts.add(rel)
+
+        return (prints, contexts)
+
+    def __merge(self, src: str, dst: str, rel: str, newPrints: Dict[str, str], oldPrints: Dict[str, str]):
+        """!
+        @brief Move changed files from the staging folder to the output folder,
+        and remove files that are no longer generated.
+
+        @param src staging folder.
+        @param dst output folder.
+        @param rel path of the folder being merged, relative to the roots.
+        @param newPrints folder hashes of the staging folder.
+        @param oldPrints folder hashes of the output folder.
+        """
+        if newPrints.get(rel) == oldPrints.get(rel): return
+
+        src_dir = path.join(src, rel)
+        dst_dir = path.join(dst, rel)
+
+        new_names = set(listdir(src_dir))
+
+        for name in sorted(set(listdir(dst_dir)) - new_names):
+            target = path.join(dst_dir, name)
+            if path.isdir(target) and not path.islink(target): rmtree(target)
+            else: remove(target)
+
+        for name in sorted(new_names):
+            child = path.join(rel, name) if rel != '.' else name
+            source = path.join(src_dir, name)
+            target = path.join(dst_dir, name)
+
+            if path.isdir(source):
+                if path.exists(target) and not path.isdir(target): remove(target)
+
+                # new folders are merged file by file as well, so every file
+                # goes through _mergeFile.
+                if not path.exists(target): mkdir(target)
+                self.__merge(src, dst, child, newPrints, oldPrints)
+
+                continue
+
+            if path.isdir(target): rmtree(target)
+            if path.exists(target) and cmp(source, target, shallow = False): continue
+
+            self._mergeFile(source, target, dst)
+
+    def _mergeFile(self, source: str, target: str, output: str):
+        """!
+        @brief Move a new or changed file from the staging folder to the
+        output folder, during an incremental compile.
+
+        The file is always replaced by rename, never written in place, so
+        other hard links to the old file are not changed. Compiler drivers
+        that hard-link files (e.g., to share them between nodes) can override
+        this to link the file again in the output folder.
+
+        @param source path of the file in the staging folder.
+        @param target path of the file in the output folder.
+        @param output output folder.
+        """
+        replace(source, target)
+
+    def _log(self, message: str, *args, level: LogLevel = LogLevel.Info) -> None:
         """!
         @brief Log to stderr.
 
-        @param message message.
+        @param message message, or format string if args are given.
+        @param args (optional) format arguments, only applied if the message
+        is printed.
+        @param level (optional) log level. Default to info.
         """
-        print("== {}Compiler: {}".format(self.getName(), message), file=stderr)
+        logger = getLogger()
+        if logger.isEnabled(level): logger.log(level, '== {}Compiler'.format(self.getName()), message, *args)
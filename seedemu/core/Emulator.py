@@ -1,13 +1,18 @@
 from __future__ import annotations
-from seedemu.core.enums import NetworkType, NodeRole
+from seedemu.core.enums import NetworkType, NodeRole, LogLevel
 from .Merger import Mergeable, Merger
 from .Registry import Registry, Registrable, Printable
 from .Network import Network
+from .Profiler import Profiler
+from .Snapshot import Snapshot
+from .RenderCache import RenderCache
+from .Logger import getLogger
 from seedemu import core
 from typing import Dict, Set, Tuple, List
 from sys import prefix, stderr
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from ipaddress import IPv4Network
-import pickle
 
 class BindingDatabase(Registrable, Printable):
     """!
@@ -85,6 +90,9 @@ class Emulator:
     __rendered: bool
     __bindings: BindingDatabase
     __resolved_bindings: Dict[str, core.Node]
+    __candidate_index: core.CandidateIndex
+    __profiler: Profiler
+    __render_cache: RenderCache
 
     __service_net: Network
     __service_net_prefix: str
@@ -102,6 +110,9 @@ class Emulator:
         self.__rendered = False
         self.__dependencies_db = {}
         self.__resolved_bindings = {}
+        self.__candidate_index = None
+        self.__profiler = None
+        self.__render_cache = None
         self.__registry = Registry()
         self.__layers = LayerDatabase()
         self.__bindings = BindingDatabase()
@@ -112,57 +123,165 @@ class Emulator:
         self.__service_net_prefix = '192.168.160.0/23'
         self.__service_net = None
 
-    def __render(self, layerName, optional: bool, configure: bool):
+    def __getRenderOrder(self) -> List[str]:
         """!
-        @brief Render a layer.
-        
+        @brief Resolve the layer dependency graph to the order layers are
+        rendered in.
+
+        Dependencies come before the layers that depend on them; otherwise,
+        layers are in the order they were added. Missing optional dependencies
+        are ignored.
+
+        @throws AssertionError if a required dependency is missing, or if the
+        dependencies form a cycle.
+
+        @returns list of layer names.
+        """
+        names = list(self.__layers.db.keys())
+
+        order: List[str] = []
+        state: Dict[str, int] = {}
+        path: List[str] = []
+
+        def visit(name: str):
+            if state.get(name) == 2: return
+
+            if state.get(name) == 1:
+                cycle = path[path.index(name):] + [name]
+                assert False, 'layer dependency cycle: {}'.format(' -> '.join(cycle))
+
+            state[name] = 1
+            path.append(name)
+
+            for dep in self.__getDependenciesOf(name):
+                self.__log('{}: depends on: {}', name, dep, level = LogLevel.Debug)
+                visit(dep)
+
+            path.pop()
+            state[name] = 2
+            order.append(name)
+
+        for name in names: visit(name)
+
+        return order
+
+    def __getDependenciesOf(self, layerName: str) -> List[str]:
+        """!
+        @brief Get the dependencies of a layer that are in the emulation.
+
         @param layerName name of layer.
-        @throws AssertionError if dependencies unmet 
+
+        @throws AssertionError if a required dependency is missing.
+
+        @returns list of layer names, in the order the layers were added.
         """
-        verb = 'configure' if configure else 'render'
+        names = list(self.__layers.db.keys())
+        deps: List[str] = []
 
-        self.__log('requesting {}: {}'.format(verb, layerName))
+        for (dep, optional) in self.__dependencies_db.get(layerName, set()):
+            if dep not in self.__layers.db:
+                assert optional, 'Layer {} requried but missing'.format(dep)
+                self.__log('{}: {} not found but is optional, skipping', layerName, dep, level = LogLevel.Debug)
+                continue
 
-        if optional and layerName not in self.__layers.db:
-            self.__log('{}: not found but is optional, skipping'.format(layerName))
-            return
+            if dep not in deps: deps.append(dep)
+
+        return sorted(deps, key = names.index)
+
+    def __render(self, layerName: str, configure: bool, parent: core.ProfileEntry = None):
+        """!
+        @brief Render a layer. Dependencies must already be rendered.
+
+        @param layerName name of layer.
+        @param configure configure the layer if True, render it otherwise.
+        @param parent (optional) profile entry to attach the profile of the
+        layer to, when rendering on a worker thread.
+        """
+        verb = 'configure' if configure else 'render'
+
+        self.__log('requesting {}: {}', verb, layerName, level = LogLevel.Debug)
 
         assert layerName in self.__layers.db, 'Layer {} requried but missing'.format(layerName)
 
         (layer, done) = self.__layers.db[layerName]
         if done:
-            self.__log('{}: already done, skipping'.format(layerName))
+            self.__log('{}: already done, skipping', layerName, level = LogLevel.Debug)
+            return
+
+        self.__log('entering {}...', layerName)
+
+        with self.__profile(layerName, parent):
+            hooks: List[core.Hook] = []
+            for hook in self.__registry.getByType('seedemu', 'hook'):
+                if hook.getTargetLayer() == layerName: hooks.append(hook)
+
+            if configure:
+                self.__log('invoking pre-configure hooks for {}...', layerName, level = LogLevel.Debug)
+                for hook in hooks:
+                    with self.__profile('{}.preconfigure'.format(hook.getName())): hook.preconfigure(self)
+                self.__log('configureing {}...', layerName, level = LogLevel.Debug)
+                with self.__profile('configure'): layer.configure(self)
+                self.__log('invoking post-configure hooks for {}...', layerName, level = LogLevel.Debug)
+                for hook in hooks:
+                    with self.__profile('{}.postconfigure'.format(hook.getName())): hook.postconfigure(self)
+            else:
+                self.__log('invoking pre-render hooks for {}...', layerName, level = LogLevel.Debug)
+                for hook in hooks:
+                    with self.__profile('{}.prerender'.format(hook.getName())): hook.prerender(self)
+                self.__log('rendering {}...', layerName, level = LogLevel.Debug)
+                with self.__profile('render'): layer.render(self)
+                self.__log('invoking post-render hooks for {}...', layerName, level = LogLevel.Debug)
+                for hook in hooks:
+                    with self.__profile('{}.postrender'.format(hook.getName())): hook.postrender(self)
+
+        self.__log('done: {}', layerName)
+        self.__layers.db[layerName] = (layer, True)
+
+    def __renderLayers(self, order: List[str], configure: bool, workers: int, deterministic: bool, parent: core.ProfileEntry = None):
+        """!
+        @brief Render layers, running layers that do not depend on each other
+        in parallel if more than one worker is used.
+
+        @param order layers to render, in dependency order.
+        @param configure configure the layers if True, render them otherwise.
+        @param workers number of worker threads.
+        @param deterministic run the layers one by one, in order, even if more
+        than one worker is used. Parallel runs can not be made to give the
+        same output, see render.
+        @param parent (optional) profile entry to attach the profile of the
+        layers to.
+        """
+        if workers <= 1 or deterministic:
+            for layerName in order: self.__render(layerName, configure)
             return
 
-        if layerName in self.__dependencies_db:
-            for (dep, opt) in self.__dependencies_db[layerName]:
-                self.__log('{}: requesting dependency render: {}'.format(layerName, dep))
-                self.__render(dep, opt, configure)
+        position = { name: i for (i, name) in enumerate(order) }
+        waiting = { name: len(self.__getDependenciesOf(name)) for name in order }
+        dependents: Dict[str, List[str]] = { name: [] for name in order }
 
-        self.__log('entering {}...'.format(layerName))
+        for name in order:
+            for dep in self.__getDependenciesOf(name): dependents[dep].append(name)
+
+        with ThreadPoolExecutor(workers) as pool:
+            ready = [name for name in order if waiting[name] == 0]
+            running: Dict[Future, str] = {}
+
+            while len(ready) > 0 or len(running) > 0:
+                for name in ready: running[pool.submit(self.__render, name, configure, parent)] = name
+                ready = []
+
+                (finished, _) = wait(list(running.keys()), return_when = FIRST_COMPLETED)
+
+                for future in finished:
+                    name = running.pop(future)
+                    future.result()
+
+                    for dependent in dependents[name]:
+                        waiting[dependent] -= 1
+                        if waiting[dependent] == 0: ready.append(dependent)
+
+                ready.sort(key = lambda name: position[name])
 
-        hooks: List[core.Hook] = []
-        for hook in self.__registry.getByType('seedemu', 'hook'):
-            if hook.getTargetLayer() == layerName: hooks.append(hook)
-        
-        if configure:
-            self.__log('invoking pre-configure hooks for {}...'.format(layerName))
-            for hook in hooks: hook.preconfigure(self)
-            self.__log('configureing {}...'.format(layerName))
-            layer.configure(self)
-            self.__log('invoking post-configure hooks for {}...'.format(layerName))
-            for hook in hooks: hook.postconfigure(self)
-        else:
-            self.__log('invoking pre-render hooks for {}...'.format(layerName))
-            for hook in hooks: hook.prerender(self)
-            self.__log('rendering {}...'.format(layerName))
-            layer.render(self)
-            self.__log('invoking post-render hooks for {}...'.format(layerName))
-            for hook in hooks: hook.postrender(self)
-        
-        self.__log('done: {}'.format(layerName))
-        self.__layers.db[layerName] = (layer, True)
-    
     def __loadDependencies(self, deps: Dict[str, Set[Tuple[str, bool]]]):
         """!
         @brief Load dependencies list.
@@ -176,13 +295,31 @@ class Emulator:
 
             self.__dependencies_db[layer] |= deps
 
-    def __log(self, message: str):
+    @contextmanager
+    def __profile(self, name: str, parent: core.ProfileEntry = None):
+        """!
+        @brief profile a section of the render, if profiling is enabled.
+
+        @param name name of the section.
+        @param parent (optional) profile entry to nest the section under.
+        Default to the current section.
+        """
+        if self.__profiler == None:
+            yield None
+            return
+
+        with self.__profiler.section(name, parent) as entry: yield entry
+
+    def __log(self, message: str, *args, level: LogLevel = LogLevel.Info):
         """!
         @brief log to stderr.
 
-        @param message message.
+        @param message message, or format string if args are given.
+        @param args (optional) format arguments, only applied if the message
+        is printed.
+        @param level (optional) log level. Default to info.
         """
-        print('== Emulator: {}'.format(message), file=stderr)
+        getLogger().log(level, '== Emulator', message, *args)
 
     def rendered(self) -> bool:
         """!
@@ -298,6 +435,76 @@ class Emulator:
         assert vnode in self.__resolved_bindings, 'failed to find binding for vnode {}.'.format(vnode)
         return self.__resolved_bindings[vnode]
 
+    def getCandidateIndex(self) -> core.CandidateIndex:
+        """!
+        @brief get the index of host nodes used to resolve binding filters.
+
+        The index is built on first use and rebuilt when new objects have been
+        registered since.
+
+        @returns candidate index.
+        """
+        if self.__candidate_index == None or self.__candidate_index.isStale():
+            self.__candidate_index = core.CandidateIndex(self.__registry)
+
+        return self.__candidate_index
+
+    def enableProfiling(self, memory: bool = True) -> Emulator:
+        """!
+        @brief enable the render profiler.
+
+        When enabled, wall time, CPU time, peak memory allocation and number of
+        registry objects touched are recorded for every render phase, layer,
+        configure/render call and hook call. Use getProfiler to get the
+        results after render.
+
+        @param memory (optional) track peak memory allocation. Memory tracking
+        slows down the render. Default to True.
+
+        @returns self, for chaining API calls.
+        """
+        self.__profiler = Profiler(memory)
+
+        return self
+
+    def enableRenderCache(self, path: str) -> Emulator:
+        """!
+        @brief enable the render cache.
+
+        When enabled, render looks for a result of rendering the same
+        emulation with the same version of the library in the cache directory,
+        and loads it instead of rendering if found. Otherwise, the emulation is
+        rendered and the result is saved to the cache. This allows rendering a
+        topology once and compiling it many times, with different compilers or
+        from different processes.
+
+        Emulations that can not be pickled (e.g., a binding filter uses a
+        lambda) are rendered as usual, without the cache.
+
+        @param path path to the cache directory.
+
+        @returns self, for chaining API calls.
+        """
+        self.__render_cache = RenderCache(path)
+
+        return self
+
+    def getRenderCache(self) -> RenderCache:
+        """!
+        @brief get the render cache.
+
+        @returns render cache, or None if not enabled.
+        """
+        return self.__render_cache
+
+    def getProfiler(self) -> Profiler:
+        """!
+        @brief get the render profiler.
+
+        @returns profiler, or None if profiling is not enabled.
+        """
+        return self.__profiler
+
     def getServiceNetwork(self) -> Network:
         """!
         @brief get the for-service network of this emulation. If one does not
@@ -314,66 +521,142 @@ class Emulator:
 
         return self.__service_net
 
-    def render(self) -> Emulator:
+    def __renderAll(self, workers: int, deterministic: bool):
         """!
-        @brief Render to emulation.
+        @brief Render all layers: configure base, resolve bindings, then
+        configure and render every layer.
 
-        @throws AssertionError if dependencies unmet 
-        
-        @returns self, for chaining API calls.
-        """
-        assert not self.__rendered, 'already rendered.'
+        @param workers number of worker threads.
+        @param deterministic run layers one by one, even with more than one
+        worker.
 
+        @throws AssertionError if dependencies unmet
+        """
         for (layer, _) in self.__layers.db.values():
             self.__loadDependencies(layer.getDependencies())
 
+        order = self.__getRenderOrder()
+        self.__log('render order: {}', ', '.join(order), level = LogLevel.Debug)
+
         # render base first
-        self.__render('Base', False, True)
+        with self.__profile('configure'): self.__render('Base', True)
+
+        with self.__profile('bindings'):
+            # collect all pending vnode names
+            self.__log('collecting virtual node names in the emulation...')
+            vnodes: List[str] = []
+            for (layer, _) in self.__layers.db.values():
+                if not isinstance(layer, core.Service): continue
+                for (vnode, _) in layer.getPendingTargets().items():
+                    assert vnode not in vnodes, 'duplicated vnode: {}'.format(vnode)
+                    vnodes.append(vnode)
+            self.__log('found {} virtual nodes.', len(vnodes))
+
+            # resolv bindings for all vnodes
+            self.__log('resolving binding for all virtual nodes...')
+            vnodeIndex = core.VirtualNodeIndex(vnodes)
+            for binding in self.getBindings():
+                for vnode in vnodeIndex.match(binding):
+                    if vnode in self.__resolved_bindings: continue
+                    pnode = binding.getCandidate(vnode, self)
+                    if pnode == None: continue
+                    self.__log('vnode {} bound to as{}/{}', vnode, pnode.getAsn(), pnode.getName(), level = LogLevel.Debug)
+                    self.__resolved_bindings[vnode] = pnode
+
+            self.__log('applying changes made to virtual physical nodes to real physical nodes...')
+            vpnodes = self.__bindings.vpnodes
+            for (vnode, pnode) in self.__resolved_bindings.items():
+                if not vnode in vpnodes: continue
+                vpnode = vpnodes[vnode]
+
+                self.__log('applying changes made on vnode {} to pnode as{}/{}...', vnode, pnode.getAsn(), pnode.getName(), level = LogLevel.Debug)
+                pnode.copySettings(vpnode)
+
+        with self.__profile('configure') as phase:
+            self.__renderLayers(order, True, workers, deterministic, phase)
 
-        # collect all pending vnode names
-        self.__log('collecting virtual node names in the emulation...')
-        vnodes: List[str] = []
-        for (layer, _) in self.__layers.db.values():
-            if not isinstance(layer, core.Service): continue
-            for (vnode, _) in layer.getPendingTargets().items():
-                assert vnode not in vnodes, 'duplicated vnode: {}'.format(vnode)
-                vnodes.append(vnode)
-        self.__log('found {} virtual nodes.'.format(len(vnodes)))
-
-        # resolv bindings for all vnodes
-        self.__log('resolving binding for all virtual nodes...')
-        for binding in self.getBindings():
-            for vnode in vnodes:
-                if vnode in self.__resolved_bindings: continue
-                pnode = binding.getCandidate(vnode, self)
-                if pnode == None: continue
-                self.__log('vnode {} bound to as{}/{}'.format(vnode, pnode.getAsn(), pnode.getName()))
-                self.__resolved_bindings[vnode] = pnode
+        # FIXME
+        for (name, (layer, _)) in self.__layers.db.items():
+            self.__layers.db[name] = (layer, False)
 
-        self.__log('applying changes made to virtual physical nodes to real physical nodes...')
-        vpnodes = self.__bindings.vpnodes
-        for (vnode, pnode) in self.__resolved_bindings.items():
-            if not vnode in vpnodes: continue
-            vpnode = vpnodes[vnode]
+        with self.__profile('render') as phase:
+            self.__renderLayers(order, False, workers, deterministic, phase)
 
-            self.__log('applying changes made on vnode {} to pnode as{}/{}...'.format(vnode, pnode.getAsn(), pnode.getName()))
-            pnode.copySettings(vpnode)
+    def render(self, workers: int = 1, deterministic: bool = True) -> Emulator:
+        """!
+        @brief Render to emulation.
 
-        for layerName in self.__layers.db.keys():
-            self.__render(layerName, False, True)
+        Layers are scheduled from their dependency graph: a layer is
+        configured (and later rendered) only after all the layers it depends
+        on. With more than one worker and deterministic set to False, layers
+        that do not depend on each other run at the same time on a thread pool.
 
-        # FIXME
-        for (name, (layer, _)) in self.__layers.db.items():
-            self.__layers.db[name] = (layer, False)
+        Layers that do not depend on each other still change the same objects
+        (e.g., Routing, Ospf and a service all add start commands and files to
+        the same nodes), so in parallel mode the order of start commands,
+        files and registered objects depends on thread scheduling, and the
+        compiled output can differ between runs. Use parallel mode only when
+        the order does not matter.
+
+        There is no mode that runs layers in parallel and still gives the same
+        output as running them one by one. Layers change nodes directly and
+        read back what they changed, so their changes can not be held back
+        and applied in order later. Deterministic mode runs layers one by one
+        instead.
+
+        If the render cache is enabled, a cached result of rendering the same
+        emulation is loaded instead, when there is one. See enableRenderCache.
+
+        @param workers (optional) number of worker threads to run independent
+        layers on. Default to 1, which runs layers one by one.
+        @param deterministic (optional) run layers one by one, in order, so
+        the output is the same on every run, even if more than one worker is
+        given. This ignores workers. Set to False to run layers in parallel,
+        without the same output guarantee. Default to True.
+
+        @throws AssertionError if dependencies unmet or form a cycle.
 
-        for layerName in self.__layers.db.keys():
-            self.__render(layerName, False, False)
+        @returns self, for chaining API calls.
+        """
+        assert not self.__rendered, 'already rendered.'
+        assert workers >= 1, 'workers must be at least 1.'
+
+        if workers > 1 and deterministic:
+            self.__log('deterministic render: running layers one by one. Set deterministic = False to run them in parallel.', level = LogLevel.Warning)
+
+        key = None
+        if self.__render_cache != None:
+            key = self.__render_cache.getKey((self.__registry, self.__resolved_bindings, self.__service_net_prefix))
+            state = self.__render_cache.load(key) if key != None else None
+
+            if state != None:
+                self.__log('render cache hit: {}, loading rendered emulation...', key)
+                (self.__registry, self.__resolved_bindings, self.__service_net) = state
+                self.__layers = self.__registry.get('seedemu', 'dict', 'layersdb')
+                self.__bindings = self.__registry.get('seedemu', 'list', 'bindingdb')
+                self.__candidate_index = None
+                self.__rendered = True
+
+                return self
+
+            if key != None: self.__log('render cache miss: {}', key)
+
+        if self.__profiler != None: self.__profiler.start(self.__registry)
+
+        try:
+            self.__renderAll(workers, deterministic)
+        finally:
+            if self.__profiler != None: self.__profiler.stop()
 
         self.__rendered = True
 
+        if key != None:
+            self.__log('saving rendered emulation to render cache...')
+            self.__render_cache.store(key, (self.__registry, self.__resolved_bindings, self.__service_net))
+
         return self
 
-    def compile(self, compiler: core.Compiler, output: str, override: bool = False) -> Emulator:
+    def compile(self, compiler: core.Compiler, output: str, override: bool = False, incremental: bool = False) -> Emulator:
         """!
         @brief Compile the simulation.
 
@@ -381,10 +664,12 @@ class Emulator:
         @param output output directory path.
         @param override (optional) override the output folder if it already
         exist. False by defualt.
+        @param incremental (optional) only rewrite the parts of an existing
+        output folder that changed. See Compiler.compile. False by default.
 
         @returns self, for chaining API calls.
         """
-        compiler.compile(self, output, override)
+        compiler.compile(self, output, override, incremental)
 
         return self
     
@@ -506,19 +791,23 @@ class Emulator:
 
         return new_sim
 
-    def dump(self, fileName: str) -> Emulator:
+    def dump(self, fileName: str, compression: str = None) -> Emulator:
         """!
         @brief dump the emulation to file.
 
+        The emulation is saved as a versioned binary snapshot. See Snapshot.
+
         @param fileName output path.
+        @param compression (optional) compression codec: "zstd" (needs the
+        zstandard package), "lz4" (needs the lz4 package), or None for no
+        compression. Default to None.
         @throws AssertionError if the emulation is already rendered.
 
         @returns self, for chaining API calls.
         """
 
         assert not self.__rendered, 'cannot dump emulation after render.'
-        with open(fileName, 'wb') as f:
-            pickle.dump(self.__registry, f)
+        Snapshot.write(fileName, self.__registry, compression)
 
         return self
 
@@ -526,16 +815,19 @@ class Emulator:
         """!
         @brief load emulation from file.
 
+        Both snapshots and plain pickle dumps made by older versions are
+        accepted.
+
         @param fileName path to the dumped emulation.
 
         @returns self, for chaining API calls.
         """
 
-        with open(fileName, 'rb') as f:
-            self.__rendered = False
-            self.__dependencies_db = {}
-            self.__registry = pickle.load(f)
-            self.__layers = self.__registry.get('seedemu', 'dict', 'layersdb')
-            self.__bindings = self.__registry.get('seedemu', 'list', 'bindingdb')
+        self.__rendered = False
+        self.__dependencies_db = {}
+        self.__registry = Snapshot.read(fileName)
+        self.__candidate_index = None
+        self.__layers = self.__registry.get('seedemu', 'dict', 'layersdb')
+        self.__bindings = self.__registry.get('seedemu', 'list', 'bindingdb')
 
         return self
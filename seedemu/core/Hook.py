@@ -1,18 +1,25 @@
 from .Emulator import Emulator
 from .Registry import Registrable
 from .Printable import Printable
-from sys import stderr
+from .Logger import getLogger
+from .enums import LogLevel
 
 class Hook(Registrable, Printable):
     """!
     @brief Hook into the rendering procress.
     """
 
-    def _log(self, message: str) -> None:
+    def _log(self, message: str, *args, level: LogLevel = LogLevel.Info) -> None:
         """!
         @brief Log to stderr.
+
+        @param message message, or format string if args are given.
+        @param args (optional) format arguments, only applied if the message
+        is printed.
+        @param level (optional) log level. Default to info.
         """
-        print("==== {}Hook: {}".format(self.getName(), message), file=stderr)
+        logger = getLogger()
+        if logger.isEnabled(level): logger.log(level, '==== {}Hook'.format(self.getName()), message, *args)
 
     def getName(self) -> str:
         """!
@@ -6,7 +6,8 @@ from .Emulator import Emulator
 from .Configurable import Configurable
 from .Merger import Mergeable
 
-from sys import stderr
+from .Logger import getLogger
+from .enums import LogLevel
 from typing import Set, Dict, Tuple
 
 
@@ -91,8 +92,14 @@ class Layer(Printable, Registrable, Configurable, Mergeable):
         """
         raise NotImplementedError('render not implemented')
 
-    def _log(self, message: str) -> None:
+    def _log(self, message: str, *args, level: LogLevel = LogLevel.Info) -> None:
         """!
         @brief Log to stderr.
+
+        @param message message, or format string if args are given.
+        @param args (optional) format arguments, only applied if the message
+        is printed.
+        @param level (optional) log level. Default to info.
         """
-        print("==== {}Layer: {}".format(self.getName(), message), file=stderr)
+        logger = getLogger()
+        if logger.isEnabled(level): logger.log(level, '==== {}Layer'.format(self.getName()), message, *args)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+from .enums import LogLevel
+from os import environ
+import sys
+
+class Logger(object):
+    """!
+    @brief The Logger class.
+
+    All components log through one logger, so the amount of output can be
+    controlled in one place. Messages below the logger's level are dropped
+    before they are formatted: pass the format arguments to log() instead of
+    formatting the message at the call site, and a filtered-out message costs
+    only a comparison.
+
+    The default level is taken from the SEEDEMU_LOG_LEVEL environment variable
+    (debug, info, warning or error), or info if not set. Per-node messages are
+    logged at debug level.
+    """
+
+    __level: LogLevel
+
+    def __init__(self, level: LogLevel = LogLevel.Info):
+        """!
+        @brief create a new logger.
+
+        @param level (optional) minimum level of messages to print. Default to
+        info.
+        """
+        self.__level = level
+
+    def setLevel(self, level: LogLevel) -> Logger:
+        """!
+        @brief set minimum level of messages to print.
+
+        @param level log level.
+
+        @returns self, for chaining API calls.
+        """
+        self.__level = level
+
+        return self
+
+    def getLevel(self) -> LogLevel:
+        """!
+        @brief get minimum level of messages to print.
+
+        @returns log level.
+        """
+        return self.__level
+
+    def isEnabled(self, level: LogLevel) -> bool:
+        """!
+        @brief test if messages of the given level are printed.
+
+        @param level log level.
+
+        @returns True if printed.
+        """
+        return level.value >= self.__level.value
+
+    def log(self, level: LogLevel, source: str, message: str, *args):
+        """!
+        @brief log a message to stderr.
+
+        @param level level of the message.
+        @param source source of the message, printed before the message.
+        @param message message. If args are given, this is a format string,
+        formatted with str.format only if the message is printed.
+        @param args (optional) format arguments.
+        """
+        if level.value < self.__level.value: return
+        if len(args) > 0: message = message.format(*args)
+
+        print('{}: {}'.format(source, message), file = sys.stderr)
+
+def _defaultLevel() -> LogLevel:
+    """!
+    @brief get the default log level from the environment.
+
+    @returns log level.
+    """
+    name = environ.get('SEEDEMU_LOG_LEVEL', 'info').capitalize()
+
+    assert name in LogLevel.__members__, 'unknown log level in SEEDEMU_LOG_LEVEL: {}.'.format(name)
+
+    return LogLevel[name]
+
+## the logger shared by all components.
+_logger = Logger(_defaultLevel())
+
+def getLogger() -> Logger:
+    """!
+    @brief get the logger shared by all components.
+
+    @returns logger.
+    """
+    return _logger
+
+def setLogLevel(level: LogLevel):
+    """!
+    @brief set minimum level of messages to print, for all components.
+
+    @param level log level.
+    """
+    _logger.setLevel(level)
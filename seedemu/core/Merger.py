@@ -1,5 +1,6 @@
 from __future__ import annotations
-from sys import stderr
+from .Logger import getLogger
+from .enums import LogLevel
 
 class Mergeable(object):
     """!
@@ -61,5 +62,14 @@ class Merger(object):
         """
         raise NotImplementedError("doMerge not implemented.")
 
-    def _log(self, message):
-        print('== {}: {}'.format(self.getName(), message), file=stderr)
\ No newline at end of file
+    def _log(self, message: str, *args, level: LogLevel = LogLevel.Info):
+        """!
+        @brief Log to stderr.
+
+        @param message message, or format string if args are given.
+        @param args (optional) format arguments, only applied if the message
+        is printed.
+        @param level (optional) log level. Default to info.
+        """
+        logger = getLogger()
+        if logger.isEnabled(level): logger.log(level, '== {}'.format(self.getName()), message, *args)
\ No newline at end of file
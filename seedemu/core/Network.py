@@ -4,7 +4,7 @@ from .RemoteAccessProvider import RemoteAccessProvider
 from .Printable import Printable
 from .enums import NetworkType, NodeRole
 from .Registry import Registrable
-from .AddressAssignmentConstraint import AddressAssignmentConstraint, Assigner
+from .AddressAssignmentConstraint import AddressAssignmentConstraint, Assigner, AddressBitmap
 from .Visualization import Vertex
 from typing import Dict, Tuple, List
 
@@ -20,6 +20,7 @@ class Network(Printable, Registrable, Vertex):
     __scope: str
     __aac: AddressAssignmentConstraint
     __assigners: Dict[NodeRole, Assigner]
+    __used: AddressBitmap = None
 
     __connected_nodes: List['Node']
 
@@ -53,6 +54,7 @@ class Network(Printable, Registrable, Vertex):
         self.__prefix = prefix
         self.__aac = aac if aac != None else AddressAssignmentConstraint()
         self.__assigners = {}
+        self.__used = AddressBitmap(prefix.num_addresses)
 
         self.__connected_nodes = []
 
@@ -224,18 +226,107 @@ class Network(Printable, Registrable, Vertex):
         """
         return self.__aac.getDhcpIpRange()
 
+    def __getUsed(self) -> AddressBitmap:
+        """!
+        @brief get the bitmap of used addresses.
+
+        @returns bitmap.
+        """
+        # networks loaded from dumps made before addresses were tracked.
+        if self.__used == None: self.__used = AddressBitmap(self.__prefix.num_addresses)
+
+        return self.__used
+
+    def __getOffset(self, address: IPv4Address) -> int:
+        """!
+        @brief get offset of an address in the network.
+
+        @param address address.
+
+        @returns offset, or None if the address is not in the network.
+        """
+        offset = int(address) - int(self.__prefix.network_address)
+
+        return offset if 0 <= offset < self.__prefix.num_addresses else None
+
     def assign(self, nodeRole: NodeRole, asn: int = -1) -> IPv4Address:
         """!
         @brief Assign IP for interface.
 
+        Addresses already assigned or reserved are skipped.
+
         @param nodeRole role of the node getting this assigment.
         @param asn optional. If interface type is InternetExchange, the asn for
         IP address mapping.
+
+        @throws AssertionError if the IX address of the asn is already in use.
         """
         assert not (nodeRole == nodeRole.Host and self.__type == NetworkType.InternetExchange), 'trying to assign IX netwotk to non-router node'
 
-        if self.__type == NetworkType.InternetExchange: return self.__prefix[self.__aac.mapIxAddress(asn)]
-        return self.__prefix[self.__assigners[nodeRole].next()]
+        used = self.__getUsed()
+
+        if self.__type == NetworkType.InternetExchange:
+            offset = self.__aac.mapIxAddress(asn)
+            assert offset < used.getSize(), 'IX address offset {} out of range in {}.'.format(offset, self.__prefix)
+            assert not used.isUsed(offset), 'IX address of as{} in {} is already in use.'.format(asn, self.__name)
+        else:
+            assigner = self.__assigners[nodeRole]
+            offset = assigner.next()
+            while offset < used.getSize() and used.isUsed(offset): offset = assigner.next()
+            assert offset < used.getSize(), 'address offset {} out of range in {}.'.format(offset, self.__prefix)
+
+        used.use(offset)
+
+        return IPv4Address(int(self.__prefix.network_address) + offset)
+
+    def reserve(self, address: IPv4Address) -> Network:
+        """!
+        @brief mark an address as used, so it will not be assigned to another
+        interface. Addresses outside the network are ignored.
+
+        @param address address.
+
+        @returns self, for chaining API calls.
+        @throws AssertionError if the address is already in use.
+        """
+        offset = self.__getOffset(address)
+        if offset == None: return self
+
+        used = self.__getUsed()
+        assert not used.isUsed(offset), 'address {} in {} is already in use.'.format(address, self.__name)
+        used.use(offset)
+        self.__aac.reserveOffset(offset)
+
+        return self
+
+    def release(self, address: IPv4Address) -> Network:
+        """!
+        @brief release an assigned or reserved address, so it can be assigned
+        again.
+
+        @param address address.
+
+        @returns self, for chaining API calls.
+        """
+        offset = self.__getOffset(address)
+        if offset == None: return self
+
+        self.__getUsed().free(offset)
+        for assigner in self.__assigners.values(): assigner.release(offset)
+
+        return self
+
+    def isAddressUsed(self, address: IPv4Address) -> bool:
+        """!
+        @brief test if an address is assigned or reserved.
+
+        @param address address.
+
+        @returns True if used.
+        """
+        offset = self.__getOffset(address)
+
+        return offset != None and self.__getUsed().isUsed(offset)
 
     def associate(self, node: 'Node'):
         """!
@@ -2,7 +2,7 @@ from __future__ import annotations
 from .Printable import Printable
 from .Network import Network
 from .enums import NodeRole
-from .Registry import Registrable
+from .Registry import Registrable, restoreSlots
 from .Emulator import Emulator
 from .Configurable import Configurable
 from .enums import NetworkType
@@ -19,9 +19,15 @@ class File(Printable):
     @brief File class.
 
     This class represents a file on a node.
+
+    Appended content is kept as a list of fragments, and only joined when the
+    content is read, so building a file with many appends takes linear time.
     """
 
+    __slots__ = ('__content', '__fragments', '__path')
+
     __content: str
+    __fragments: List[str]
     __path: str
 
     def __init__(self, path: str, content: str = ''):
@@ -35,6 +41,29 @@ class File(Printable):
         """
         self.__path = path
         self.__content = content
+        self.__fragments = None
+
+    def __setstate__(self, state: object):
+        """!
+        @brief restore from pickle. Dumps made before File had slots carry an
+        instance dict instead.
+
+        @param state pickled state.
+        """
+        self.__fragments = None
+        restoreSlots(self, state)
+
+    def __getContent(self) -> str:
+        """!
+        @brief get content, joining appended fragments if there are any.
+
+        @returns content.
+        """
+        if self.__fragments != None:
+            self.__content = ''.join(self.__fragments)
+            self.__fragments = None
+
+        return self.__content
 
     def setPath(self, path: str) -> File:
         """!
@@ -57,6 +86,7 @@ class File(Printable):
         @returns self, for chaining API calls.
         """
         self.__content = content
+        self.__fragments = None
 
         return self
 
@@ -68,7 +98,8 @@ class File(Printable):
 
         @returns self, for chaining API calls.
         """
-        self.__content += content
+        if self.__fragments == None: self.__fragments = [self.__content]
+        self.__fragments.append(content)
 
         return self
 
@@ -79,13 +110,13 @@ class File(Printable):
         @returns a tuple where the first element is path and second element is 
         content
         """
-        return (self.__path, self.__content)
+        return (self.__path, self.__getContent())
 
     def print(self, indent: int) -> str:
         out = ' ' * indent
         out += "{}:\n".format(self.__path)
         indent += 4
-        for line in self.__content.splitlines():
+        for line in self.__getContent().splitlines():
             out += ' ' * indent
             out += '> '
             out += line
@@ -99,6 +130,8 @@ class Interface(Printable):
     This class represents a network interface card.
     """
 
+    __slots__ = ('__network', '__address', '__latency', '__bandwidth', '__drop')
+
     __network: Network
     __address: IPv4Address
 
@@ -119,6 +152,15 @@ class Interface(Printable):
         self.__bandwidth = b
         self.__drop = d
 
+    def __setstate__(self, state: object):
+        """!
+        @brief restore from pickle. Dumps made before Interface had slots
+        carry an instance dict instead.
+
+        @param state pickled state.
+        """
+        restoreSlots(self, state)
+
     def setLinkProperties(self, latency: int = 0, bandwidth: int = 0, packetDrop: float = 0) -> Interface:
         """!
         @brief Set link properties.
@@ -201,29 +243,33 @@ class Node(Printable, Registrable, Configurable, Vertex):
     @brief Node base class.
 
     This class represents a generic node.
+
+    Collections that are empty on most nodes (classes, labels, ports, shared
+    folders and persistent storages) are only allocated when the first item is
+    added.
     """
 
     __name: str
     __asn: int
     __scope: str
     __role: NodeRole
-    __classes: List[str]
-    __label: Dict[str, str]
+    __classes: List[str] = None
+    __label: Dict[str, str] = None
     __interfaces: List[Interface]
     __files: Dict[str, File]
     __imported_files: Dict[str, str]
     __softwares: Set[str]
     __build_commands: List[str]
     __start_commands: List[Tuple[str, bool]]
-    __ports: List[Tuple[int, int, str]]
+    __ports: List[Tuple[int, int, str]] = None
     __privileged: bool
 
     __configured: bool
     __pending_nets: List[Tuple[str, str]]
     __xcs: Dict[Tuple[str, int], Tuple[IPv4Interface, str]]
 
-    __shared_folders: Dict[str, str]
-    __persistent_storages: List[str] 
+    __shared_folders: Dict[str, str] = None
+    __persistent_storages: List[str] = None
 
     __name_servers: List[str]
 
@@ -244,22 +290,16 @@ class Node(Printable, Registrable, Configurable, Vertex):
         self.__asn = asn
         self.__role = role
         self.__name = name
-        self.__classes = []
-        self.__label = {}
         self.__scope = scope if scope != None else str(asn)
         self.__softwares = set()
         self.__build_commands = []
         self.__start_commands = []
-        self.__ports = []
         self.__privileged = False
 
         self.__pending_nets = []
         self.__xcs = {}
         self.__configured = False
 
-        self.__shared_folders = {}
-        self.__persistent_storages = []
-
         for soft in DEFAULT_SOFTWARE:
             self.__softwares.add(soft)
 
@@ -362,6 +402,7 @@ class Node(Printable, Registrable, Configurable, Vertex):
 
         @returns self, for chaining API calls.
         """
+        if self.__ports == None: self.__ports = []
         self.__ports.append((host, node, proto))
 
     def addPortForwarding(self, host: int, node: int, proto:str = 'tcp') -> Node:
@@ -370,6 +411,7 @@ class Node(Printable, Registrable, Configurable, Vertex):
         @brief Keeping addPort to avoid breaking other examples.
         @brief Just a more descriptive name.
         """
+        if self.__ports == None: self.__ports = []
         self.__ports.append((host, node, proto))
 
     def getPorts(self) -> List[Tuple[int, int, str]]:
@@ -379,7 +421,7 @@ class Node(Printable, Registrable, Configurable, Vertex):
         @returns list of tuple of ports (host, node).
         
         """
-        return self.__ports
+        return self.__ports if self.__ports != None else []
 
     def setPrivileged(self, privileged: bool) -> Node:
         """!
@@ -432,7 +474,9 @@ class Node(Printable, Registrable, Configurable, Vertex):
             '''.format(iface=net.getName()))
             self.appendStartCommand('chmod +x dhclient.sh; ./dhclient.sh')
             
-        else: _addr = IPv4Address(address)
+        else:
+            _addr = IPv4Address(address)
+            net.reserve(_addr)
 
         _iface = Interface(net)
         _iface.setAddress(_addr)
@@ -546,6 +590,7 @@ class Node(Printable, Registrable, Configurable, Vertex):
 
         @returns self, for chaining API calls.
         """
+        if self.__classes == None: self.__classes = []
         self.__classes.append(className)
 
         return self
@@ -557,7 +602,7 @@ class Node(Printable, Registrable, Configurable, Vertex):
         @returns service 
         """
 
-        return self.__classes
+        return self.__classes if self.__classes != None else []
 
     def setLabel(self, key:str, value:str) -> Node:
         """!
@@ -566,11 +611,12 @@ class Node(Printable, Registrable, Configurable, Vertex):
         @returns self, for chaining API calls.
         """
 
+        if self.__label == None: self.__label = {}
         self.__label[key] = value
         return self
 
     def getLabel(self) -> dict:
-        return self.__label
+        return self.__label if self.__label != None else {}
         
     def getFile(self, path: str) -> File:
         """!
@@ -757,6 +803,7 @@ class Node(Printable, Registrable, Configurable, Vertex):
 
         @returns self, for chaining API calls.
         """
+        if self.__shared_folders == None: self.__shared_folders = {}
         self.__shared_folders[nodePath] = hostPath
 
         return self
@@ -768,7 +815,7 @@ class Node(Printable, Registrable, Configurable, Vertex):
         @returns dict, where key is the path in container and value is path on
         host.
         """
-        return self.__shared_folders
+        return self.__shared_folders if self.__shared_folders != None else {}
 
     def addPersistentStorage(self, path: str) -> Node:
         """!
@@ -781,6 +828,7 @@ class Node(Printable, Registrable, Configurable, Vertex):
 
         @returns self, for chaining API calls.
         """
+        if self.__persistent_storages == None: self.__persistent_storages = []
         self.__persistent_storages.append(path)
 
         return self
@@ -791,7 +839,7 @@ class Node(Printable, Registrable, Configurable, Vertex):
 
         @returns list of persistent storage folder.
         """
-        return self.__persistent_storages
+        return self.__persistent_storages if self.__persistent_storages != None else []
 
     def copySettings(self, node: Node):
         """!
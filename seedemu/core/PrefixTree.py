@@ -0,0 +1,179 @@
+from __future__ import annotations
+from ipaddress import IPv4Network, IPv4Address
+from typing import List, Tuple, Union
+
+class PrefixTree(object):
+    """!
+    @brief binary radix (trie) index over IPv4 prefixes.
+
+    Values are attached to prefixes, and lookups walk at most one node per
+    prefix bit, so finding the networks that contain an address or overlap a
+    prefix costs O(prefix length) plus the size of the result, instead of
+    testing every network. Results are returned in insertion order.
+    """
+
+    __root: list
+    __count: int
+
+    def __init__(self):
+        """!
+        @brief create a new, empty prefix tree.
+        """
+
+        ## node layout: [zero-child, one-child, list of (seq, value) or None]
+        self.__root = [None, None, None]
+        self.__count = 0
+
+    def __bits(self, prefix: IPv4Network):
+        """!
+        @brief iterate over the network bits of a prefix, most significant
+        first.
+
+        @param prefix prefix.
+        """
+        addr = int(prefix.network_address)
+        for i in range(prefix.prefixlen):
+            yield (addr >> (31 - i)) & 1
+
+    def __find(self, prefix: IPv4Network, create: bool) -> list:
+        """!
+        @brief find the tree node for a prefix.
+
+        @param prefix prefix.
+        @param create create missing nodes on the way.
+
+        @returns node, or None if not found and create is False.
+        """
+        node = self.__root
+        for bit in self.__bits(prefix):
+            if node[bit] == None:
+                if not create: return None
+                node[bit] = [None, None, None]
+            node = node[bit]
+
+        return node
+
+    def __collect(self, node: list, out: List[Tuple[int, object]]):
+        """!
+        @brief collect all values in a subtree.
+
+        @param node subtree root.
+        @param out list to put (seq, value) in.
+        """
+        stack = [node]
+        while len(stack) > 0:
+            cur = stack.pop()
+            if cur[2] != None: out.extend(cur[2])
+            if cur[0] != None: stack.append(cur[0])
+            if cur[1] != None: stack.append(cur[1])
+
+    def __covering(self, prefix: IPv4Network) -> List[Tuple[int, object]]:
+        """!
+        @brief get values of all prefixes that contain (or equal) the given
+        prefix.
+
+        @param prefix prefix.
+
+        @returns list of (seq, value), shortest prefix first.
+        """
+        out: List[Tuple[int, object]] = []
+
+        node = self.__root
+        if node[2] != None: out.extend(node[2])
+
+        for bit in self.__bits(prefix):
+            node = node[bit]
+            if node == None: break
+            if node[2] != None: out.extend(node[2])
+
+        return out
+
+    def insert(self, prefix: Union[str, IPv4Network], value: object) -> PrefixTree:
+        """!
+        @brief attach a value to a prefix. A prefix can hold more than one
+        value.
+
+        @param prefix prefix.
+        @param value value.
+
+        @returns self, for chaining API calls.
+        """
+        node = self.__find(IPv4Network(prefix), True)
+        if node[2] == None: node[2] = []
+        node[2].append((self.__count, value))
+        self.__count += 1
+
+        return self
+
+    def getExact(self, prefix: Union[str, IPv4Network]) -> List[object]:
+        """!
+        @brief get values attached to exactly the given prefix.
+
+        @param prefix prefix.
+
+        @returns list of values.
+        """
+        node = self.__find(IPv4Network(prefix), False)
+        if node == None or node[2] == None: return []
+
+        return [value for (_, value) in node[2]]
+
+    def getContaining(self, address: Union[str, IPv4Address]) -> List[object]:
+        """!
+        @brief get values of all prefixes containing the given address.
+
+        @param address address.
+
+        @returns list of values, in insertion order.
+        """
+        hits = self.__covering(IPv4Network(IPv4Address(address)))
+
+        return [value for (_, value) in sorted(hits, key = lambda hit: hit[0])]
+
+    def lookup(self, address: Union[str, IPv4Address]) -> List[object]:
+        """!
+        @brief longest prefix match.
+
+        @param address address.
+
+        @returns values attached to the longest prefix containing the address,
+        or empty list if none.
+        """
+        node = self.__root
+        best = node[2]
+
+        for bit in self.__bits(IPv4Network(IPv4Address(address))):
+            node = node[bit]
+            if node == None: break
+            if node[2] != None: best = node[2]
+
+        return [value for (_, value) in best] if best != None else []
+
+    def getOverlapping(self, prefix: Union[str, IPv4Network]) -> List[object]:
+        """!
+        @brief get values of all prefixes overlapping the given prefix, i.e.,
+        prefixes that contain it or are contained by it.
+
+        @param prefix prefix.
+
+        @returns list of values, in insertion order.
+        """
+        prefix = IPv4Network(prefix)
+        hits = self.__covering(prefix)
+
+        # the covering walk already includes the node of the prefix itself,
+        # only collect what is below it.
+        node = self.__find(prefix, False)
+        if node != None:
+            for child in node[0:2]:
+                if child != None: self.__collect(child, hits)
+
+        return [value for (_, value) in sorted(hits, key = lambda hit: hit[0])]
+
+    def __len__(self) -> int:
+        """!
+        @brief get number of values in the tree.
+
+        @returns number of values.
+        """
+        return self.__count
@@ -5,6 +5,8 @@ class Printable(object):
     Implement this class for indentable print.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         """!
         @brief construct a new Printable object.
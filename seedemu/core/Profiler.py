@@ -0,0 +1,355 @@
+from __future__ import annotations
+from .Registry import Registry
+from contextlib import contextmanager
+from time import perf_counter, process_time
+from threading import local
+from typing import Dict, List, Iterator, Tuple
+import tracemalloc
+import json
+
+class ProfileEntry(object):
+    """!
+    @brief a node in the profile tree.
+
+    Entries with the same name under the same parent are merged, so a layer
+    that is rendered in two phases shows up once per phase, and a section
+    entered more than once adds up its numbers.
+    """
+
+    __name: str
+    __children: Dict[str, ProfileEntry]
+
+    ## number of times the section was entered.
+    calls: int
+
+    ## wall clock time, in seconds.
+    wall: float
+
+    ## CPU time of the process, in seconds.
+    cpu: float
+
+    ## peak memory allocated above what was allocated when entering the
+    ## section, in bytes. Zero if memory profiling is disabled.
+    peak: int
+
+    ## number of registry objects touched.
+    touched: int
+
+    def __init__(self, name: str):
+        """!
+        @brief create a new entry.
+
+        @param name name of the section.
+        """
+        self.__name = name
+        self.__children = {}
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = 0
+        self.touched = 0
+
+    def getName(self) -> str:
+        """!
+        @brief get name of the section.
+
+        @returns name.
+        """
+        return self.__name
+
+    def getChild(self, name: str) -> ProfileEntry:
+        """!
+        @brief get a child entry, creating it if it does not exist.
+
+        @param name name of the child section.
+
+        @returns child entry.
+        """
+        if name not in self.__children: self.__children[name] = ProfileEntry(name)
+
+        return self.__children[name]
+
+    def getChildren(self) -> List[ProfileEntry]:
+        """!
+        @brief get child entries, in the order they were first entered.
+
+        @returns list of entries.
+        """
+        return list(self.__children.values())
+
+    def getSelfWall(self) -> float:
+        """!
+        @brief get wall time spent in this section but not in any of its
+        children.
+
+        @returns wall time, in seconds.
+        """
+        return max(0.0, self.wall - sum(child.wall for child in self.__children.values()))
+
+    def toDict(self) -> Dict[str, object]:
+        """!
+        @brief convert the entry and its children to a dict.
+
+        @returns dict.
+        """
+        return {
+            'name': self.__name,
+            'calls': self.calls,
+            'wall': self.wall,
+            'cpu': self.cpu,
+            'peak': self.peak,
+            'touched': self.touched,
+            'children': [child.toDict() for child in self.__children.values()]
+        }
+
+class Profiler(object):
+    """!
+    @brief render profiler.
+
+    The profiler records wall time, CPU time, peak memory allocation and the
+    number of registry objects touched for nested, named sections. The
+    emulator opens a section for every render phase, layer, layer
+    configure/render call and hook call when profiling is enabled.
+
+    Each thread keeps its own stack of open sections. When layers are rendered
+    in parallel, CPU time is for the whole process and memory peaks of
+    sections running at the same time overlap, so only wall times are exact.
+    """
+
+    __registry: Registry
+    __memory: bool
+    __tracing: bool
+    __root: ProfileEntry
+    __local: local
+
+    def __init__(self, memory: bool = True):
+        """!
+        @brief create a new profiler.
+
+        @param memory (optional) track peak memory allocation. This uses
+        tracemalloc, which slows down allocation heavy code considerably.
+        Default to True.
+        """
+        self.__registry = None
+        self.__memory = memory
+        self.__tracing = False
+        self.__root = ProfileEntry('emulator')
+        self.__local = local()
+
+    def start(self, registry: Registry) -> Profiler:
+        """!
+        @brief start profiling. This starts memory tracing, if enabled and not
+        already running.
+
+        @param registry registry to count touched objects on. Counting is
+        enabled on the registry until the profiler is stopped.
+
+        @returns self, for chaining API calls.
+        """
+        self.__registry = registry
+        registry.setTouchCounting(True)
+
+        if self.__memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__tracing = True
+
+        return self
+
+    def stop(self) -> Profiler:
+        """!
+        @brief stop memory tracing, if it was started by this profiler, and
+        counting touched objects on the registry.
+
+        @returns self, for chaining API calls.
+        """
+        if self.__registry != None: self.__registry.setTouchCounting(False)
+
+        if self.__tracing:
+            tracemalloc.stop()
+            self.__tracing = False
+
+        return self
+
+    def __tracedPeak(self) -> int:
+        """!
+        @brief get peak traced memory since the last reset, and reset it.
+
+        @returns peak memory, in bytes.
+        """
+        (_, peak) = tracemalloc.get_traced_memory()
+
+        # reset_peak is only available on python 3.9+. Without it, peaks are
+        # measured from the start of tracing, which still gives an upper bound.
+        if hasattr(tracemalloc, 'reset_peak'): tracemalloc.reset_peak()
+
+        return peak
+
+    def __getStacks(self) -> Tuple[List[ProfileEntry], List[int]]:
+        """!
+        @brief get the section stack and running peaks of the calling thread.
+
+        @returns tuple of stack of entries and stack of peaks.
+        """
+        if not hasattr(self.__local, 'stack'):
+            self.__local.stack = [self.__root]
+            self.__local.peaks = [0]
+
+        return (self.__local.stack, self.__local.peaks)
+
+    @contextmanager
+    def section(self, name: str, parent: ProfileEntry = None) -> Iterator[ProfileEntry]:
+        """!
+        @brief profile a section of code, nested under the current section.
+
+        Use as a context manager: "with profiler.section('name'): ...".
+
+        @param name name of the section.
+        @param parent (optional) entry to nest the section under, instead of
+        the current section of the calling thread. Used to attach work done on
+        worker threads to the section that started it. Default to None.
+
+        @returns context manager, yielding the entry of the section.
+        """
+        memory = self.__memory and tracemalloc.is_tracing()
+
+        (stack, peaks) = self.__getStacks()
+        entry = (parent if parent != None else stack[-1]).getChild(name)
+
+        base = 0
+        if memory:
+            # close the parent's running peak before measuring the child.
+            peaks[-1] = max(peaks[-1], self.__tracedPeak())
+            (base, _) = tracemalloc.get_traced_memory()
+
+        stack.append(entry)
+        peaks.append(base)
+
+        touched = self.__registry.getTouchCount() if self.__registry != None else 0
+        cpu = process_time()
+        wall = perf_counter()
+
+        try:
+            yield entry
+        finally:
+            entry.wall += perf_counter() - wall
+            entry.cpu += process_time() - cpu
+            if self.__registry != None: entry.touched += self.__registry.getTouchCount() - touched
+            entry.calls += 1
+
+            stack.pop()
+            peak = peaks.pop()
+
+            if memory:
+                peak = max(peak, self.__tracedPeak())
+                entry.peak = max(entry.peak, peak - base)
+                peaks[-1] = max(peaks[-1], peak)
+
+    def getRoot(self) -> ProfileEntry:
+        """!
+        @brief get the root entry of the profile tree.
+
+        @returns root entry.
+        """
+        return self.__root
+
+    def toDict(self) -> Dict[str, object]:
+        """!
+        @brief get the profile as a dict.
+
+        @returns dict, with the root entry and its children.
+        """
+        root = self.__root.toDict()
+
+        # the root is never entered, sum up its children instead.
+        for key in ['wall', 'cpu', 'touched']:
+            root[key] = sum(child[key] for child in root['children'])
+        root['peak'] = max([child['peak'] for child in root['children']], default = 0)
+
+        return root
+
+    def toJson(self, indent: int = 4) -> str:
+        """!
+        @brief get the profile as JSON.
+
+        @param indent (optional) indentation. Default to 4.
+
+        @returns JSON string.
+        """
+        return json.dumps(self.toDict(), indent = indent)
+
+    def toFoldedStacks(self, metric: str = 'wall') -> str:
+        """!
+        @brief get the profile in the folded stacks format, as used by
+        flamegraph.pl, speedscope, and other flame graph tools.
+
+        Each line is a semicolon separated stack of section names, followed by
+        the time spent in the section itself (excluding its children), in
+        microseconds.
+
+        @param metric (optional) "wall" for wall time, or "cpu" for CPU time.
+        Default to "wall".
+
+        @returns folded stacks.
+        """
+        assert metric in ['wall', 'cpu'], 'unknown metric: {}.'.format(metric)
+
+        lines: List[str] = []
+
+        def walk(entry: ProfileEntry, stack: List[str]):
+            stack = stack + [entry.getName().replace(';', ':').replace(' ', '_')]
+            children = entry.getChildren()
+
+            total = entry.wall if metric == 'wall' else entry.cpu
+            value = max(0.0, total - sum(c.wall if metric == 'wall' else c.cpu for c in children))
+            if value > 0: lines.append('{} {}'.format(';'.join(stack), int(value * 1000000)))
+
+            for child in children: walk(child, stack)
+
+        for child in self.__root.getChildren(): walk(child, [self.__root.getName()])
+
+        return '\n'.join(lines) + '\n'
+
+    def writeJson(self, path: str) -> Profiler:
+        """!
+        @brief write the profile as JSON to a file.
+
+        @param path path of the file.
+
+        @returns self, for chaining API calls.
+        """
+        with open(path, 'w') as f: f.write(self.toJson())
+
+        return self
+
+    def writeFoldedStacks(self, path: str, metric: str = 'wall') -> Profiler:
+        """!
+        @brief write the profile in the folded stacks format to a file.
+
+        @param path path of the file.
+        @param metric (optional) "wall" or "cpu". Default to "wall".
+
+        @returns self, for chaining API calls.
+        """
+        with open(path, 'w') as f: f.write(self.toFoldedStacks(metric))
+
+        return self
+
+    def getReport(self) -> str:
+        """!
+        @brief get a human-readable report of the profile.
+
+        @returns report.
+        """
+        out = '{:<48} {:>6} {:>10} {:>10} {:>12} {:>10}\n'.format('section', 'calls', 'wall (s)', 'cpu (s)', 'peak (KiB)', 'touched')
+
+        def walk(entry: ProfileEntry, indent: int):
+            nonlocal out
+            out += '{:<48} {:>6} {:>10.3f} {:>10.3f} {:>12.1f} {:>10}\n'.format(
+                (' ' * indent + entry.getName())[:48], entry.calls, entry.wall,
+                entry.cpu, entry.peak / 1024, entry.touched
+            )
+            for child in entry.getChildren(): walk(child, indent + 2)
+
+        for child in self.__root.getChildren(): walk(child, 0)
+
+        return out
@@ -1,12 +1,45 @@
-from typing import Dict, Tuple, List
+from __future__ import annotations
+from typing import Dict, Tuple, List, Iterable, Iterator, FrozenSet
 from .Printable import Printable
+from heapq import merge
+from threading import RLock
+
+## registry types of objects that are compiled to a real node.
+NODE_TYPES: FrozenSet[str] = frozenset(['rnode', 'hnode', 'rs', 'snode'])
+
+## lock around registration, so layers can be rendered from multiple threads.
+_register_lock = RLock()
+
+def restoreSlots(obj: object, state: object):
+    """!
+    @brief restore pickled state of an object with slots.
+
+    Objects pickled before their class had slots carry an instance dict as
+    state, and objects with slots carry a tuple of (instance dict, slots).
+    Both are restored by setting the attributes one by one.
+
+    @param obj object to restore.
+    @param state pickled state.
+    """
+    (attrs, slots) = state if isinstance(state, tuple) else (state, None)
+
+    for values in [attrs, slots]:
+        if values == None: continue
+        for (name, value) in values.items(): setattr(obj, name, value)
 
 class Registrable(object):
     """!
     @brief The Registerable base class.
 
     Base class for all Registrable objects.
+
+    The registry info and the attribute store are kept in slots, and the
+    attribute store is only allocated when the first attribute is set, as most
+    registered objects never have attributes.
     """
+
+    __slots__ = ('_rscope', '_rtype', '_rname', '_attrs')
+
     _rscope: str
     _rtype: str
     _rname: str
@@ -17,9 +50,22 @@ class Registrable(object):
         @brief Registerable class constructor.
         """
         super().__init__()
-        self.__scope = 'undefined'
+        self._rscope = 'undefined'
         self._rtype = 'undefined'
         self._rname = 'undefined'
+        self._attrs = None
+
+    def __setstate__(self, state: object):
+        """!
+        @brief restore from pickle.
+
+        Dumps made before the registry info was moved to slots carry it in the
+        instance dict instead, so it is moved to the slots here.
+
+        @param state pickled state: instance dict, or tuple of instance dict
+        and slots.
+        """
+        restoreSlots(self, state)
 
     def doRegister(self, scope: str, type: str, name: str):
         """!
@@ -32,7 +78,7 @@ class Registrable(object):
         self._rscope = scope
         self._rtype = type
         self._rname = name
-        self._attrs = {}
+        self._attrs = None
     
     def getRegistryInfo(self) -> Tuple[str, str, str]:
         """!
@@ -51,7 +97,7 @@ class Registrable(object):
 
         @returns value, or None if not exist.
         """
-        if name not in self._attrs:
+        if self._attrs == None or name not in self._attrs:
             if default != None:
                 self.setAttribute(name, default)
                 return self._attrs[name]
@@ -65,6 +111,7 @@ class Registrable(object):
         @param name name of attribute.
         @param value value of attribute.
         """
+        if self._attrs == None: self._attrs = {}
         self._attrs[name] = value
 
     def hasAttribute(self, name: str) -> bool:
@@ -75,7 +122,7 @@ class Registrable(object):
         
         @returns True if exist, False otherwise.
         """
-        return name in self._attrs
+        return self._attrs != None and name in self._attrs
 
 class Registry(Printable):
     """!
@@ -85,12 +132,63 @@ class Registry(Printable):
     """
 
     __objects: Dict[Tuple[str, str, str], Registrable]
+    __by_scope: Dict[str, Dict[Tuple[str, str, str], Registrable]]
+    __by_type: Dict[str, Dict[Tuple[str, str, str], Registrable]]
+    __by_scope_type: Dict[Tuple[str, str], Dict[Tuple[str, str, str], Registrable]]
+    __order: Dict[Tuple[str, str, str], int]
+    __touched: int = 0
+    __counting: bool = False
+    __version: int = 0
 
     def __init__(self):
         """!
         @brief create a new Registry.
         """
         self.__objects = {}
+        self.__buildIndexes()
+
+    def __buildIndexes(self):
+        """!
+        @brief (re)build the secondary indexes from the objects dict.
+
+        The indexes keep objects bucketed by scope, by type and by (scope,
+        type), so lookups cost O(result) instead of a scan over every object
+        in the registry. Each bucket is a dict keyed by the full registry key,
+        which keeps the registration order.
+        """
+        self.__by_scope = {}
+        self.__by_type = {}
+        self.__by_scope_type = {}
+        self.__order = {}
+
+        for (key, obj) in self.__objects.items():
+            self.__index(key, obj)
+
+    def __index(self, key: Tuple[str, str, str], obj: Registrable):
+        """!
+        @brief add an object to the secondary indexes.
+
+        @param key registry key (scope, type, name).
+        @param obj object.
+        """
+        (scope, type, _) = key
+        self.__order[key] = len(self.__order)
+        self.__by_scope.setdefault(scope, {})[key] = obj
+        self.__by_type.setdefault(type, {})[key] = obj
+        self.__by_scope_type.setdefault((scope, type), {})[key] = obj
+
+    def __setstate__(self, state: Dict[str, object]):
+        """!
+        @brief restore from pickle.
+
+        Dumps made before the registry was indexed only carry the objects dict,
+        so the indexes are rebuilt when they are missing.
+
+        @param state pickled state.
+        """
+        self.__dict__.update(state)
+        if '_Registry__objects' in state and '_Registry__order' not in state:
+            self.__buildIndexes()
 
     def register(self, scope: str, type: str, name: str, obj: Registrable) -> Registrable:
         """!
@@ -103,10 +201,14 @@ class Registry(Printable):
         @returns registered object
         @throws AssertionError if name exists.
         """
-        assert (scope, type, name) not in self.__objects, 'object with name {} already exist.'.format(name)
-        obj.doRegister(scope, type, name)
-        self.__objects[(scope, type, name)] = obj
-        return self.__objects[(scope, type, name)]
+        with _register_lock:
+            assert (scope, type, name) not in self.__objects, 'object with name {} already exist.'.format(name)
+            obj.doRegister(scope, type, name)
+            self.__objects[(scope, type, name)] = obj
+            self.__index((scope, type, name), obj)
+            if self.__counting: self.__touched += 1
+            self.__version += 1
+            return self.__objects[(scope, type, name)]
 
     def get(self, scope: str, type: str, name: str) -> Registrable:
         """!
@@ -119,6 +221,7 @@ class Registry(Printable):
         @returns object.
         """
         assert (scope, type, name) in self.__objects, 'object with name {} does not exist.'.format(name)
+        if self.__counting: self.__touched += 1
         return self.__objects[(scope, type, name)]
 
     def has(self, scope: str, type: str, name: str) -> bool:
@@ -140,13 +243,51 @@ class Registry(Printable):
         @param type type of the object (e.g., net/node)
         @returns objects.
         """
-        rslt: List[Registrable] = []
+        bucket = self.__by_scope_type.get((scope, type))
+        if bucket == None: return []
 
-        for key, obj in self.__objects.items():
-            (s, t, _) = key
-            if s == scope and t == type: rslt.append(obj)
+        if self.__counting: self.__touched += len(bucket)
+        return list(bucket.values())
+
+    def iterByType(self, types: Iterable[str], scope: str = None) -> Iterator[Tuple[Tuple[str, str, str], Registrable]]:
+        """!
+        @brief Iterate over objects of the given types.
+
+        Objects are yielded in the order they were registered, same as
+        iterating getAll(), but only the buckets of the requested types are
+        visited.
+
+        @param types types of the objects (e.g., {'rnode', 'hnode'}).
+        @param scope (optional) scope of the objects. Default to None (all
+        scopes).
+
+        @returns iterator of ((scope, type, name), object).
+        """
+        if scope != None:
+            buckets = [self.__by_scope_type.get((scope, t)) for t in set(types)]
+        else:
+            buckets = [self.__by_type.get(t) for t in set(types)]
 
-        return rslt
+        buckets = [b for b in buckets if b != None and len(b) > 0]
+        if self.__counting: self.__touched += sum(len(b) for b in buckets)
+
+        if len(buckets) == 0: return iter(())
+        if len(buckets) == 1: return iter(list(buckets[0].items()))
+
+        return merge(*[list(b.items()) for b in buckets], key = lambda item: self.__order[item[0]])
+
+    def iterNodes(self, types: Iterable[str] = NODE_TYPES, scope: str = None) -> Iterator[Tuple[Tuple[str, str, str], Registrable]]:
+        """!
+        @brief Iterate over node objects.
+
+        @param types (optional) node types to include. Default to all node
+        types (rnode, hnode, rs and snode).
+        @param scope (optional) scope of the nodes. Default to None (all
+        scopes).
+
+        @returns iterator of ((scope, type, name), node).
+        """
+        return self.iterByType(types, scope)
 
     def getAll(self) -> Dict[Tuple[str, str, str], Registrable]:
         """!
@@ -157,6 +298,14 @@ class Registry(Printable):
         """
         return self.__objects
 
+    def getScopes(self) -> List[str]:
+        """!
+        @brief Get all scopes that have at least one object.
+
+        @returns list of scopes.
+        """
+        return list(self.__by_scope.keys())
+
     def getByScope(self, scope: str) -> List[Registrable]:
         """!
         @brief Retrive objects with scope.
@@ -164,13 +313,50 @@ class Registry(Printable):
         @param scope scope of the object (e.g., asn).
         @returns objects.
         """
-        rslt: List[Registrable] = []
+        bucket = self.__by_scope.get(scope)
+        if bucket == None: return []
+
+        if self.__counting: self.__touched += len(bucket)
+        return list(bucket.values())
+
+    def getTouchCount(self) -> int:
+        """!
+        @brief Get number of objects handed out or registered so far.
+
+        Every object registered, retrieved with get, or returned by
+        getByType, getByScope or iterByType counts once per call. This is
+        meant for profiling how much of the registry a piece of code walks.
+        Objects are only counted while counting is enabled, see
+        setTouchCounting.
+
+        @returns number of objects touched.
+        """
+        return self.__touched
+
+    def setTouchCounting(self, enabled: bool) -> Registry:
+        """!
+        @brief enable or disable counting touched objects. Counting is off by
+        default, so lookups do not pay for it unless a profiler is attached.
+
+        @param enabled True to count touched objects.
+
+        @returns self, for chaining API calls.
+        """
+        self.__counting = enabled
 
-        for key, obj in self.__objects.items():
-            (s, _, _) = key
-            if s == scope: rslt.append(obj)
+        return self
 
-        return rslt
+    def getVersion(self) -> int:
+        """!
+        @brief Get the mutation counter of the registry.
+
+        The counter goes up every time the set of registered objects changes.
+        Unlike the touch count, reads do not change it, so it can be used to
+        tell if something derived from the registry is out of date.
+
+        @returns mutation counter.
+        """
+        return self.__version
     
     def print(self, indent: int):
         out = (' ' * indent) + 'Registry:\n'
@@ -242,4 +428,25 @@ class ScopedRegistry(Registry):
         @param type type of the object (e.g., net/node)
         @returns objects.
         """
-        return self.__reg.getByType(self.__scope, type)
\ No newline at end of file
+        return self.__reg.getByType(self.__scope, type)
+
+    def iterByType(self, types: Iterable[str]) -> Iterator[Tuple[Tuple[str, str, str], Registrable]]:
+        """!
+        @brief Iterate over objects of the given types.
+
+        @param types types of the objects (e.g., {'rnode', 'hnode'}).
+
+        @returns iterator of ((scope, type, name), object).
+        """
+        return self.__reg.iterByType(types, self.__scope)
+
+    def iterNodes(self, types: Iterable[str] = NODE_TYPES) -> Iterator[Tuple[Tuple[str, str, str], Registrable]]:
+        """!
+        @brief Iterate over node objects.
+
+        @param types (optional) node types to include. Default to all node
+        types.
+
+        @returns iterator of ((scope, type, name), node).
+        """
+        return self.__reg.iterNodes(types, self.__scope)
\ No newline at end of file
@@ -1,18 +1,23 @@
 from __future__ import annotations
-from sys import stderr
+from .Logger import getLogger
+from .enums import LogLevel
 
 class RemoteAccessProvider(object):
     """!
     @brief Implements logic for provide remote access to emulated network.
     """
 
-    def _log(self, message: str) -> None:
+    def _log(self, message: str, *args, level: LogLevel = LogLevel.Info) -> None:
         """!
         @brief Log to stderr.
 
-        @param message message.
+        @param message message, or format string if args are given.
+        @param args (optional) format arguments, only applied if the message
+        is printed.
+        @param level (optional) log level. Default to info.
         """
-        print("==== {}RemoteAccessProvider: {}".format(self.getName(), message), file=stderr)
+        logger = getLogger()
+        if logger.isEnabled(level): logger.log(level, '==== {}RemoteAccessProvider'.format(self.getName()), message, *args)
 
     def configureRemoteAccess(self, emulator: Emulator, netObject: Network, brNode: Node, brNet: Network):
         """!
@@ -0,0 +1,180 @@
+from __future__ import annotations
+from .Snapshot import Snapshot
+from .Logger import getLogger
+from .enums import LogLevel
+from functools import lru_cache
+from hashlib import sha256
+from os import makedirs, walk
+from os.path import join, exists, dirname, relpath
+import pickle
+import sys
+
+## bump this when the layout of cached entries changes.
+RENDER_CACHE_VERSION = 1
+
+@lru_cache(maxsize = None)
+def _getLibraryFingerprint() -> str:
+    """!
+    @brief get a fingerprint of the library: a hash of the source of every
+    module in the seedemu package, and the python version.
+
+    Any change to the library, released or not, changes the fingerprint, so
+    results rendered by a different version of the library are never used.
+
+    @returns hex digest.
+    """
+    root = dirname(dirname(__file__))
+    digest = sha256('{}:{}'.format(RENDER_CACHE_VERSION, sys.version_info[:2]).encode('utf-8'))
+
+    sources = []
+    for (path, dirs, files) in walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith('.py'): sources.append(join(path, name))
+
+    for source in sources:
+        digest.update(relpath(source, root).encode('utf-8'))
+        with open(source, 'rb') as f: digest.update(sha256(f.read()).digest())
+
+    return digest.hexdigest()
+
+class _HashWriter(object):
+    """!
+    @brief file-like object that hashes what is written to it.
+    """
+
+    digest: object
+
+    def __init__(self):
+        self.digest = sha256()
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        return len(data)
+
+class _CanonicalPickler(pickle._Pickler):
+    """!
+    @brief pickler that writes sets in sorted order, so the same object tree
+    pickles to the same bytes in every process. Iteration order of sets of
+    strings otherwise changes with hash randomization.
+
+    The C pickler handles sets internally, so this is built on the python
+    pickler, which looks up a handler for every type in its dispatch dict.
+    """
+
+    dispatch = pickle._Pickler.dispatch.copy()
+
+    def saveSet(self, obj: set):
+        self.save_reduce(set, (sorted(obj, key = repr), ), obj = obj)
+
+    def saveFrozenSet(self, obj: frozenset):
+        self.save_reduce(frozenset, (sorted(obj, key = repr), ), obj = obj)
+
+    dispatch[set] = saveSet
+    dispatch[frozenset] = saveFrozenSet
+
+class RenderCache(object):
+    """!
+    @brief cache of rendered emulations.
+
+    Rendered emulations are saved as snapshots in the cache directory, keyed
+    by a hash of the emulation before render and a fingerprint of the library.
+    When an emulation with the same inputs is rendered again, the saved result
+    is loaded instead, so the same emulation can be rendered once and compiled
+    many times, with different compilers, from different processes.
+    """
+
+    __path: str
+
+    def __init__(self, path: str):
+        """!
+        @brief create a new render cache.
+
+        @param path path to the cache directory. Created if it does not exist.
+        """
+        self.__path = path
+
+    def getPath(self) -> str:
+        """!
+        @brief get path to the cache directory.
+
+        @returns path.
+        """
+        return self.__path
+
+    def getKey(self, state: object) -> str:
+        """!
+        @brief get the cache key of an emulation.
+
+        @param state state of the emulation before render.
+
+        @returns key, or None if the state can not be pickled (e.g., a binding
+        filter uses a lambda), in which case the emulation can not be cached.
+        """
+        writer = _HashWriter()
+        writer.digest.update(_getLibraryFingerprint().encode('utf-8'))
+
+        try:
+            _CanonicalPickler(writer, pickle.HIGHEST_PROTOCOL).dump(state)
+        except Exception as e:
+            getLogger().log(LogLevel.Warning, 'RenderCache', 'emulation can not be cached, rendering without cache: {}', e)
+            return None
+
+        return writer.digest.hexdigest()
+
+    def __getEntryPath(self, key: str) -> str:
+        """!
+        @brief get path to the entry of a key.
+
+        @param key key.
+
+        @returns path.
+        """
+        return join(self.__path, '{}.bin'.format(key))
+
+    def has(self, key: str) -> bool:
+        """!
+        @brief test if a rendered emulation is cached.
+
+        @param key key.
+
+        @returns True if cached.
+        """
+        return exists(self.__getEntryPath(key))
+
+    def load(self, key: str) -> object:
+        """!
+        @brief load a rendered emulation.
+
+        @param key key.
+
+        @returns rendered state, or None if not cached or the entry can not be
+        read.
+        """
+        path = self.__getEntryPath(key)
+        if not exists(path): return None
+
+        try:
+            return Snapshot.read(path)
+        except Exception as e:
+            getLogger().log(LogLevel.Warning, 'RenderCache', 'ignoring unreadable cache entry {}: {}', path, e)
+            return None
+
+    def store(self, key: str, state: object) -> RenderCache:
+        """!
+        @brief save a rendered emulation.
+
+        @param key key.
+        @param state rendered state. If it can not be pickled, a warning is
+        logged and nothing is saved.
+
+        @returns self, for chaining API calls.
+        """
+        makedirs(self.__path, exist_ok = True)
+
+        try:
+            Snapshot.write(self.__getEntryPath(key), state)
+        except Exception as e:
+            getLogger().log(LogLevel.Warning, 'RenderCache', 'not saving rendered emulation to cache: {}', e)
+
+        return self
@@ -3,7 +3,7 @@ from .Layer import Layer
 from .Node import Node
 from .Printable import Printable
 from .Emulator import Emulator
-from .enums import NodeRole
+from .enums import NodeRole, LogLevel
 from .Binding import Binding
 from typing import Dict, List, Set, Tuple
 
@@ -118,9 +118,9 @@ class Service(Layer):
     def configure(self, emulator: Emulator):
         for (vnode, server) in self.__pending_targets.items():
             pnode = emulator.getBindingFor(vnode)
-            self._log('looking for binding for {}...'.format(vnode))
+            self._log('looking for binding for {}...', vnode, level = LogLevel.Debug)
             self.__configureServer(server, pnode)
-            self._log('configure: binded {} to as{}/{}.'.format(vnode, pnode.getAsn(), pnode.getName()))
+            self._log('configure: binded {} to as{}/{}.', vnode, pnode.getAsn(), pnode.getName(), level = LogLevel.Debug)
     
     def render(self, emulator: Emulator):
         for (server, node) in self.__targets:
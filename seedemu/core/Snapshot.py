@@ -0,0 +1,203 @@
+from __future__ import annotations
+from ipaddress import IPv4Network, IPv4Address, IPv4Interface
+from functools import lru_cache
+from os import replace, remove
+from os.path import exists
+from uuid import uuid4
+from typing import BinaryIO, Dict
+import copyreg
+import pickle
+import struct
+
+## magic bytes at the start of every snapshot.
+SNAPSHOT_MAGIC = b'SEEDSNAP'
+
+## current snapshot schema version. Bump this when a change to the core
+## classes makes old snapshots unloadable.
+SNAPSHOT_VERSION = 1
+
+## compression codec ids, as stored in the snapshot header.
+SnapshotCodecs: Dict[str, int] = {
+    'none': 0,
+    'zstd': 1,
+    'lz4': 2
+}
+
+## header: magic, schema version, codec id, pickle protocol.
+_header = struct.Struct('<8sHBB')
+
+def _restoreAddress(address: int) -> IPv4Address:
+    """!
+    @brief rebuild an IPv4Address from its integer value.
+
+    @param address address, as integer.
+
+    @returns address.
+    """
+    return IPv4Address(address)
+
+@lru_cache(maxsize = None)
+def _restoreNetwork(address: int, prefixlen: int) -> IPv4Network:
+    """!
+    @brief rebuild an IPv4Network from its integer network address and prefix
+    length. Networks are immutable, so equal networks in a snapshot share one
+    object while loading.
+
+    @param address network address, as integer.
+    @param prefixlen prefix length.
+
+    @returns network.
+    """
+    return IPv4Network((address, prefixlen))
+
+def _restoreInterface(address: int, prefixlen: int) -> IPv4Interface:
+    """!
+    @brief rebuild an IPv4Interface from its integer address and prefix
+    length.
+
+    @param address address, as integer.
+    @param prefixlen prefix length.
+
+    @returns interface.
+    """
+    return IPv4Interface((address, prefixlen))
+
+class _SnapshotPickler(pickle.Pickler):
+    """!
+    @brief pickler that stores IP addresses and networks as integers.
+
+    The default reduction of ipaddress objects stores them as strings, and
+    parsing those strings back dominates load time of large emulations.
+    """
+
+    dispatch_table = copyreg.dispatch_table.copy()
+    dispatch_table[IPv4Address] = lambda obj: (_restoreAddress, (int(obj), ))
+    dispatch_table[IPv4Network] = lambda obj: (_restoreNetwork, (int(obj.network_address), obj.prefixlen))
+    dispatch_table[IPv4Interface] = lambda obj: (_restoreInterface, (int(obj.ip), obj.network.prefixlen))
+
+class Snapshot(object):
+    """!
+    @brief versioned binary snapshot of an object tree, used to dump and load
+    emulations.
+
+    A snapshot is a fixed-size header (magic, schema version, compression
+    codec and pickle protocol), followed by the object tree pickled with the
+    highest protocol available, optionally compressed with zstd (needs the
+    zstandard package) or lz4 (needs the lz4 package).
+    """
+
+    @staticmethod
+    def write(fileName: str, obj: object, compression: str = None):
+        """!
+        @brief write a snapshot.
+
+        The snapshot is written to a temporary file first, then moved in
+        place, so a reader never sees a partly written snapshot.
+
+        @param fileName output path.
+        @param obj object to save.
+        @param compression (optional) compression codec: "zstd", "lz4", or
+        None for no compression. Default to None.
+
+        @throws AssertionError if the codec is unknown.
+        """
+        codec = compression if compression != None else 'none'
+        assert codec in SnapshotCodecs, 'unknown compression: {}.'.format(codec)
+
+        protocol = pickle.HIGHEST_PROTOCOL
+        temp = '{}.{}'.format(fileName, uuid4().hex)
+
+        try:
+            with open(temp, 'wb') as f:
+                f.write(_header.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, SnapshotCodecs[codec], protocol))
+
+                stream = Snapshot.__openStream(f, codec, True)
+                try:
+                    _SnapshotPickler(stream, protocol).dump(obj)
+                finally:
+                    if stream is not f: stream.close()
+
+            replace(temp, fileName)
+        finally:
+            if exists(temp): remove(temp)
+
+    @staticmethod
+    def read(fileName: str) -> object:
+        """!
+        @brief read a snapshot. Plain pickle files, as written by older
+        versions, are also accepted.
+
+        @param fileName path to snapshot.
+
+        @throws AssertionError if the snapshot is from a newer schema
+        version, or uses an unknown codec.
+
+        @returns saved object.
+        """
+        with open(fileName, 'rb') as f:
+            head = f.read(_header.size)
+
+            if not head.startswith(SNAPSHOT_MAGIC):
+                f.seek(0)
+                return pickle.load(f)
+
+            (_, version, codecId, _) = _header.unpack(head)
+            assert version <= SNAPSHOT_VERSION, '{}: snapshot version {} is newer than supported version {}.'.format(fileName, version, SNAPSHOT_VERSION)
+
+            codecs = { i: name for (name, i) in SnapshotCodecs.items() }
+            assert codecId in codecs, '{}: unknown compression codec id {}.'.format(fileName, codecId)
+
+            stream = Snapshot.__openStream(f, codecs[codecId], False)
+            try:
+                return pickle.load(stream)
+            finally:
+                if stream is not f: stream.close()
+                _restoreNetwork.cache_clear()
+
+    @staticmethod
+    def getVersion(fileName: str) -> int:
+        """!
+        @brief get schema version of a snapshot.
+
+        @param fileName path to snapshot.
+
+        @returns schema version, or 0 for a plain pickle file.
+        """
+        with open(fileName, 'rb') as f:
+            head = f.read(_header.size)
+
+        if not head.startswith(SNAPSHOT_MAGIC) or len(head) < _header.size: return 0
+
+        return _header.unpack(head)[1]
+
+    @staticmethod
+    def __openStream(f: BinaryIO, codec: str, write: bool) -> BinaryIO:
+        """!
+        @brief wrap a file in a (de)compression stream.
+
+        @param f file, positioned after the header.
+        @param codec codec name.
+        @param write True to compress, False to decompress.
+
+        @returns stream. This is f itself if the codec is "none".
+        """
+        if codec == 'none': return f
+
+        if codec == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                assert False, 'zstd compression requires the zstandard package.'
+
+            if write: return zstandard.ZstdCompressor().stream_writer(f, closefd = False)
+            return zstandard.ZstdDecompressor().stream_reader(f, closefd = False)
+
+        if codec == 'lz4':
+            try:
+                import lz4.frame
+            except ImportError:
+                assert False, 'lz4 compression requires the lz4 package.'
+
+            return lz4.frame.LZ4FrameFile(f, 'wb' if write else 'rb')
+
+        assert False, 'unknown compression: {}.'.format(codec)
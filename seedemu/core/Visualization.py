@@ -3,18 +3,21 @@ from __future__ import annotations
 class Vertex(object):
     """!
     @brief a Vertex in the SEED emulator client map.
+
+    Display name and description are unset on most vertices, so they default
+    to class attributes instead of taking up space on every instance.
     """
 
-    __displayname: str
-    __description: str
+    __slots__ = ()
+
+    __displayname: str = None
+    __description: str = None
 
     def __init__(self) -> None:
         """!
         @brief create a new vertex.
         """
         super().__init__()
-        self.__displayname = None
-        self.__description = None
 
     def setDisplayName(self, name: str) -> Vertex:
         """!
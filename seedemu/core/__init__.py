@@ -1,10 +1,16 @@
 from .AddressAssignmentConstraint import AddressAssignmentConstraint, Assigner
+from .AddressPlanner import AddressPlanner, BuddyAllocator, IxAddressTable
 from .AutonomousSystem import AutonomousSystem
 from .InternetExchange import InternetExchange
 from .Network import Network
+from .PrefixTree import PrefixTree
 from .Node import Node, File, Interface, Router, RealWorldRouter
 from .Printable import Printable
+from .Logger import Logger, getLogger, setLogLevel
 from .Registry import Registry, ScopedRegistry, Registrable
+from .Profiler import Profiler, ProfileEntry
+from .Snapshot import Snapshot
+from .RenderCache import RenderCache
 from .Graphable import Graphable, Graph, Vertex, Edge
 from .Emulator import Emulator
 from .Merger import Mergeable, Merger
@@ -12,7 +18,7 @@ from .Configurable import Configurable
 from .Hook import Hook
 from .Layer import Layer
 from .Service import Server, Service
-from .Binding import Binding, Filter, Action
+from .Binding import Binding, Filter, Action, VirtualNodeIndex, CandidateIndex
 from .Component import Component
 from .RemoteAccessProvider import RemoteAccessProvider
 from .Compiler import Compiler
\ No newline at end of file
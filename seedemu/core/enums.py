@@ -30,4 +30,21 @@ class NodeRole(Enum):
     Router = "Router"
 
     ## Route served node.
-    RouteServer = "Route Server"
\ No newline at end of file
+    RouteServer = "Route Server"
+
+class LogLevel(Enum):
+    """!
+    @brief Log levels enum.
+    """
+
+    ## Detailed messages, usually one or more per node. Hidden by default.
+    Debug = 10
+
+    ## Progress messages.
+    Info = 20
+
+    ## Something looks wrong, but the emulator can continue.
+    Warning = 30
+
+    ## Something went wrong.
+    Error = 40
@@ -1,4 +1,5 @@
-from sys import stderr
+from seedemu.core.Logger import getLogger
+from seedemu.core.enums import LogLevel
 
 from .providers import DataProvider
 from . .core import Emulator, AutonomousSystem, InternetExchange
@@ -25,13 +26,16 @@ class DefaultGenerator:
         self.__provider = provider
         pass
 
-    def __log(self, message: str) -> None:
+    def __log(self, message: str, *args, level: LogLevel = LogLevel.Info) -> None:
         """!
         @brief Log to stderr.
 
-        @param message message.
+        @param message message, or format string if args are given.
+        @param args (optional) format arguments, only applied if the message
+        is printed.
+        @param level (optional) log level. Default to info.
         """
-        print('== DefaultGenerator: {}'.format(message), file = stderr)
+        getLogger().log(level, '== DefaultGenerator', message, *args)
 
     def __generate(self, asn: int, emulator: Emulator, depth: int):
         """!
@@ -43,23 +47,23 @@ class DefaultGenerator:
         """
         if depth <= 0: return
 
-        self.__log('generating AS{}...'.format(asn))
+        self.__log('generating AS{}...', asn)
 
         base: Base = emulator.getLayer('Base')
         bgp: Ebgp = emulator.getLayer('Ebgp')
         routing: Routing = emulator.getLayer('Routing')
 
         if asn in base.getAsns():
-            self.__log('AS{} already done, skipping...'.format(asn))
+            self.__log('AS{} already done, skipping...', asn)
             return
         
-        self.__log('getting list of IXes joined by AS{}...'.format(asn))
+        self.__log('getting list of IXes joined by AS{}...', asn)
         ixes = self.__provider.getInternetExchanges()
 
-        self.__log('getting list of prefixes announced by AS{}...'.format(asn))
+        self.__log('getting list of prefixes announced by AS{}...', asn)
         prefixes = self.__provider.getPrefixes()
 
-        self.__log('getting list of peers of AS{}...'.format(asn))
+        self.__log('getting list of peers of AS{}...', asn)
         peers = self.__provider.getPeers()
 
         current_as = base.createAutonomousSystem(asn)
@@ -68,11 +72,11 @@ class DefaultGenerator:
 
         net_count = 0
 
-        self.__log('creating {} networks for AS{}...'.format(len(prefixes), asn))
+        self.__log('creating {} networks for AS{}...', len(prefixes), asn)
         for prefix in prefixes:
             netname = 'net{}'.format(net_count)
 
-            self.__log('creating {} with prefix {} for AS{}...'.format(netname, prefix, asn))
+            self.__log('creating {} with prefix {} for AS{}...', netname, prefix, asn, level = LogLevel.Debug)
 
             current_as.createNetwork(netname, prefix)
             router.joinNetwork(netname)
@@ -80,28 +84,28 @@ class DefaultGenerator:
 
             net_count += 1
 
-        self.__log('looking for details of {} IXes joined by AS{}...'.format(len(ixes), asn))
+        self.__log('looking for details of {} IXes joined by AS{}...', len(ixes), asn)
         for ix in ixes:
             if ix in base.getInternetExchangeIds():
                 self.__log('IX{} already created, skipping...')
                 continue
 
-            self.__log('creating new IX, IX{}; getting prefix...'.format(ix))
+            self.__log('creating new IX, IX{}; getting prefix...', ix)
             base.createInternetExchange(ix, prefix = self.__provider.getInternetExchangePrefix(ix))
 
-            self.__log('getting members of IX{}...'.format(ix))
+            self.__log('getting members of IX{}...', ix)
             members = self.__provider.getInternetExchangeMembers(ix)
 
-            self.__log('joining IX{} with AS{}...'.format(ix, asn))
+            self.__log('joining IX{} with AS{}...', ix, asn, level = LogLevel.Debug)
             router.joinNetwork('ix{}'.format(ix), members[asn])
             
-            self.__log('creating {} other ASes in IX{}...'.format(len(members.keys()), ix))
+            self.__log('creating {} other ASes in IX{}...', len(members.keys()), ix)
             for member in members.keys():
                 self.__generate(member, emulator, depth - 1)
                 if member in peers.keys():
                     # FIXME: right = peer is customer, left = peer is provider
                     rel = peers[member]
-                    self.__log('peering AS{} with AS{} in IX{} using relationship {}...'.format(member, asn, ix, rel))
+                    self.__log('peering AS{} with AS{} in IX{} using relationship {}...', member, asn, ix, rel, level = LogLevel.Debug)
                     bgp.addPrivatePeering(ix, member, asn, rel)
 
 
@@ -1,5 +1,6 @@
 from typing import List, Dict
-from sys import stderr
+from seedemu.core.Logger import getLogger
+from seedemu.core.enums import LogLevel
 
 class DataProvider:
     """!
@@ -62,8 +63,14 @@ class DataProvider:
         """
         raise NotImplementedError('getInternetExchangeSubnet not implemented.')
 
-    def _log(self, message: str):
+    def _log(self, message: str, *args, level: LogLevel = LogLevel.Info):
         """!
         @brief Log to stderr.
+
+        @param message message, or format string if args are given.
+        @param args (optional) format arguments, only applied if the message
+        is printed.
+        @param level (optional) log level. Default to info.
         """
-        print("==== {}DataProvider: {}".format(self.getName(), message), file=stderr)
+        logger = getLogger()
+        if logger.isEnabled(level): logger.log(level, '==== {}DataProvider'.format(self.getName()), message, *args)
@@ -1,4 +1,5 @@
 from .DataProvider import DataProvider
+from seedemu.core.enums import LogLevel
 from typing import List, Dict, Any
 import requests
 
@@ -62,10 +63,10 @@ class Ris(DataProvider):
 
     def getPrefixes(self, asn: int) -> List[str]:
         if asn in self.__cache['prefixes']:
-            self._log('prefix list of AS{} in cache.'.format(asn))
+            self._log('prefix list of AS{} in cache.', asn, level = LogLevel.Debug)
             return self.__cache['prefixes'][asn]
 
-        self._log('prefix list of AS{} not in cache, loading from RIPE RIS...'.format(asn))
+        self._log('prefix list of AS{} not in cache, loading from RIPE RIS...', asn, level = LogLevel.Debug)
         
         data = self.__ripe('announced-prefixes', { 'resource': asn })
 
@@ -74,10 +75,10 @@ class Ris(DataProvider):
 
     def getPeers(self, asn: int) -> Dict[int, str]:
         if asn in self.__cache['peers']:
-            self._log('peer list of AS{} in cache.'.format(asn))
+            self._log('peer list of AS{} in cache.', asn, level = LogLevel.Debug)
             return self.__cache['peers'][asn]
 
-        self._log('peer list of AS{} not in cache, loading from RIPE RIS...'.format(asn))
+        self._log('peer list of AS{} not in cache, loading from RIPE RIS...', asn, level = LogLevel.Debug)
 
         data = self.__ripe('asn-neighbours', { 'resource': asn })
 
@@ -91,10 +92,10 @@ class Ris(DataProvider):
     
     def getInternetExchanges(self, asn: int) -> List[int]:
         if asn in self.__cache['exchanges']:
-            self._log('exchange list of AS{} in cache.'.format(asn))
+            self._log('exchange list of AS{} in cache.', asn, level = LogLevel.Debug)
             return self.__cache['exchanges'][asn]
         
-        self._log('exchange list of AS{} not in cache, loading from PeeringDB...'.format(asn))
+        self._log('exchange list of AS{} not in cache, loading from PeeringDB...', asn, level = LogLevel.Debug)
 
         exchanges = []
 
@@ -105,7 +106,7 @@ class Ris(DataProvider):
 
         if len(data) > 0: exchanges = data[0]['netixlan_set']
         
-        if len(exchanges) == 0: self._log('note: AS{} does not have any public exchanges on record.'.format(asn))
+        if len(exchanges) == 0: self._log('note: AS{} does not have any public exchanges on record.', asn)
         
         self.__cache['exchanges'][asn] = exchanges
 
@@ -113,10 +114,10 @@ class Ris(DataProvider):
 
     def getInternetExchangeMembers(self, id: int) -> Dict[int, str]:
         if id in self.__cache['exchange_details']:
-            self._log('exchange details of IX{} in cache.'.format(id))
+            self._log('exchange details of IX{} in cache.', id, level = LogLevel.Debug)
             return self.__cache['exchange_details'][id]['']
         
-        self._log('exchange details of IX{} not in cache, loading from PeeringDB...'.format(id))
+        self._log('exchange details of IX{} not in cache, loading from PeeringDB...', id, level = LogLevel.Debug)
 
     def getInternetExchangePrefix(self, id: int) -> str:
         return
@@ -1,4 +1,5 @@
 from seedemu.core import Hook, Emulator, Node
+from seedemu.core.enums import LogLevel
 from typing import List
 
 class ResolvConfHookByAs(Hook):
@@ -26,10 +27,9 @@ class ResolvConfHookByAs(Hook):
 
     def postrender(self, emulator: Emulator):
         reg = emulator.getRegistry()
-        for ((scope, type, name), object) in reg.getAll().items():
-            if type != 'hnode': continue
+        for ((scope, type, name), object) in reg.iterNodes({'hnode'}):
             if scope != self.__asn: continue
-            self._log('setting resolv.conf for as{}/{}'.format(scope, name))
+            self._log('setting resolv.conf for as{}/{}', scope, name, level = LogLevel.Debug)
             host: Node = object
             host.appendStartCommand(': > /etc/resolv.conf')
             for s in self.__servers:
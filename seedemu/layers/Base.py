@@ -1,5 +1,6 @@
 from __future__ import annotations
-from seedemu.core import AutonomousSystem, InternetExchange, AddressAssignmentConstraint, Node, Graphable, Emulator, Layer
+from seedemu.core import AutonomousSystem, InternetExchange, AddressAssignmentConstraint, AddressPlanner, Node, Graphable, Emulator, Layer, PrefixTree
+from ipaddress import IPv4Network
 from typing import Dict, List
 
 BaseFileTemplates: Dict[str, str] = {}
@@ -43,6 +44,10 @@ class Base(Layer, Graphable):
 
     __name_servers: List[str]
 
+    __prefix_tree: PrefixTree = None
+
+    __planner: AddressPlanner = None
+
     def __init__(self):
         """!
         @brief Base layer constructor.
@@ -69,12 +74,11 @@ class Base(Layer, Graphable):
         self._log('setting up autonomous systems...')
         for asobj in self.__ases.values(): asobj.configure(emulator)
 
-    def render(self, emulator: Emulator) -> None:
-        for ((scope, type, name), obj) in emulator.getRegistry().getAll().items():
+        self._log('indexing network prefixes...')
+        self.__prefix_tree = self.__buildPrefixTree()
 
-            if not (type == 'rs' or type == 'rnode' or type == 'hnode'):
-                continue
-            
+    def render(self, emulator: Emulator) -> None:
+        for ((scope, type, name), obj) in emulator.getRegistry().iterNodes({'rs', 'rnode', 'hnode'}):
             node: Node = obj
 
             ifinfo = ''
@@ -109,6 +113,29 @@ class Base(Layer, Graphable):
         """
         return self.__name_servers
 
+    def setAddressPlanner(self, planner: AddressPlanner) -> Base:
+        """!
+        @brief set the address planner. With a planner, ASes and IXes created
+        afterwards get their prefixes and IX member addresses from the planner,
+        instead of from their ASN or ID, so ASNs and IX IDs above 255 work with
+        "auto" prefixes. Set it before creating any AS or IX.
+
+        @param planner address planner, or None to use the default addressing.
+
+        @returns self, for chaining API calls.
+        """
+        self.__planner = planner
+
+        return self
+
+    def getAddressPlanner(self) -> AddressPlanner:
+        """!
+        @brief get the address planner.
+
+        @returns address planner, or None if not set.
+        """
+        return self.__planner
+
     def createAutonomousSystem(self, asn: int) -> AutonomousSystem:
         """!
         @brief Create a new AutonomousSystem.
@@ -118,8 +145,10 @@ class Base(Layer, Graphable):
         @throws AssertionError if asn exists.
         """
         assert asn not in self.__ases, "as{} already exist.".format(asn)
-        self.__ases[asn] = AutonomousSystem(asn)
-        return self.__ases[asn]
+        asobj = AutonomousSystem(asn)
+        if self.__planner != None: asobj.setAddressPlanner(self.__planner)
+        self.__ases[asn] = asobj
+        return asobj
 
     def getAutonomousSystem(self, asn: int) -> AutonomousSystem:
         """!
@@ -152,6 +181,11 @@ class Base(Layer, Graphable):
         @throws AssertionError if IX exists.
         """
         assert asn not in self.__ixes, "ix{} already exist.".format(asn)
+
+        if self.__planner != None:
+            if prefix == "auto": prefix = str(self.__planner.getIxPrefix(asn))
+            if aac == None: aac = self.__planner.createIxConstraint(asn, IPv4Network(prefix))
+
         self.__ixes[asn] = InternetExchange(asn, prefix, aac)
         return self.__ixes[asn]
 
@@ -191,6 +225,42 @@ class Base(Layer, Graphable):
         """
         return list(self.__ixes.keys())
 
+    def __buildPrefixTree(self) -> PrefixTree:
+        """!
+        @brief build prefix tree of all AS networks and IX peering LANs.
+
+        @returns prefix tree.
+        """
+        tree = PrefixTree()
+
+        for asobj in self.__ases.values():
+            scope = str(asobj.getAsn())
+            for netname in asobj.getNetworks():
+                net = asobj.getNetwork(netname)
+                tree.insert(net.getPrefix(), (scope, netname, net))
+
+        for ix in self.__ixes.values():
+            net = ix.getPeeringLan()
+            tree.insert(net.getPrefix(), ('ix', net.getName(), net))
+
+        return tree
+
+    def getPrefixTree(self) -> PrefixTree:
+        """!
+        @brief get the prefix tree of all networks in the base layer, for
+        longest prefix match and overlap lookups.
+
+        Values in the tree are tuples of (scope, network name, network), where
+        scope is the ASN as a string (same as the registry scope) for AS
+        networks, and "ix" for IX peering LANs. The tree is built once when the
+        layer is configured; before that, a new tree is built on every call.
+
+        @returns prefix tree.
+        """
+        if self.__prefix_tree != None: return self.__prefix_tree
+
+        return self.__buildPrefixTree()
+
     def getNodesByName(self, name:str) -> List[Node]:
         """!
         @brief Get list of Nodes by name.
@@ -1,9 +1,11 @@
 from __future__ import annotations
 from .Routing import Router
-from seedemu.core import Registry, ScopedRegistry, Network, Interface, Graphable, Emulator, Layer
-from seedemu.core.enums import NodeRole
-from typing import Tuple, List, Dict
+from seedemu.core import Registry, ScopedRegistry, Interface, Graphable, Emulator, Layer
+from seedemu.core.enums import NodeRole, NetworkType, LogLevel
+from typing import Tuple, List, Dict, Iterable, Iterator
 from enum import Enum
+from array import array
+from bisect import bisect_left
 
 EbgpFileTemplates: Dict[str, str] = {}
 
@@ -99,6 +101,236 @@ class PeerRelationship(Enum):
     ## Unfiltered: no filter on both sides
     Unfiltered = "Unfiltered"
 
+## relationships that can be stored in a PeeringTable, indexed by their code.
+PEERING_TABLE_RELATIONSHIPS: List[PeerRelationship] = [
+    PeerRelationship.Peer,
+    PeerRelationship.Provider,
+    PeerRelationship.Unfiltered
+]
+
+## CAIDA AS-relationship codes. -1: A is a provider of B, 0: A and B are peers.
+CAIDA_RELATIONSHIPS: Dict[str, PeerRelationship] = {
+    '-1': PeerRelationship.Provider,
+    '0': PeerRelationship.Peer
+}
+
+## relationship matrix values. 0: no peering, 1: peers, 2: row AS is a
+## provider of column AS, 3: unfiltered.
+MATRIX_RELATIONSHIPS: Dict[int, PeerRelationship] = {
+    1: PeerRelationship.Peer,
+    2: PeerRelationship.Provider,
+    3: PeerRelationship.Unfiltered
+}
+
+class PeeringTable(object):
+    """!
+    @brief compact table of private peerings in an IX.
+
+    Peerings are kept in flat integer arrays instead of a dict of tuples, so a
+    table of a million peerings takes tens of megabytes instead of hundreds.
+    Peerings are added in batches, and each batch is validated as a whole
+    before anything is stored.
+    """
+
+    __ix: int
+    __a: array
+    __b: array
+    __rels: array
+    __keys: array
+    __positions: array
+
+    def __init__(self, ix: int):
+        """!
+        @brief create a new peering table.
+
+        @param ix IXP id.
+        """
+        self.__ix = ix
+        self.__a = array('I')
+        self.__b = array('I')
+        self.__rels = array('B')
+
+        # sorted unordered pair keys, and the position of the peering of each
+        # key, for lookups and duplicate detection.
+        self.__keys = array('Q')
+        self.__positions = array('I')
+
+    @staticmethod
+    def __getKey(a: int, b: int) -> int:
+        """!
+        @brief get the unordered pair key of two ASNs.
+
+        @param a first ASN.
+        @param b second ASN.
+
+        @returns key.
+        """
+        return (a << 32) | b if a < b else (b << 32) | a
+
+    def __find(self, a: int, b: int) -> int:
+        """!
+        @brief find the position of the peering of two ASes.
+
+        @param a first ASN.
+        @param b second ASN.
+
+        @returns position, or -1 if not peered.
+        """
+        key = PeeringTable.__getKey(a, b)
+        i = bisect_left(self.__keys, key)
+
+        return self.__positions[i] if i < len(self.__keys) and self.__keys[i] == key else -1
+
+    def getIx(self) -> int:
+        """!
+        @brief get IXP id.
+
+        @returns IXP id.
+        """
+        return self.__ix
+
+    def copy(self, ix: int = None) -> PeeringTable:
+        """!
+        @brief copy the table, without validating the peerings again.
+
+        @param ix (optional) IXP id of the copy. Default to the id of this
+        table.
+
+        @returns new table.
+        """
+        table = PeeringTable(ix if ix != None else self.__ix)
+        table.__a = array('I', self.__a)
+        table.__b = array('I', self.__b)
+        table.__rels = array('B', self.__rels)
+        table.__keys = array('Q', self.__keys)
+        table.__positions = array('I', self.__positions)
+
+        return table
+
+    def add(self, peerings: Iterable[Tuple[int, int, PeerRelationship]]) -> PeeringTable:
+        """!
+        @brief add peerings.
+
+        @param peerings peerings, as tuples of (asnA, asnB, abRelationship).
+
+        @throws AssertionError if any peering is invalid or already exists. No
+        peering is added in that case.
+
+        @returns self, for chaining API calls.
+        """
+        a_asns = array('I')
+        b_asns = array('I')
+        rels = array('B')
+        keys = []
+
+        codes = { rel: code for (code, rel) in enumerate(PEERING_TABLE_RELATIONSHIPS) }
+
+        for (a, b, rel) in peerings:
+            assert rel in codes, 'unknow peering relationship {}'.format(rel)
+            assert 0 < a < 2 ** 32 and 0 < b < 2 ** 32, 'invalid peering {} <-> {} at IX{}'.format(a, b, self.__ix)
+            assert a != b, 'AS{} can not peer with itself at IX{}'.format(a, self.__ix)
+
+            a_asns.append(a)
+            b_asns.append(b)
+            rels.append(codes[rel])
+            keys.append(PeeringTable.__getKey(a, b))
+
+        start = len(self.__rels)
+
+        if len(keys) * 32 < len(self.__keys):
+            # small batch: check and insert in place.
+            batch = sorted(zip(keys, range(start, start + len(keys))))
+
+            for i in range(0, len(batch)):
+                key = batch[i][0]
+                j = bisect_left(self.__keys, key)
+
+                duplicated = (i > 0 and batch[i - 1][0] == key) or (j < len(self.__keys) and self.__keys[j] == key)
+                assert not duplicated, '{} <-> {} already peered at IX{}'.format(key >> 32, key & 0xffffffff, self.__ix)
+
+            for (key, position) in batch:
+                j = bisect_left(self.__keys, key)
+                self.__keys.insert(j, key)
+                self.__positions.insert(j, position)
+        else:
+            # large batch: sort and merge with the existing keys. The
+            # existing keys are one sorted run, so this is close to linear.
+            allKeys = self.__keys.tolist() + keys
+            allPositions = self.__positions.tolist() + list(range(start, start + len(keys)))
+            order = sorted(range(len(allKeys)), key = allKeys.__getitem__)
+
+            for i in range(1, len(order)):
+                key = allKeys[order[i]]
+                assert key != allKeys[order[i - 1]], '{} <-> {} already peered at IX{}'.format(key >> 32, key & 0xffffffff, self.__ix)
+
+            self.__keys = array('Q', (allKeys[i] for i in order))
+            self.__positions = array('I', (allPositions[i] for i in order))
+
+        self.__a.extend(a_asns)
+        self.__b.extend(b_asns)
+        self.__rels.extend(rels)
+
+        return self
+
+    def has(self, a: int, b: int) -> bool:
+        """!
+        @brief test if two ASes are peered, in either direction.
+
+        @param a first ASN.
+        @param b second ASN.
+
+        @returns True if peered.
+        """
+        return self.__find(a, b) >= 0
+
+    def get(self, a: int, b: int) -> Tuple[int, int, PeerRelationship]:
+        """!
+        @brief get the peering of two ASes, in either direction.
+
+        @param a first ASN.
+        @param b second ASN.
+
+        @returns tuple of (asnA, asnB, abRelationship), as added, or None if
+        not peered.
+        """
+        position = self.__find(a, b)
+        if position < 0: return None
+
+        return (self.__a[position], self.__b[position], PEERING_TABLE_RELATIONSHIPS[self.__rels[position]])
+
+    def setRelationship(self, a: int, b: int, abRelationship: PeerRelationship) -> PeeringTable:
+        """!
+        @brief change the relationship of an existing peering.
+
+        @param a first ASN, as added.
+        @param b second ASN, as added.
+        @param abRelationship new relationship.
+
+        @throws AssertionError if the ASes are not peered in this direction,
+        or the relationship is unknown.
+
+        @returns self, for chaining API calls.
+        """
+        position = self.__find(a, b)
+
+        assert position >= 0 and self.__a[position] == a, '{} <-> {} not peered at IX{}'.format(a, b, self.__ix)
+        assert abRelationship in PEERING_TABLE_RELATIONSHIPS, 'unknow peering relationship {}'.format(abRelationship)
+
+        self.__rels[position] = PEERING_TABLE_RELATIONSHIPS.index(abRelationship)
+
+        return self
+
+    def __len__(self) -> int:
+        return len(self.__rels)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, PeerRelationship]]:
+        """!
+        @brief iterate peerings, in the order they are added.
+
+        @returns iterator of tuples of (asnA, asnB, abRelationship).
+        """
+        for (a, b, code) in zip(self.__a, self.__b, self.__rels):
+            yield (a, b, PEERING_TABLE_RELATIONSHIPS[code])
 
 class Ebgp(Layer, Graphable):
     """!
@@ -110,6 +342,7 @@ class Ebgp(Layer, Graphable):
     __peerings: Dict[Tuple[int, int, int], PeerRelationship]
     __rs_peers: List[Tuple[int, int]]
     __xc_peerings: Dict[Tuple[int, int], PeerRelationship]
+    __peering_tables: Dict[int, PeeringTable] = None
 
     def __init__(self):
         """!
@@ -117,6 +350,7 @@ class Ebgp(Layer, Graphable):
         """
         super().__init__()
         self.__peerings = {}
+        self.__peering_tables = {}
         self.__xc_peerings = {}
         self.__rs_peers = []
         self.addDependency('Routing', False, False)
@@ -139,7 +373,7 @@ class Ebgp(Layer, Graphable):
                 routerB = node
 
             if not node.getAttribute('__bgp_bootstrapped', False):
-                self._log('Bootstraping as{}/{} for BGP...'.format(node.getAsn(), node.getName()))
+                self._log('Bootstraping as{}/{} for BGP...', node.getAsn(), node.getName(), level = LogLevel.Debug)
 
                 node.setAttribute('__bgp_bootstrapped', True)
                 node.appendFile('/etc/bird/bird.conf', EbgpFileTemplates['bgp_commons'].format(localAsn=node.getAsn()))
@@ -294,6 +528,7 @@ class Ebgp(Layer, Graphable):
         """
         assert (ix, a, b) not in self.__peerings, '{} <-> {} already peered at IX{}'.format(a, b, ix)
         assert (ix, b, a) not in self.__peerings, '{} <-> {} already peered at IX{}'.format(b, a, ix)
+        assert not self.__hasBulkPeering(ix, a, b), '{} <-> {} already peered at IX{}'.format(a, b, ix)
         assert abRelationship == PeerRelationship.Peer or abRelationship == PeerRelationship.Provider or abRelationship == PeerRelationship.Unfiltered, 'unknow peering relationship {}'.format(
             abRelationship)
 
@@ -324,13 +559,199 @@ class Ebgp(Layer, Graphable):
 
         return self
 
-    def getPrivatePeerings(self) -> Dict[Tuple[int, int, int], PeerRelationship]:
+    def __hasBulkPeering(self, ix: int, a: int, b: int) -> bool:
+        """!
+        @brief test if two ASes are peered in the peering table of an IX.
+
+        @param ix IXP id.
+        @param a first ASN.
+        @param b second ASN.
+
+        @returns True if peered.
+        """
+        if self.__peering_tables == None or ix not in self.__peering_tables: return False
+
+        return self.__peering_tables[ix].has(a, b)
+
+    def __checkPeerings(self, ix: int, peerings: Iterable[Tuple[int, int, PeerRelationship]]) -> Iterator[Tuple[int, int, PeerRelationship]]:
+        """!
+        @brief check peerings against the ones added with addPrivatePeering.
+
+        @param ix IXP id.
+        @param peerings peerings, as tuples of (asnA, asnB, abRelationship).
+
+        @throws AssertionError if any peering already exists.
+
+        @returns iterator of the same peerings.
+        """
+        for (a, b, rel) in peerings:
+            assert (ix, a, b) not in self.__peerings, '{} <-> {} already peered at IX{}'.format(a, b, ix)
+            assert (ix, b, a) not in self.__peerings, '{} <-> {} already peered at IX{}'.format(b, a, ix)
+
+            yield (a, b, rel)
+
+    def addBulkPrivatePeerings(self, ix: int, peerings: Iterable[Tuple[int, int, PeerRelationship]]) -> Ebgp:
+        """!
+        @brief Setup many private peerings in IX at once.
+
+        Unlike addPrivatePeering, the whole set is validated in one pass, and
+        stored in a compact peering table instead of one dict entry per
+        peering. Use this to add hundreds of thousands of peerings.
+
+        @param ix IXP id.
+        @param peerings peerings, as tuples of (asnA, asnB, abRelationship),
+        or a PeeringTable. See addPrivatePeering for relationships.
+
+        @throws AssertionError if any peering is invalid or already exists. No
+        peering is added in that case.
+
+        @returns self, for chaining API calls.
+        """
+        if self.__peering_tables == None: self.__peering_tables = {}
+
+        if isinstance(peerings, PeeringTable) and ix not in self.__peering_tables and len(self.__peerings) == 0:
+            # already validated, nothing to check against.
+            self.__peering_tables[ix] = peerings.copy(ix)
+            self._log('added {} peerings at IX{}.', len(peerings), ix)
+
+            return self
+
+        if len(self.__peerings) > 0: peerings = self.__checkPeerings(ix, peerings)
+
+        table = self.__peering_tables[ix] if ix in self.__peering_tables else PeeringTable(ix)
+        count = len(table)
+        table.add(peerings)
+
+        self.__peering_tables[ix] = table
+        self._log('added {} peerings at IX{}, {} in total.', len(table) - count, ix, len(table))
+
+        return self
+
+    def __readRelationships(self, path: str) -> Iterator[Tuple[int, int, PeerRelationship]]:
+        """!
+        @brief read a CAIDA AS-relationship file.
+
+        @param path path to the file.
+
+        @throws AssertionError if the file is malformed.
+
+        @returns iterator of tuples of (asnA, asnB, abRelationship).
+        """
+        with open(path, 'r') as f:
+            for (line, text) in enumerate(f, 1):
+                text = text.strip()
+                if text == '' or text.startswith('#'): continue
+
+                fields = text.split('|')
+                assert len(fields) >= 3, '{}:{}: malformed relationship "{}"'.format(path, line, text)
+                assert fields[2] in CAIDA_RELATIONSHIPS, '{}:{}: unknown relationship {}'.format(path, line, fields[2])
+                assert fields[0].isdigit() and fields[1].isdigit(), '{}:{}: malformed ASN in "{}"'.format(path, line, text)
+
+                yield (int(fields[0]), int(fields[1]), CAIDA_RELATIONSHIPS[fields[2]])
+
+    def addPrivatePeeringsFromFile(self, ix: int, path: str) -> Ebgp:
+        """!
+        @brief Setup private peerings in IX from a CAIDA AS-relationship file.
+
+        Each line of the file is "asnA|asnB|relationship", optionally followed
+        by "|source". Relationship -1 means A is a provider of B, and 0 means
+        A and B are peers. Lines starting with "#" are ignored.
+
+        @param ix IXP id.
+        @param path path to the file.
+
+        @throws AssertionError if the file is malformed, or any peering is
+        invalid or already exists.
+
+        @returns self, for chaining API calls.
+        """
+        return self.addBulkPrivatePeerings(ix, self.__readRelationships(path))
+
+    def __readMatrix(self, asns: List[int], matrix: Iterable[Iterable[int]]) -> Iterator[Tuple[int, int, PeerRelationship]]:
+        """!
+        @brief read a relationship matrix.
+
+        @param asns ASNs of the rows and columns.
+        @param matrix relationship matrix.
+
+        @throws AssertionError if the matrix is malformed.
+
+        @returns iterator of tuples of (asnA, asnB, abRelationship).
+        """
+        rows = 0
+
+        for (i, row) in enumerate(matrix):
+            values = row.tolist() if hasattr(row, 'tolist') else list(row)
+            assert len(values) == len(asns), 'row {} has {} columns, expected {}.'.format(i, len(values), len(asns))
+
+            for (j, value) in enumerate(values):
+                if value == 0: continue
+                assert value in MATRIX_RELATIONSHIPS, 'unknown relationship {} at ({}, {}).'.format(value, i, j)
+
+                yield (asns[i], asns[j], MATRIX_RELATIONSHIPS[value])
+
+            rows += 1
+
+        assert rows == len(asns), 'matrix has {} rows, expected {}.'.format(rows, len(asns))
+
+    def addPrivatePeeringMatrix(self, ix: int, asns: List[int], matrix: Iterable[Iterable[int]]) -> Ebgp:
+        """!
+        @brief Setup private peerings in IX from a relationship matrix.
+
+        matrix[i][j] is the relationship of asns[i] to asns[j]: 0 for no
+        peering, 1 for peers, 2 if asns[i] is a provider of asns[j], and 3 for
+        unfiltered. A pair of ASes can only be set once, so matrix[i][j] and
+        matrix[j][i] can not both be non-zero.
+
+        @param ix IXP id.
+        @param asns ASNs of the rows and columns.
+        @param matrix relationship matrix. Can be a list of lists, or any
+        sequence of rows with a tolist method, like array.array or a NumPy
+        array.
+
+        @throws AssertionError if the matrix is malformed, or any peering is
+        invalid or already exists.
+
+        @returns self, for chaining API calls.
+        """
+        return self.addBulkPrivatePeerings(ix, self.__readMatrix(asns, matrix))
+
+    def __iterPrivatePeerings(self) -> Iterator[Tuple[Tuple[int, int, int], PeerRelationship]]:
+        """!
+        @brief iterate all private peerings, including the ones in peering
+        tables.
+
+        @returns iterator of tuples of ((ix, asnA, asnB), relationship).
+        """
+        yield from self.__peerings.items()
+
+        if self.__peering_tables == None: return
+
+        for (ix, table) in self.__peering_tables.items():
+            for (a, b, rel) in table: yield ((ix, a, b), rel)
+
+    def getPrivatePeerings(self, includeBulk: bool = True) -> Dict[Tuple[int, int, int], PeerRelationship]:
         """!
         @brief Get private peerings.
 
-        @returns dict, where key is tuple of (ix, asnA, asnB) and value is peering relationship.
+        @param includeBulk (optional) include peerings added in bulk, see
+        getPeeringTables. Default to True.
+
+        @returns dict, where key is tuple of (ix, asnA, asnB) and value is
+        peering relationship. If peerings added in bulk are included, the dict
+        is a copy.
         """
-        return self.__peerings
+        if not includeBulk or self.__peering_tables == None or len(self.__peering_tables) == 0: return self.__peerings
+
+        return dict(self.__iterPrivatePeerings())
+
+    def getPeeringTables(self) -> Dict[int, PeeringTable]:
+        """!
+        @brief Get peering tables of peerings added in bulk.
+
+        @returns dict, where key is IXP id and value is peering table.
+        """
+        return self.__peering_tables if self.__peering_tables != None else {}
 
     def addCrossConnectPeering(self, a: int, b: int, abRelationship: PeerRelationship = PeerRelationship.Peer) -> Ebgp:
         """!
@@ -405,33 +826,59 @@ class Ebgp(Layer, Graphable):
         """
         return self.__rs_peers
 
+    def __buildIxIndex(self, reg: Registry) -> Dict[Tuple[str, int], Tuple[Router, Interface]]:
+        """!
+        @brief index the IX interfaces of all routers.
+
+        @param reg registry.
+
+        @returns dict, where key is tuple of (IX network name, ASN), and value
+        is tuple of the first router of the AS on the IX and its interface.
+        """
+        index: Dict[Tuple[str, int], Tuple[Router, Interface]] = {}
+
+        for ((scope, _, _), node) in reg.iterNodes({'rnode'}):
+            for iface in node.getInterfaces():
+                net = iface.getNet()
+                if net.getType() != NetworkType.InternetExchange: continue
+
+                key = (net.getName(), int(scope))
+                if key not in index: index[key] = (node, iface)
+
+        return index
+
+    def __getIxInterface(self, index: Dict[Tuple[str, int], Tuple[Router, Interface]], ix: int, asn: int) -> Tuple[Router, Interface]:
+        """!
+        @brief find the router of an AS on an IX.
+
+        @param index index built by __buildIxIndex.
+        @param ix IX id.
+        @param asn ASN.
+
+        @returns tuple of router and its interface on the IX.
+        @throws AssertionError if the AS is not on the IX.
+        """
+        key = ('ix{}'.format(ix), asn)
+        assert key in index, 'cannot resolve peering: as{} not in ix{}'.format(asn, ix)
+
+        return index[key]
+
     def configure(self, emulator: Emulator) -> None:
         reg = emulator.getRegistry()
+        ix_reg = ScopedRegistry('ix', reg)
 
-        for (ix, peer) in self.__rs_peers:
-            ix_reg = ScopedRegistry('ix', reg)
-            p_reg = ScopedRegistry(str(peer), reg)
+        self._log('indexing ix members...')
+        ix_index = self.__buildIxIndex(reg)
 
-            ix_net: Network = ix_reg.get('net', 'ix{}'.format(ix))
+        for (ix, peer) in self.__rs_peers:
             ix_rs: Router = ix_reg.get('rs', 'ix{}'.format(ix))
             rs_ifs = ix_rs.getInterfaces()
             assert len(rs_ifs) == 1, '??? ix{} rs has {} interfaces.'.format(ix, len(rs_ifs))
             rs_if = rs_ifs[0]
 
-            p_rnodes: List[Router] = p_reg.getByType('rnode')
-            p_ixnode: Router = None
-            p_ixif: Interface = None
-            for node in p_rnodes:
-                if p_ixnode != None: break
-                for iface in node.getInterfaces():
-                    if iface.getNet() == ix_net:
-                        p_ixnode = node
-                        p_ixif = iface
-                        break
-
-            assert p_ixnode != None, 'cannot resolve peering: as{} not in ix{}'.format(peer, ix)
+            (p_ixnode, p_ixif) = self.__getIxInterface(ix_index, ix, peer)
             self._log(
-                "adding peering: {} as {} (RS) <-> {} as {}".format(rs_if.getAddress(), ix, p_ixif.getAddress(), peer))
+                "adding peering: {} as {} (RS) <-> {} as {}", rs_if.getAddress(), ix, p_ixif.getAddress(), peer, level = LogLevel.Debug)
 
             self.__createPeer(ix_rs, p_ixnode, rs_if.getAddress(), p_ixif.getAddress(), PeerRelationship.Peer)
 
@@ -466,46 +913,17 @@ class Ebgp(Layer, Graphable):
 
             assert hit, 'cannot find XC to configure peer AS{} <--> AS{}'.format(a, b)
 
-            self._log("adding XC peering: {} as {} <-({})-> {} as {}".format(a_addr, a, rel, b_addr, b))
+            self._log("adding XC peering: {} as {} <-({})-> {} as {}", a_addr, a, rel, b_addr, b, level = LogLevel.Debug)
 
             self.__createPeer(a_router, b_router, a_addr, b_addr, rel)
 
-        for (ix, a, b), rel in self.__peerings.items():
-            ix_reg = ScopedRegistry('ix', reg)
-            a_reg = ScopedRegistry(str(a), reg)
-            b_reg = ScopedRegistry(str(b), reg)
-
-            ix_net: Network = ix_reg.get('net', 'ix{}'.format(ix))
-            a_rnodes: List[Router] = a_reg.getByType('rnode')
-            b_rnodes: List[Router] = b_reg.getByType('rnode')
-
-            a_ixnode: Router = None
-            a_ixif: Interface = None
-            for node in a_rnodes:
-                if a_ixnode != None: break
-                for iface in node.getInterfaces():
-                    if iface.getNet() == ix_net:
-                        a_ixnode = node
-                        a_ixif = iface
-                        break
-
-            assert a_ixnode != None, 'cannot resolve peering: as{} not in ix{}'.format(a, ix)
-
-            b_ixnode: Router = None
-            b_ixif: Interface = None
-            for node in b_rnodes:
-                if b_ixnode != None: break
-                for iface in node.getInterfaces():
-                    if iface.getNet() == ix_net:
-                        b_ixnode = node
-                        b_ixif = iface
-                        break
-
-            assert b_ixnode != None, 'cannot resolve peering: as{} not in ix{}'.format(b, ix)
+        for (ix, a, b), rel in self.__iterPrivatePeerings():
+            (a_ixnode, a_ixif) = self.__getIxInterface(ix_index, ix, a)
+            (b_ixnode, b_ixif) = self.__getIxInterface(ix_index, ix, b)
 
             self._log(
-                "adding IX peering: {} as {} <-({})-> {} as {}".format(a_ixif.getAddress(), a, rel, b_ixif.getAddress(),
-                                                                       b))
+                "adding IX peering: {} as {} <-({})-> {} as {}", a_ixif.getAddress(), a, rel, b_ixif.getAddress(),
+                b, level = LogLevel.Debug)
 
             self.__createPeer(a_ixnode, b_ixnode, a_ixif.getAddress(), b_ixif.getAddress(), rel)
 
@@ -523,9 +941,9 @@ class Ebgp(Layer, Graphable):
 
         ix_list = set()
         for (i, _) in self.__rs_peers: ix_list.add(i)
-        for (i, _, _), _ in self.__peerings.items(): ix_list.add(i)
+        for (i, _, _), _ in self.__iterPrivatePeerings(): ix_list.add(i)
         for ix in ix_list:
-            self._log('Creating RS peering sessions graph for IX{}...'.format(ix))
+            self._log('Creating RS peering sessions graph for IX{}...', ix)
             ix_graph = self._addGraph('IX{} Peering Sessions'.format(ix), False)
 
             mesh_ases = set()
@@ -533,7 +951,7 @@ class Ebgp(Layer, Graphable):
             for (i, a) in self.__rs_peers:
                 if i == ix: mesh_ases.add(a)
 
-            self._log('IX{} RS-mesh: {}'.format(ix, mesh_ases))
+            self._log('IX{} RS-mesh: {}', ix, mesh_ases)
 
             while len(mesh_ases) > 0:
                 a = mesh_ases.pop()
@@ -552,8 +970,8 @@ class Ebgp(Layer, Graphable):
                     ix_graph.addEdge('AS{}'.format(a), 'AS{}'.format(b), 'IX{}'.format(ix), 'IX{}'.format(ix),
                                      style='dashed', alabel='R', blabel='R')
 
-        for (i, a, b), rel in self.__peerings.items():
-            self._log('Creating private peering sessions graph for IX{} AS{} <-> AS{}...'.format(i, a, b))
+        for (i, a, b), rel in self.__iterPrivatePeerings():
+            self._log('Creating private peering sessions graph for IX{} AS{} <-> AS{}...', i, a, b, level = LogLevel.Debug)
 
             ix_graph = self._addGraph('IX{} Peering Sessions'.format(i), False)
 
@@ -603,7 +1021,7 @@ class Ebgp(Layer, Graphable):
             out += ' ' * indent
             out += 'IX{}: RS <-> AS{}\n'.format(i, a)
 
-        for (i, a, b), rel in self.__peerings.items():
+        for (i, a, b), rel in self.__iterPrivatePeerings():
             out += ' ' * indent
             out += 'IX{}: AS{} <--({})--> AS{}\n'.format(i, a, rel, b)
 
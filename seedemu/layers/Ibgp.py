@@ -1,8 +1,8 @@
 from __future__ import annotations
-from seedemu.core.enums import NetworkType, NodeRole
+from seedemu.core.enums import NetworkType, NodeRole, LogLevel
 from .Base import Base
 from seedemu.core import ScopedRegistry, Node, Graphable, Emulator, Layer
-from typing import List, Set, Dict
+from typing import List, Set, Dict, Tuple
 
 IbgpFileTemplates: Dict[str, str] = {}
 
@@ -17,35 +17,56 @@ IbgpFileTemplates['ibgp_peer'] = '''
     neighbor {peerAddress} as {asn};
 '''
 
+IbgpFileTemplates['ibgp_rr_client'] = '''\
+    rr client;
+    rr cluster id {clusterId};
+'''
+
 class Ibgp(Layer, Graphable):
     """!
     @brief The Ibgp (iBGP) layer.
 
     This layer automatically setup full mesh peering between routers within AS.
+
+    Full mesh needs a session between every pair of routers, which does not
+    scale to ASes with hundreds of routers. ASes can use route reflection
+    instead: in each set of connected routers, one or more routers are route
+    reflectors, which peer with every router of the set, while the other
+    routers only peer with the route reflectors.
     """
     __masked: Set[int]
 
+    __reflectors: Dict[int, Set[str]] = None
+    __reflector_counts: Dict[int, int] = None
+    __default_reflector_count: int = 0
+
     def __init__(self):
         """!
         @brief Ibgp (iBGP) layer constructor.
         """
         super().__init__()
         self.__masked = set()
+        self.__reflectors = {}
+        self.__reflector_counts = {}
         self.addDependency('Ospf', False, False)
 
-    def __dfs(self, start: Node, visited: List[Node], netname: str = 'self'):
+    def __dfs(self, start: Node, visited: List[Node], netname: str = 'self', seen: Set[Node] = None):
         """!
         @brief do a DFS and find all local routers to setup IBGP.
 
         @param start node to start from.
         @paarm visited list to store nodes.
         @param netname name of the net - for log only.
+        @param seen (optional) set of visited nodes, for fast lookups.
         """
-        if start in visited:
+        if seen == None: seen = set(visited)
+
+        if start in seen:
             return
         
-        self._log('found node: as{}/{} via {}'.format(start.getAsn(), start.getName(), netname))
+        self._log('found node: as{}/{} via {}', start.getAsn(), start.getName(), netname, level = LogLevel.Debug)
         visited.append(start)
+        seen.add(start)
 
         for iface in start.getInterfaces():
             net = iface.getNet()
@@ -60,7 +81,7 @@ class Ibgp(Layer, Graphable):
                 if neigh.getRole() != NodeRole.Router: 
                     continue
                 
-                self.__dfs(neigh, visited, net.getName())
+                self.__dfs(neigh, visited, net.getName(), seen)
 
 
     def getName(self) -> str:
@@ -89,17 +110,200 @@ class Ibgp(Layer, Graphable):
         """
         return self.__masked
 
+    def setRouteReflector(self, asn: int, name: str) -> Ibgp:
+        """!
+        @brief Use a router as route reflector. This enables route reflection
+        for the AS. Sets of connected routers in the AS without a route
+        reflector set by this method get route reflectors picked
+        automatically, see enableRouteReflection.
+
+        @param asn ASN of the router.
+        @param name name of the router.
+
+        @returns self, for chaining API calls.
+        """
+        if self.__reflectors == None: self.__reflectors = {}
+        if asn not in self.__reflectors: self.__reflectors[asn] = set()
+        self.__reflectors[asn].add(name)
+
+        return self
+
+    def getRouteReflectors(self) -> Dict[int, Set[str]]:
+        """!
+        @brief Get route reflectors set with setRouteReflector.
+
+        @returns dict of ASN to set of router names.
+        """
+        return self.__reflectors if self.__reflectors != None else {}
+
+    def enableRouteReflection(self, asn: int = None, reflectors: int = 1) -> Ibgp:
+        """!
+        @brief Use route reflection instead of full mesh. Route reflectors are
+        picked automatically: the routers with the most neighboring routers in
+        each set of connected routers, unless set with setRouteReflector.
+
+        @param asn (optional) ASN of the AS. Default to None, for all ASes.
+        @param reflectors (optional) number of route reflectors to pick in each
+        set of connected routers. Set to 0 to use full mesh. Default to 1.
+
+        @returns self, for chaining API calls.
+        """
+        assert reflectors >= 0, 'invalid number of route reflectors: {}.'.format(reflectors)
+
+        if asn == None:
+            self.__default_reflector_count = reflectors
+            return self
+
+        if self.__reflector_counts == None: self.__reflector_counts = {}
+        self.__reflector_counts[asn] = reflectors
+
+        return self
+
+    def getRouteReflectorCounts(self) -> Dict[int, int]:
+        """!
+        @brief Get number of route reflectors set with enableRouteReflection.
+
+        @returns dict of ASN to number of route reflectors. The None key, if
+        present, is the number for all other ASes.
+        """
+        counts = dict(self.__reflector_counts) if self.__reflector_counts != None else {}
+        if self.__default_reflector_count > 0: counts[None] = self.__default_reflector_count
+
+        return counts
+
+    def __getReflectorCount(self, asn: int) -> int:
+        """!
+        @brief get number of route reflectors to pick in each set of connected
+        routers of an AS.
+
+        @param asn ASN.
+
+        @returns number of route reflectors, 0 for full mesh.
+        """
+        counts = self.__reflector_counts if self.__reflector_counts != None else {}
+        count = counts[asn] if asn in counts else self.__default_reflector_count
+
+        if count == 0 and asn in self.getRouteReflectors(): count = 1
+
+        return count
+
+    def __getNeighbors(self, router: Node) -> List[Node]:
+        """!
+        @brief get routers on the same local networks as a router.
+
+        @param router router.
+
+        @returns list of routers, without duplicates.
+        """
+        neighbors: Dict[Node, None] = {}
+
+        for iface in router.getInterfaces():
+            net = iface.getNet()
+            if net.getType() != NetworkType.Local: continue
+
+            for neigh in net.getAssociations():
+                if neigh.getRole() == NodeRole.Router and neigh != router: neighbors[neigh] = None
+
+        return list(neighbors.keys())
+
+    def __getClusters(self, asn: int, routers: List[Node]) -> List[Tuple[List[Node], List[Node]]]:
+        """!
+        @brief split the routers of an AS into sets of connected routers, and
+        find the route reflectors of each.
+
+        @param asn ASN.
+        @param routers routers of the AS.
+
+        @returns list of tuples of routers and route reflectors, in the order
+        of the routers.
+        """
+        count = self.__getReflectorCount(asn)
+        names = self.getRouteReflectors().get(asn, set())
+
+        for name in names:
+            assert name in [router.getName() for router in routers], 'as{}: route reflector {} is not a router.'.format(asn, name)
+
+        neighbors = { router: self.__getNeighbors(router) for router in routers }
+        clustered: Set[Node] = set()
+        clusters: List[Tuple[List[Node], List[Node]]] = []
+
+        for router in routers:
+            if router in clustered: continue
+
+            members = [router]
+            clustered.add(router)
+
+            for member in members:
+                for neigh in neighbors.get(member, []):
+                    if neigh in clustered: continue
+                    clustered.add(neigh)
+                    members.append(neigh)
+
+            reflectors = [member for member in members if member.getName() in names]
+
+            if len(reflectors) == 0:
+                ranked = sorted(members, key = lambda member: (-len(neighbors.get(member, [])), member.getName()))
+                reflectors = ranked[:count]
+
+            clusters.append((members, reflectors))
+
+        return clusters
+
+    def __renderRouteReflection(self, asn: int, routers: List[Node]):
+        """!
+        @brief setup route reflection in an AS.
+
+        @param asn ASN.
+        @param routers routers of the AS.
+        """
+        for (members, reflectors) in self.__getClusters(asn, routers):
+            clusterId = reflectors[0].getLoopbackAddress()
+
+            self._log('as{}: route reflectors {} for {} routers.', asn, ', '.join(r.getName() for r in reflectors), len(members), level = LogLevel.Debug)
+
+            for local in members:
+                isReflector = local in reflectors
+                n = 1
+
+                for remote in (members if isReflector else reflectors):
+                    if local == remote: continue
+
+                    laddr = local.getLoopbackAddress()
+                    raddr = remote.getLoopbackAddress()
+
+                    config = IbgpFileTemplates['ibgp_peer'].format(
+                        localAddress = laddr,
+                        peerAddress = raddr,
+                        asn = asn
+                    )
+
+                    if isReflector and remote not in reflectors:
+                        config += IbgpFileTemplates['ibgp_rr_client'].format(clusterId = clusterId)
+
+                    local.addTable('t_bgp')
+                    local.addTablePipe('t_bgp')
+                    local.addTablePipe('t_direct', 't_bgp')
+                    local.addProtocol('bgp', 'ibgp{}'.format(n), config)
+
+                    n += 1
+
+                    self._log('adding peering: {} <-> {} (ibgp{}, as{})', laddr, raddr, ' rr' if isReflector and remote not in reflectors else '', asn, level = LogLevel.Debug)
+
     def render(self, emulator: Emulator):
         reg = emulator.getRegistry()
         base: Base = reg.get('seedemu', 'layer', 'Base')
         for asn in base.getAsns():
             if asn in self.__masked: continue
 
-            self._log('setting up IBGP peering for as{}...'.format(asn))
+            self._log('setting up IBGP peering for as{}...', asn)
             routers: List[Node] = ScopedRegistry(str(asn), reg).getByType('rnode')
 
+            if self.__getReflectorCount(asn) > 0:
+                self.__renderRouteReflection(asn, routers)
+                continue
+
             for local in routers:
-                self._log('setting up IBGP peering on as{}/{}...'.format(asn, local.getName()))
+                self._log('setting up IBGP peering on as{}/{}...', asn, local.getName(), level = LogLevel.Debug)
 
                 remotes = []
                 self.__dfs(local, remotes)
@@ -121,7 +325,7 @@ class Ibgp(Layer, Graphable):
 
                     n += 1
 
-                    self._log('adding peering: {} <-> {} (ibgp, as{})'.format(laddr, raddr, asn))
+                    self._log('adding peering: {} <-> {} (ibgp, as{})', laddr, raddr, asn, level = LogLevel.Debug)
 
     def _doCreateGraphs(self, emulator: Emulator):
         base: Base = emulator.getRegistry().get('seedemu', 'layer', 'Base')
@@ -136,6 +340,14 @@ class Ibgp(Layer, Graphable):
                 edge.style = 'dotted'
 
             rtrs = ScopedRegistry(str(asn), emulator.getRegistry()).getByType('rnode').copy()
+
+            if self.__getReflectorCount(asn) > 0:
+                for (members, reflectors) in self.__getClusters(asn, rtrs):
+                    for (i, a) in enumerate(reflectors):
+                        for b in members:
+                            if b == a or (b in reflectors and reflectors.index(b) < i): continue
+                            ibgpgraph.addEdge('Router: {}'.format(a.getName()), 'Router: {}'.format(b.getName()), style = 'solid')
+                continue
             
             while len(rtrs) > 0:
                 a = rtrs.pop()
@@ -156,5 +368,14 @@ class Ibgp(Layer, Graphable):
             out += ' ' * indent
             out += '{}\n'.format(asn)
 
+        indent -= 4
+        out += ' ' * indent
+        out += 'Route Reflectors:\n'
+
+        indent += 4
+        for (asn, names) in self.getRouteReflectors().items():
+            out += ' ' * indent
+            out += 'as{}: {}\n'.format(asn, ', '.join(sorted(names)))
+
         return out
 
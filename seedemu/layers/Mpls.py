@@ -3,7 +3,7 @@ from .Ospf import Ospf
 from .Ibgp import Ibgp
 from .Routing import Router
 from seedemu.core import Node, ScopedRegistry, Graphable, Emulator, Layer
-from seedemu.core.enums import NetworkType, NodeRole
+from seedemu.core.enums import NetworkType, NodeRole, LogLevel
 from typing import List, Tuple, Dict, Set
 
 MplsFileTemplates: Dict[str, str] = {}
@@ -185,7 +185,7 @@ class Mpls(Layer, Graphable):
 
         @param node node.
         """
-        self._log('Setting up LDP and OSPF on as{}/{}'.format(node.getAsn(), node.getName()))
+        self._log('Setting up LDP and OSPF on as{}/{}', node.getAsn(), node.getName(), level = LogLevel.Debug)
 
         node.setPrivileged(True)
         node.addSoftware('frr')
@@ -244,12 +244,12 @@ class Mpls(Layer, Graphable):
         reg = emulator.getRegistry()
         for asn in self.__enabled:
             if reg.has('seedemu', 'layer', 'Ospf'):
-                self._log('Ospf layer exists, masking as{}'.format(asn))
+                self._log('Ospf layer exists, masking as{}', asn)
                 ospf: Ospf = reg.get('seedemu', 'layer', 'Ospf')
                 ospf.maskAsn(asn)
 
             if reg.has('seedemu', 'layer', 'Ibgp'):
-                self._log('Ibgp layer exists, masking as{}'.format(asn))
+                self._log('Ibgp layer exists, masking as{}', asn)
                 ibgp: Ibgp = reg.get('seedemu', 'layer', 'Ibgp')
                 ibgp.maskAsn(asn)
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from seedemu.core import Node, Emulator, Layer
-from seedemu.core.enums import NetworkType
+from seedemu.core.enums import NetworkType, LogLevel
 from typing import Set, Dict, List, Tuple
 
 OspfFileTemplates: Dict[str, str] = {}
@@ -145,15 +145,14 @@ class Ospf(Layer):
     def render(self, emulator: Emulator):
         reg = emulator.getRegistry()
 
-        for ((scope, type, name), obj) in reg.getAll().items():
-            if type != 'rnode': continue
+        for ((scope, type, name), obj) in reg.iterNodes({'rnode'}):
             router: Node = obj
             if router.getAsn() in self.__masked_asn: continue
 
             stubs: List[str] = ['dummy0']
             active: List[str] = []
 
-            self._log('setting up OSPF for router as{}/{}...'.format(scope, name))
+            self._log('setting up OSPF for router as{}/{}...', scope, name, level = LogLevel.Debug)
             for iface in router.getInterfaces():
                 net = iface.getNet()
 
@@ -1,4 +1,5 @@
 from seedemu.core import ScopedRegistry, Node, Interface, Network, Emulator, Layer, Router, RealWorldRouter
+from seedemu.core.enums import LogLevel
 from typing import List, Dict
 from ipaddress import IPv4Network
 
@@ -79,7 +80,8 @@ class Routing(Layer):
         @brief Routing layre constructor.
 
         @param loopback_range (optional) network range for assiging loopback
-        IP addresses.
+        IP addresses. Not used if the base layer has an address planner, in
+        which case loopback addresses come from the planner.
         """
         super().__init__()
         self.__loopback_assigner = IPv4Network(loopback_range)
@@ -99,13 +101,17 @@ class Routing(Layer):
 
     def configure(self, emulator: Emulator):
         reg = emulator.getRegistry()
-        for ((scope, type, name), obj) in reg.getAll().items():
+        planner = None
+        if reg.has('seedemu', 'layer', 'Base'):
+            planner = emulator.getLayer('Base').getAddressPlanner()
+
+        for ((scope, type, name), obj) in reg.iterNodes({'rs', 'rnode'}):
             if type == 'rs':
                 rs_node: Node = obj
                 self.__installBird(rs_node)
                 rs_node.appendStartCommand('[ ! -d /run/bird ] && mkdir /run/bird')
                 rs_node.appendStartCommand('bird -d', True)
-                self._log("Bootstraping bird.conf for RS {}...".format(name))
+                self._log("Bootstraping bird.conf for RS {}...", name, level = LogLevel.Debug)
 
                 rs_ifaces = rs_node.getInterfaces()
                 assert len(rs_ifaces) == 1, "rs node {} has != 1 interfaces".format(rs_node.getName())
@@ -121,17 +127,19 @@ class Routing(Layer):
                 rnode: Router = obj
                 if not issubclass(rnode.__class__, Router): rnode.__class__ = Router
 
-                self._log("Setting up loopback interface for AS{} Router {}...".format(scope, name))
+                self._log("Setting up loopback interface for AS{} Router {}...", scope, name, level = LogLevel.Debug)
 
-                lbaddr = self.__loopback_assigner[self.__loopback_pos]
+                if planner != None: lbaddr = planner.allocateLoopback()
+                else:
+                    lbaddr = self.__loopback_assigner[self.__loopback_pos]
+                    self.__loopback_pos += 1
 
                 rnode.appendStartCommand('ip li add dummy0 type dummy')
                 rnode.appendStartCommand('ip li set dummy0 up')
                 rnode.appendStartCommand('ip addr add {}/32 dev dummy0'.format(lbaddr))
                 rnode.setLoopbackAddress(lbaddr)
-                self.__loopback_pos += 1
 
-                self._log("Bootstraping bird.conf for AS{} Router {}...".format(scope, name))
+                self._log("Bootstraping bird.conf for AS{} Router {}...", scope, name, level = LogLevel.Debug)
 
                 self.__installBird(rnode)
 
@@ -161,7 +169,7 @@ class Routing(Layer):
 
     def render(self, emulator: Emulator):
         reg = emulator.getRegistry()
-        for ((scope, type, name), obj) in reg.getAll().items():
+        for ((scope, type, name), obj) in reg.iterNodes({'rs', 'rnode', 'hnode'}):
             if type == 'rs' or type == 'rnode':
                 assert issubclass(obj.__class__,
                                   Router), 'routing: render: adding new RS/Router after routing layer configured is not currently supported.'
@@ -169,7 +177,7 @@ class Routing(Layer):
             if type == 'rnode':
                 rnode: Router = obj
                 if issubclass(rnode.__class__, RealWorldRouter):
-                    self._log("Sealing real-world router as{}/{}...".format(rnode.getAsn(), rnode.getName()))
+                    self._log("Sealing real-world router as{}/{}...", rnode.getAsn(), rnode.getName(), level = LogLevel.Debug)
                     rnode.seal()
 
             if type == 'hnode':
@@ -189,8 +197,8 @@ class Routing(Layer):
                             break
 
                 assert rif != None, 'Host {} in as{} in network {}: no router'.format(name, scope, hnet.getName())
-                self._log("Setting default route for host {} ({}) to router {}".format(name, hif.getAddress(),
-                                                                                       rif.getAddress()))
+                self._log("Setting default route for host {} ({}) to router {}", name, hif.getAddress(),
+                          rif.getAddress(), level = LogLevel.Debug)
                 hnode.appendStartCommand('ip rou del default 2> /dev/null')
                 hnode.appendStartCommand(
                     'ip route add default via {} dev {}'.format(rif.getAddress(), rif.getNet().getName()))
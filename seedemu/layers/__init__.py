@@ -1,6 +1,6 @@
 from .Base import Base
 from .Routing import Routing, Router, RealWorldRouter
-from .Ebgp import Ebgp, PeerRelationship
+from .Ebgp import Ebgp, PeerRelationship, PeeringTable
 from .Ospf import Ospf
 from .Ibgp import Ibgp
 from .Dnssec import Dnssec
@@ -1,4 +1,5 @@
 from .ServiceMerger import ServiceMerger
+from seedemu.core.enums import LogLevel
 from seedemu.services import DomainNameService, Zone
 from re import match
 
@@ -14,7 +15,7 @@ class DefaultDomainNameServiceMerger(ServiceMerger):
     def __mergeZone(self, a: Zone, b: Zone, dst: Zone, position: str = ''):
         names = set()
 
-        self._log('merging zone: {}'.format('(root)' if position == '' else position))
+        self._log('merging zone: {}', '(root)' if position == '' else position)
 
         # merge regular records
         for r in a.getRecords():
@@ -37,10 +38,10 @@ class DefaultDomainNameServiceMerger(ServiceMerger):
 
         # look for all subzones
         for k in a.getSubZones().keys():
-            self._log('{}.{} zone found in first emulator.'.format(k, position))
+            self._log('{}.{} zone found in first emulator.', k, position, level = LogLevel.Debug)
             names.add(k)
         for k in b.getSubZones().keys():
-            self._log('{}.{} zone found in second emulator.'.format(k, position))
+            self._log('{}.{} zone found in second emulator.', k, position, level = LogLevel.Debug)
             names.add(k)
         
         # for all subzones,
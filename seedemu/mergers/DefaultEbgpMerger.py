@@ -1,6 +1,7 @@
 from seedemu.core import Merger
-from seedemu.layers import Ebgp, PeerRelationship
-from typing import Callable
+from seedemu.core.enums import LogLevel
+from seedemu.layers import Ebgp, PeerRelationship, PeeringTable
+from typing import Callable, Dict, Iterator, Tuple
 
 
 class DefaultEbgpMerger(Merger):
@@ -35,6 +36,52 @@ class DefaultEbgpMerger(Merger):
     def getName(self) -> str:
         return 'DefaultEbgpMerger'
 
+    def __mergeTablePeering(self, ix: int, a: int, b: int, rel: PeerRelationship, table: PeeringTable):
+        """!
+        @brief merge a peering that is already in a peering table.
+
+        @param ix IXP id.
+        @param a first ASN.
+        @param b second ASN.
+        @param rel relationship of the peering being merged.
+        @param table peering table with the existing peering.
+        """
+        (_, _, current) = table.get(a, b)
+        if current == rel: return
+
+        self._log('Peering relationship conflict for peering in IX{} between AS{} and AS{}: {} != {}, calling handler',
+            ix, a, b, current, rel, level = LogLevel.Warning
+        )
+        table.setRelationship(a, b, self.__peeringConflictHandler(ix, a, b, current, rel))
+
+    def __mergeTable(self, ix: int, table: PeeringTable, private: Dict[Tuple[int, int, int], PeerRelationship], existing: PeeringTable) -> Iterator[Tuple[int, int, PeerRelationship]]:
+        """!
+        @brief merge a peering table into existing peerings.
+
+        @param ix IXP id.
+        @param table peering table to merge.
+        @param private individually added peerings. Conflicts with them are
+        resolved in place.
+        @param existing existing peering table of the IX, or None. Conflicts
+        with it are resolved in place.
+
+        @returns iterator of peerings of the table that are not peered yet.
+        """
+        for (a, b, rel) in table:
+            if existing != None and existing.get(a, b) != None and existing.get(a, b)[:2] == (a, b):
+                self.__mergeTablePeering(ix, a, b, rel, existing)
+                continue
+
+            if (ix, a, b) in private.keys():
+                if private[(ix, a, b)] != rel:
+                    self._log('Peering relationship conflict for peering in IX{} between AS{} and AS{}: {} != {}, calling handler',
+                        ix, a, b, private[(ix, a, b)], rel, level = LogLevel.Warning
+                    )
+                    private[(ix, a, b)] = self.__peeringConflictHandler(ix, a, b, private[(ix, a, b)], rel)
+                continue
+
+            yield (a, b, rel)
+
     def getTargetType(self) -> str:
         return 'EbgpLayer'
 
@@ -48,15 +95,31 @@ class DefaultEbgpMerger(Merger):
         @returns merged Ebgp layer.
         """
         
-        new_private = objectA.getPrivatePeerings()
+        new_private = objectA.getPrivatePeerings(False)
         new_rs = objectA.getRsPeers()
         new_xc = objectA.getCrossConnectPeerings()
 
-        for ((ix, a, b), rel) in objectB.getPrivatePeerings().items():
-            if (ix, a, b) in new_private.keys() and new_private[(ix, a, b)] != rel:
-                self._log('Peering relationship conflict for peering in IX{} between AS{} and AS{}: {} != {}, calling handler'.format(
-                    ix, a, b, new_private[(ix, a, b)], rel
-                ))
+        new_ebgp = Ebgp()
+
+        # peerings added in bulk stay in peering tables.
+        for (ix, table) in objectA.getPeeringTables().items(): new_ebgp.addBulkPrivatePeerings(ix, table)
+
+        new_tables = new_ebgp.getPeeringTables()
+
+        for (ix, table) in objectB.getPeeringTables().items():
+            if ix not in new_tables and not any(i == ix for (i, _, _) in new_private.keys()):
+                new_ebgp.addBulkPrivatePeerings(ix, table)
+                continue
+
+            new_ebgp.addBulkPrivatePeerings(ix, self.__mergeTable(ix, table, new_private, new_tables.get(ix)))
+
+        for ((ix, a, b), rel) in objectB.getPrivatePeerings(False).items():
+            if ix in new_tables and new_tables[ix].get(a, b) != None and new_tables[ix].get(a, b)[:2] == (a, b):
+                self.__mergeTablePeering(ix, a, b, rel, new_tables[ix])
+            elif (ix, a, b) in new_private.keys() and new_private[(ix, a, b)] != rel:
+                self._log('Peering relationship conflict for peering in IX{} between AS{} and AS{}: {} != {}, calling handler',
+                    ix, a, b, new_private[(ix, a, b)], rel, level = LogLevel.Warning
+                )
                 new_private[(ix, a, b)] = self.__peeringConflictHandler(ix, a, b, new_private[(ix, a, b)], rel)
             else: new_private[(ix, a, b)] = rel
         
@@ -65,14 +128,12 @@ class DefaultEbgpMerger(Merger):
 
         for ((a, b), rel) in objectB.getCrossConnectPeerings().items():
             if (a, b) in new_xc.keys() and new_private[(a, b)] != rel:
-                self._log('Peering relationship conflict for peering in XC between AS{} and AS{}: {} != {}, calling handler'.format(
-                    a, b, new_xc[(a, b)], rel
-                ))
+                self._log('Peering relationship conflict for peering in XC between AS{} and AS{}: {} != {}, calling handler',
+                    a, b, new_xc[(a, b)], rel, level = LogLevel.Warning
+                )
                 new_xc[(a, b)] = self.__xcPeeringConflictHandler(a, b, new_xc[(a, b)], rel)
             else: new_xc[(a, b)] = rel
 
-        new_ebgp = Ebgp()
-
         for ((ix, a, b), rel) in new_private.items(): new_ebgp.addPrivatePeering(ix, a, b, rel)
         for ((a, b), rel) in new_xc.items(): new_ebgp.addCrossConnectPeering(a, b, rel)
         for (ix, asn) in new_rs: new_ebgp.addRsPeer(ix, asn)
@@ -25,4 +25,11 @@ class DefaultIbgpMerger(Merger):
         for asn in (objectA.getMaskedAsns() | objectB.getMaskedAsns()):
             new_ibgp.maskAsn(asn)
 
+        for ibgp in [objectA, objectB]:
+            for (asn, count) in ibgp.getRouteReflectorCounts().items():
+                new_ibgp.enableRouteReflection(asn, count)
+
+            for (asn, names) in ibgp.getRouteReflectors().items():
+                for name in names: new_ibgp.setRouteReflector(asn, name)
+
         return new_ibgp
\ No newline at end of file
@@ -110,9 +110,8 @@ class CymruIpOriginService(Service):
         mappings: List[Tuple[str, str]] = []
         
         self._log('Collecting all networks in the simulation...')
-        for regobj in reg.getAll().items():
+        for regobj in reg.iterByType({'net'}):
             [(asn, type, name), obj] = regobj
-            if type != 'net': continue
             net: Network = obj
             if asn == 'ix': asn = name.replace('ix', '')
             
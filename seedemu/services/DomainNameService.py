@@ -443,14 +443,14 @@ class DomainNameService(Service):
         @param zone root zone reference.
         """
         if (len(zone.getSubZones().values()) == 0): return
-        self._log('Collecting subzones NSes of "{}"...'.format(zone.getName()))
+        self._log('Collecting subzones NSes of "{}"...', zone.getName())
         for subzone in zone.getSubZones().values():
             for gule in subzone.getGuleRecords(): zone.addRecord(gule)
             self.__autoNameServer(subzone)
 
     def __resolvePendingRecords(self, emulator: Emulator, zone: Zone):
         zone.resolvePendingRecords(emulator)
-        self._log('resloving pending records for zone "{}"...'.format(zone.getName()))
+        self._log('resloving pending records for zone "{}"...', zone.getName())
         for subzone in zone.getSubZones().values():
             self.__resolvePendingRecords(emulator, subzone)
 
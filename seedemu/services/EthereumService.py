@@ -6,6 +6,7 @@ from __future__ import annotations
 from enum import Enum
 from os import mkdir, path, makedirs, rename
 from seedemu.core import Node, Service, Server, Emulator
+from seedemu.core.enums import LogLevel
 from typing import Dict, List, Tuple
 
 import json
@@ -789,9 +790,9 @@ class EthereumServer(Server):
         """
         for balance, password, keyfilePath in self.__accounts_info:
             if keyfilePath:
-                eth._log('importing eth account...')
+                eth._log('importing eth account...', level = LogLevel.Debug)
             else:
-                eth._log('creating eth account...')
+                eth._log('creating eth account...', level = LogLevel.Debug)
 
             account = EthAccount(alloc_balance=balance,password=password, keyfilePath=keyfilePath)
             self.__accounts.append(account)
@@ -927,14 +928,14 @@ class EthereumService(Service):
         return self.__joined_signer_accounts
 
     def _doConfigure(self, node: Node, server: EthereumServer):
-        self._log('configuring as{}/{} as an eth node...'.format(node.getAsn(), node.getName()))
+        self._log('configuring as{}/{} as an eth node...', node.getAsn(), node.getName(), level = LogLevel.Debug)
 
         ifaces = node.getInterfaces()
         assert len(ifaces) > 0, 'EthereumService::_doConfigure(): node as{}/{} has not interfaces'.format()
         addr = '{}:{}'.format(str(ifaces[0].getAddress()), server.getBootNodeHttpPort())
 
         if server.isBootNode():
-            self._log('adding as{}/{} as consensus-{} bootnode...'.format(node.getAsn(), node.getName(), server.getConsensusMechanism().value))
+            self._log('adding as{}/{} as consensus-{} bootnode...', node.getAsn(), node.getName(), server.getConsensusMechanism().value, level = LogLevel.Debug)
             self.__boot_node_addresses[server.getConsensusMechanism()].append(addr)
         
         server._createAccounts(self)
@@ -958,7 +959,7 @@ class EthereumService(Service):
     def _createSharedFolder(self):
         if path.exists(self.__save_path):
             if self.__override:
-                self._log('eth_state folder "{}" already exist, overriding.'.format(self.__save_path))
+                self._log('eth_state folder "{}" already exist, overriding.', self.__save_path)
                 i = 1
                 while True:
                     rename_save_path = "{}-{}".format(self.__save_path, i)
@@ -968,12 +969,12 @@ class EthereumService(Service):
                     else:
                         i = i+1
             else:
-                self._log('eth_state folder "{}" already exist. Set "override = True" when calling compile() to override.'.format(self.__save_path))
+                self._log('eth_state folder "{}" already exist. Set "override = True" when calling compile() to override.', self.__save_path)
                 exit(1)
         mkdir(self.__save_path)
         
     def _doInstall(self, node: Node, server: EthereumServer):
-        self._log('installing eth on as{}/{}...'.format(node.getAsn(), node.getName()))
+        self._log('installing eth on as{}/{}...', node.getAsn(), node.getName(), level = LogLevel.Debug)
 
         server.install(node, self)
 
@@ -1,5 +1,6 @@
 from .DomainNameService import DomainNameService, DomainNameServer
 from seedemu.core import Node, Emulator, Service, Server
+from seedemu.core.enums import LogLevel
 
 class ReverseDomainNameServer(Server):
     """!
@@ -42,9 +43,8 @@ class ReverseDomainNameService(Service):
         zone = self.__dns.getZone('in-addr.arpa.')
 
         self._log('Collecting IP addresses...')
-        for ([scope, type, name], obj) in reg.getAll().items():
-            if type != 'rnode' and type != 'hnode': continue
-            self._log('Collecting {}/{}/{}...'.format(scope, type, name))
+        for ([scope, type, name], obj) in reg.iterNodes({'rnode', 'hnode'}):
+            self._log('Collecting {}/{}/{}...', scope, type, name, level = LogLevel.Debug)
 
             if scope == 'ix':
                 scope = name
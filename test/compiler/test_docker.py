@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+
+import re
+import sys
+import unittest
+from unittest.mock import patch
+from hashlib import md5, sha256
+from os import walk, stat, listdir, chmod, environ, pathsep, mkdir
+from os.path import join, relpath, exists, samefile
+from shutil import which
+from subprocess import run
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Set
+
+from seedemu.core import Emulator, Binding, Filter, Action, Node
+from seedemu.layers import Base, Routing, Ebgp, Ibgp, Ospf, PeerRelationship
+from seedemu.services import WebService
+from seedemu.compiler import Docker, DockerImage
+
+def makeEmulator(extraHost: bool = False) -> Emulator:
+    """!
+    @brief build a small emulation: two transit ASes and two stub ASes on
+    two IXes, with a web server in each stub.
+
+    @param extraHost (optional) add one more host to as151. Default to False.
+
+    @returns rendered emulator.
+    """
+    emu = Emulator()
+    base = Base()
+    ebgp = Ebgp()
+    web = WebService()
+
+    base.createInternetExchange(100)
+    base.createInternetExchange(101)
+
+    for asn in [2, 3]:
+        asobj = base.createAutonomousSystem(asn)
+        asobj.createNetwork('net0')
+        asobj.createRouter('r1').joinNetwork('net0').joinNetwork('ix100')
+        asobj.createRouter('r2').joinNetwork('net0').joinNetwork('ix101')
+
+    for (asn, ix) in [(150, 100), (151, 101)]:
+        asobj = base.createAutonomousSystem(asn)
+        asobj.createNetwork('net0')
+        asobj.createRouter('router0').joinNetwork('net0').joinNetwork('ix{}'.format(ix))
+        asobj.createHost('web').joinNetwork('net0')
+        web.install('web{}'.format(asn))
+        emu.addBinding(Binding('web{}'.format(asn), filter = Filter(asn = asn), action = Action.FIRST))
+
+    if extraHost: base.getAutonomousSystem(151).createHost('extra').joinNetwork('net0')
+
+    ebgp.addPrivatePeering(100, 2, 3, PeerRelationship.Peer)
+    ebgp.addPrivatePeering(100, 2, 150, PeerRelationship.Provider)
+    ebgp.addPrivatePeering(101, 3, 151, PeerRelationship.Provider)
+
+    for layer in [base, Routing(), ebgp, Ibgp(), Ospf(), web]: emu.addLayer(layer)
+
+    emu.render()
+
+    return emu
+
+def digest(path: str) -> Dict[str, str]:
+    """!
+    @brief hash every file in a folder.
+
+    @param path folder.
+
+    @returns dict of path (relative to the folder) to md5 of the content.
+    """
+    out = {}
+
+    for (root, _, files) in walk(path):
+        for name in files:
+            with open(join(root, name), 'rb') as f:
+                out[relpath(join(root, name), path)] = md5(f.read()).hexdigest()
+
+    return out
+
+def getServices(output: str, composeFile: str = 'docker-compose.yml') -> Dict[str, str]:
+    """!
+    @brief split the services section of a compose file into services.
+
+    @param output output folder.
+    @param composeFile (optional) name of the compose file. Default to
+    docker-compose.yml.
+
+    @returns dict of service name to the text of the service.
+    """
+    services = {}
+    name = None
+
+    with open(join(output, composeFile)) as f:
+        for line in f:
+            if line.startswith('networks:'): break
+            if line.startswith('    ') and not line.startswith('     ') and line.rstrip().endswith(':'):
+                name = line.strip()[:-1]
+                services[name] = ''
+                continue
+            if name != None: services[name] += line
+
+    return services
+
+def getBaseImage(dockerfile: str) -> str:
+    """!
+    @brief get the image a dockerfile is built from.
+
+    @param dockerfile path to the dockerfile.
+
+    @returns image name.
+    """
+    with open(dockerfile) as f: return f.readline().split()[1]
+
+def addSoftware(emu: Emulator):
+    """!
+    @brief add overlapping software sets to the nodes of an emulation built
+    by makeEmulator.
+
+    @param emu emulator.
+    """
+    registry = emu.getRegistry()
+
+    for (name, soft) in [('r1', 'a b'), ('r2', 'a')]:
+        for asn in ['2', '3']: registry.get(asn, 'rnode', name).addSoftware(soft)
+
+    registry.get('150', 'rnode', 'router0').addSoftware('a c')
+    registry.get('151', 'rnode', 'router0').addSoftware('c d')
+    registry.get('150', 'hnode', 'web').addSoftware('d')
+
+def groupSoftwareByLevel(compiler: Docker, emu: Emulator) -> Dict[Node, List[Set[str]]]:
+    """!
+    @brief group software into tiers the way the compiler used to, scanning
+    the software once for every possible reference count.
+
+    @param compiler compiler to select images with.
+    @param emu emulator.
+
+    @returns dict of node to its software tiers.
+    """
+    softGroups: Dict[str, Dict[str, List[Node]]] = {}
+    groupIter: Dict[str, int] = {}
+    out: Dict[Node, List[Set[str]]] = {}
+
+    for (_, node) in emu.getRegistry().iterNodes():
+        (img, _) = compiler._selectImageFor(node)
+        groupIter[img.getName()] = groupIter.get(img.getName(), 0) + 1
+
+        for soft in node.getSoftware(): softGroups.setdefault(img.getName(), {}).setdefault(soft, []).append(node)
+
+    for (imgName, group) in softGroups.items():
+        for commRequired in range(groupIter[imgName], 0, -1):
+            tier = set(soft for (soft, nodes) in group.items() if len(nodes) == commRequired)
+
+            for (soft, nodes) in group.items():
+                if len(nodes) != commRequired: continue
+                for node in nodes:
+                    if tier not in out.setdefault(node, []): out[node].append(tier)
+
+    return out
+
+class CountingDocker(Docker):
+    """!
+    @brief docker compiler that counts image selections.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.selections = 0
+
+    def _selectImageFor(self, node: Node):
+        self.selections += 1
+        return super()._selectImageFor(node)
+
+class DockerSoftwareGroupingTestCase(unittest.TestCase):
+    """!
+    @brief tests for grouping software into tiers, and for selecting the image
+    of each node once.
+    """
+
+    def setUp(self):
+        self.emu = makeEmulator()
+        addSoftware(self.emu)
+
+    def checkTiers(self, compiler: Docker):
+        """!
+        @brief check that the compiler groups software the same way as the
+        scan per reference count.
+
+        @param compiler compiler.
+        """
+        compiler._groupSoftware(self.emu)
+        expected = groupSoftwareByLevel(compiler, self.emu)
+
+        for (_, node) in self.emu.getRegistry().iterNodes():
+            self.assertEqual(node.getAttribute('__soft_install_tiers', []), expected.get(node, []), node.getName())
+
+    def testSameTiers(self):
+        self.checkTiers(Docker())
+
+        # with two images, the tiers are counted per image.
+        compiler = Docker().addImage(DockerImage('test/image', ['nginx-light', 'd']), -1)
+        self.checkTiers(compiler)
+
+        images = set(node.getAttribute('__docker_image')[0].getName() for (_, node) in self.emu.getRegistry().iterNodes())
+        self.assertEqual(len(images), 2)
+
+    def testRepeatedGrouping(self):
+        compiler = Docker()
+        compiler._groupSoftware(self.emu)
+
+        # tiers are replaced, not appended to.
+        self.checkTiers(compiler)
+
+    def testImageSelectedOnce(self):
+        compiler = CountingDocker()
+        distinct = set(frozenset(node.getSoftware()) for (_, node) in self.emu.getRegistry().iterNodes())
+
+        with TemporaryDirectory() as tmp:
+            self.emu.compile(compiler, join(tmp, 'output'))
+
+            # once per distinct software set, and not again when compiling
+            # the nodes.
+            self.assertEqual(compiler.selections, len(distinct))
+
+            for (_, node) in self.emu.getRegistry().iterNodes():
+                if node.getSoftware() != set(['a', 'b']): continue
+
+                (image, _) = node.getAttribute('__docker_image')
+                tiers = tuple(tuple(sorted(tier)) for tier in node.getAttribute('__soft_install_tiers'))
+                dockerfile = join(tmp, 'output', 'rnode_{}_{}'.format(node.getAsn(), node.getName()), 'Dockerfile')
+
+                self.assertEqual(getBaseImage(dockerfile), compiler._getLayerName(image.getName(), tiers))
+
+    def testImageOverride(self):
+        compiler = CountingDocker().addImage(DockerImage('test/image', ['zzz']), -1)
+        compiler.setImageOverride(self.emu.getRegistry().get('2', 'rnode', 'r2'), 'test/image')
+        compiler._groupSoftware(self.emu)
+
+        r2 = self.emu.getRegistry().get('2', 'rnode', 'r2')
+        other = self.emu.getRegistry().get('3', 'rnode', 'r2')
+
+        # overridden nodes are not memoized with other nodes of the same
+        # software.
+        self.assertEqual(r2.getAttribute('__docker_image')[0].getName(), 'test/image')
+        self.assertNotEqual(other.getAttribute('__docker_image')[0].getName(), 'test/image')
+
+class DockerWorkersTestCase(unittest.TestCase):
+    """!
+    @brief tests for compiling nodes with workers.
+    """
+
+    def testWorkersSameOutput(self):
+        emu = makeEmulator()
+
+        with TemporaryDirectory() as tmp:
+            emu.compile(Docker(), join(tmp, 'serial'))
+            emu.compile(Docker(workers = 3), join(tmp, 'threads'))
+            emu.compile(Docker(workers = 2, workerProcesses = True), join(tmp, 'processes'))
+
+            expected = digest(join(tmp, 'serial'))
+
+            self.assertIn('rnode_2_r1/Dockerfile', expected)
+            self.assertEqual(digest(join(tmp, 'threads')), expected)
+            self.assertEqual(digest(join(tmp, 'processes')), expected)
+
+class DockerIncrementalTestCase(unittest.TestCase):
+    """!
+    @brief tests for incremental compile.
+    """
+
+    def testSameAsFullCompile(self):
+        with TemporaryDirectory() as tmp:
+            output = join(tmp, 'output')
+
+            makeEmulator().compile(Docker(), output)
+            before = stat(join(output, 'rnode_2_r1', 'Dockerfile'))
+
+            makeEmulator(extraHost = True).compile(Docker(), output, incremental = True)
+            makeEmulator(extraHost = True).compile(Docker(), join(tmp, 'full'))
+
+            self.assertIn('hnode_151_extra/Dockerfile', digest(output))
+            self.assertEqual(digest(output), digest(join(tmp, 'full')))
+
+            # unchanged files are left alone.
+            after = stat(join(output, 'rnode_2_r1', 'Dockerfile'))
+            self.assertEqual((before.st_ino, before.st_mtime_ns), (after.st_ino, after.st_mtime_ns))
+
+            # folders of removed nodes are removed.
+            makeEmulator().compile(Docker(), output, incremental = True)
+            self.assertEqual(digest(output), digest(join(tmp, 'output')))
+            self.assertNotIn('hnode_151_extra/Dockerfile', digest(output))
+
+    def testNewOutputFolder(self):
+        with TemporaryDirectory() as tmp:
+            makeEmulator().compile(Docker(), join(tmp, 'incremental'), incremental = True)
+            makeEmulator().compile(Docker(), join(tmp, 'full'))
+
+            self.assertEqual(digest(join(tmp, 'incremental')), digest(join(tmp, 'full')))
+
+class DockerFileStoreTestCase(unittest.TestCase):
+    """!
+    @brief tests for the shared, content-addressed file store.
+    """
+
+    def checkStore(self, output: str):
+        """!
+        @brief check that every file of the store is named by its hash, and
+        that node files with the same content are linked to the store.
+
+        @param output output folder.
+        """
+        store = join(output, 'files')
+
+        for name in listdir(store):
+            with open(join(store, name), 'rb') as f: self.assertEqual(sha256(f.read()).hexdigest(), name)
+
+        shared = 0
+
+        for (path, _) in digest(output).items():
+            if path.startswith('files/') or path.endswith('Dockerfile') or path == 'docker-compose.yml': continue
+            if path.startswith('dummies/'): continue
+
+            with open(join(output, path), 'rb') as f: stored = join(store, sha256(f.read()).hexdigest())
+
+            self.assertTrue(exists(stored), path)
+            self.assertTrue(samefile(stored, join(output, path)), path)
+
+            if stat(stored).st_nlink > 2: shared += 1
+
+        self.assertGreater(shared, 0)
+
+    def testSharedFiles(self):
+        with TemporaryDirectory() as tmp:
+            makeEmulator().compile(Docker(), join(tmp, 'output'))
+            self.checkStore(join(tmp, 'output'))
+
+    def testIncremental(self):
+        with TemporaryDirectory() as tmp:
+            output = join(tmp, 'output')
+
+            makeEmulator().compile(Docker(), output)
+            makeEmulator(extraHost = True).compile(Docker(), output, incremental = True)
+
+            self.checkStore(output)
+
+    def testNoSharedFiles(self):
+        with TemporaryDirectory() as tmp:
+            makeEmulator().compile(Docker(sharedFiles = False), join(tmp, 'output'))
+            makeEmulator().compile(Docker(), join(tmp, 'shared'))
+
+            files = digest(join(tmp, 'output'))
+
+            self.assertFalse(exists(join(tmp, 'output', 'files')))
+            self.assertEqual(files, { k: v for (k, v) in digest(join(tmp, 'shared')).items() if not k.startswith('files/') })
+
+            for path in files.keys(): self.assertEqual(stat(join(tmp, 'output', path)).st_nlink, 1)
+
+class DockerBaseLayerTestCase(unittest.TestCase):
+    """!
+    @brief tests for shared base layer images.
+    """
+
+    def testLayers(self):
+        with TemporaryDirectory() as tmp:
+            output = join(tmp, 'output')
+            makeEmulator().compile(Docker(), output)
+
+            services = getServices(output)
+            layers = listdir(join(output, 'dummies'))
+
+            # routers and web hosts share two layers on top of the image.
+            self.assertEqual(len(layers), 3)
+
+            router = getBaseImage(join(output, 'rnode_2_r1', 'Dockerfile'))
+            web = getBaseImage(join(output, 'hnode_150_web', 'Dockerfile'))
+
+            self.assertEqual(getBaseImage(join(output, 'rnode_3_r2', 'Dockerfile')), router)
+            self.assertEqual(getBaseImage(join(output, 'dummies', web)), router)
+
+            for layer in layers:
+                self.assertIn(layer, services)
+                parent = getBaseImage(join(output, 'dummies', layer))
+
+                # layers built on another layer wait for it to be built.
+                if parent in layers: self.assertIn('depends_on:\n            - {}\n'.format(parent), services[layer])
+                else: self.assertNotIn('depends_on', services[layer])
+
+            for node in ['rnode_2_r1', 'hnode_150_web']:
+                image = getBaseImage(join(output, node, 'Dockerfile'))
+                self.assertIn('depends_on:\n            - {}\n'.format(image), services[node])
+
+class DockerComposeTestCase(unittest.TestCase):
+    """!
+    @brief tests for streaming the compose file.
+    """
+
+    def testServicesAndNetworks(self):
+        with TemporaryDirectory() as tmp:
+            makeEmulator().compile(Docker(), join(tmp, 'output'))
+
+            services = getServices(join(tmp, 'output'))
+
+            with open(join(tmp, 'output', 'docker-compose.yml')) as f: compose = f.read()
+
+            for name in ['rnode_2_r1', 'rnode_3_r2', 'rnode_150_router0', 'hnode_151_web', 'rs_ix_ix100']:
+                self.assertIn(name, services)
+
+            self.assertEqual(compose.count('\nnetworks:\n'), 1)
+            self.assertIn('    net_ix_ix100:\n', compose.split('\nnetworks:\n')[1])
+            self.assertIn('    net_150_net0:\n', compose.split('\nnetworks:\n')[1])
+
+    def testSpooled(self):
+        # sections are spooled to disk once they grow past the spool size, and
+        # node jobs are submitted a few at a time.
+        module = sys.modules[Docker.__module__]
+
+        with TemporaryDirectory() as tmp:
+            makeEmulator().compile(Docker(workers = 2), join(tmp, 'memory'))
+
+            with patch.object(module, 'COMPOSE_SPOOL_SIZE', 64), patch.object(module, 'COMPILE_JOBS_PER_WORKER', 1):
+                makeEmulator().compile(Docker(workers = 2), join(tmp, 'spooled'))
+
+            self.assertEqual(digest(join(tmp, 'spooled')), digest(join(tmp, 'memory')))
+
+## stub of the docker and docker-compose commands, logging how they are called.
+FAKE_DOCKER = """\
+#!/bin/sh
+echo "$(basename "$0") $*" >> "$CALLS"
+[ "$1" = network ] && [ "$2" = inspect ] && exit 1
+exit 0
+"""
+
+class DockerShardingTestCase(unittest.TestCase):
+    """!
+    @brief tests for sharded compose output.
+    """
+
+    def compileSharded(self, output: str, **sharding) -> Dict[str, Dict[str, str]]:
+        """!
+        @brief compile with sharding.
+
+        @param output output folder.
+        @param sharding options for setSharding.
+
+        @returns dict of shard name to the services of the shard.
+        """
+        docker = Docker()
+        docker.setSharding(**sharding)
+        makeEmulator().compile(docker, output)
+
+        shards = {}
+
+        for name in sorted(listdir(output)):
+            match = re.match(r'^docker-compose\.(shard[0-9]+)\.yml$', name)
+            if match: shards[match.group(1)] = getServices(output, name)
+
+        return shards
+
+    def checkShards(self, output: str, shards: Dict[str, Dict[str, str]]):
+        """!
+        @brief check that every node is in exactly one shard, and every
+        network used by a shard is external and created by the launcher.
+
+        @param output output folder.
+        @param shards services of each shard.
+        """
+        nodes = [name for name in listdir(output) if exists(join(output, name, 'Dockerfile'))]
+        sharded = [name for services in shards.values() for name in services.keys()]
+
+        self.assertGreater(len(shards), 0)
+        self.assertEqual(sorted(sharded), sorted(nodes))
+
+        base = getServices(output)
+        for node in nodes: self.assertNotIn(node, base)
+
+        with open(join(output, 'shards.sh')) as f: launcher = f.read()
+
+        self.assertIn('shards=({})'.format(' '.join(sorted(shards.keys()))), launcher)
+
+        for shard in shards.keys():
+            with open(join(output, 'docker-compose.{}.yml'.format(shard))) as f: networks = f.read().split('\nnetworks:\n')[1]
+
+            for name in re.findall(r'^            (net_[^:]+):$', ''.join(shards[shard].values()), re.M):
+                self.assertIn('    {}:\n        external:\n            name: seedemu_{}\n'.format(name, name), networks)
+                self.assertIn('        seedemu_{} > /dev/null\n'.format(name), launcher)
+
+    def testAsesPerShard(self):
+        with TemporaryDirectory() as tmp:
+            shards = self.compileSharded(join(tmp, 'output'), asesPerShard = 2)
+
+            self.assertEqual(len(shards), 3)
+            self.checkShards(join(tmp, 'output'), shards)
+
+            # nodes of an AS stay together.
+            for services in shards.values():
+                if 'rnode_2_r1' in services: self.assertIn('rnode_2_r2', services)
+
+    def testServicesPerShard(self):
+        with TemporaryDirectory() as tmp:
+            shards = self.compileSharded(join(tmp, 'output'), servicesPerShard = 4)
+
+            self.assertGreater(len(shards), 1)
+            self.checkShards(join(tmp, 'output'), shards)
+
+    @unittest.skipUnless(which('bash') and which('xargs'), 'needs bash and xargs.')
+    def testLauncher(self):
+        with TemporaryDirectory() as tmp:
+            output = join(tmp, 'output')
+            self.compileSharded(output, asesPerShard = 2)
+
+            bin = join(tmp, 'bin')
+            calls = join(tmp, 'calls.log')
+
+            mkdir(bin)
+
+            for command in ['docker', 'docker-compose']:
+                with open(join(bin, command), 'w') as f: f.write(FAKE_DOCKER)
+                chmod(join(bin, command), 0o755)
+
+            env = dict(environ, PATH = bin + pathsep + environ['PATH'], CALLS = calls)
+
+            self.assertEqual(run(['bash', join(output, 'shards.sh'), 'up', '2'], env = env).returncode, 0)
+
+            with open(calls) as f: log = f.read().splitlines()
+
+            creates = [i for (i, line) in enumerate(log) if line.startswith('docker network create')]
+            ups = [i for (i, line) in enumerate(log) if line.startswith('docker-compose') and line.endswith('up -d')]
+
+            # one network per network of the emulation, all before any project.
+            self.assertEqual(len(creates), 6)
+            self.assertEqual(len(ups), 4)
+            self.assertLess(max(creates), min(ups))
+
+            self.assertEqual(run(['bash', join(output, 'shards.sh'), 'down'], env = env).returncode, 0)
+
+            with open(calls) as f: log = f.read().splitlines()
+
+            self.assertEqual(len([line for line in log if line.startswith('docker network rm')]), 6)
+
+if __name__ == '__main__':
+    unittest.main()
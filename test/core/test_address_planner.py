@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+import unittest
+from ipaddress import IPv4Address, IPv4Network
+
+from seedemu.core import AddressPlanner, BuddyAllocator, IxAddressTable, Emulator
+from seedemu.layers import Base, Routing
+
+class BuddyAllocatorTestCase(unittest.TestCase):
+    """!
+    @brief tests for the buddy allocator.
+    """
+
+    def setUp(self):
+        self.pool = BuddyAllocator(IPv4Network('10.0.0.0/22'))
+
+    def testAllocate(self):
+        self.assertEqual(self.pool.allocate(24), IPv4Network('10.0.0.0/24'))
+        self.assertEqual(self.pool.allocate(25), IPv4Network('10.0.1.0/25'))
+        self.assertEqual(self.pool.allocate(24), IPv4Network('10.0.2.0/24'))
+        self.assertEqual(self.pool.allocate(25), IPv4Network('10.0.1.128/25'))
+
+        self.assertTrue(self.pool.isAllocated(IPv4Network('10.0.2.0/24')))
+        self.assertFalse(self.pool.isAllocated(IPv4Network('10.0.3.0/24')))
+
+    def testExhausted(self):
+        self.pool.allocate(23)
+        self.pool.allocate(23)
+
+        with self.assertRaises(AssertionError): self.pool.allocate(32)
+        with self.assertRaises(AssertionError): self.pool.allocate(21)
+
+    def testRelease(self):
+        a = self.pool.allocate(23)
+        b = self.pool.allocate(23)
+
+        self.pool.release(a)
+        self.pool.release(b)
+
+        # released halves merge back into the whole pool.
+        self.assertEqual(self.pool.allocate(22), IPv4Network('10.0.0.0/22'))
+
+        with self.assertRaises(AssertionError): self.pool.release(IPv4Network('10.0.0.0/24'))
+
+    def testReserve(self):
+        self.pool.reserve(IPv4Network('10.0.0.128/25'))
+
+        self.assertEqual(self.pool.allocate(25), IPv4Network('10.0.0.0/25'))
+        self.assertEqual(self.pool.allocate(24), IPv4Network('10.0.1.0/24'))
+
+        with self.assertRaises(AssertionError): self.pool.reserve(IPv4Network('10.0.0.0/24'))
+        with self.assertRaises(AssertionError): self.pool.reserve(IPv4Network('10.1.0.0/24'))
+
+        self.pool.release(IPv4Network('10.0.0.128/25'))
+        self.assertEqual(self.pool.allocate(25), IPv4Network('10.0.0.128/25'))
+
+class IxAddressTableTestCase(unittest.TestCase):
+    """!
+    @brief tests for IX member address tables.
+    """
+
+    def testAsnAsAddress(self):
+        table = IxAddressTable(IPv4Network('10.100.0.0/24'))
+
+        self.assertEqual(table.mapIxAddress(150), 150)
+        self.assertEqual(table.mapIxAddress(150), 150)
+
+        # ASNs that do not fit get the lowest free address.
+        self.assertEqual(table.mapIxAddress(65000), 2)
+        self.assertEqual(table.mapIxAddress(65001), 3)
+
+    def testManyMembers(self):
+        table = IxAddressTable(IPv4Network('10.100.0.0/23'))
+        offsets = set(table.mapIxAddress(asn) for asn in range(1000, 1500))
+
+        self.assertEqual(len(offsets), 500)
+        self.assertTrue(all(2 <= offset < 511 for offset in offsets))
+
+    def testReserved(self):
+        table = IxAddressTable(IPv4Network('10.100.0.0/24'))
+        table.reserveOffset(2)
+        table.reserveOffset(150)
+
+        self.assertEqual(table.mapIxAddress(65000), 3)
+        self.assertEqual(table.mapIxAddress(150), 4)
+
+    def testFull(self):
+        table = IxAddressTable(IPv4Network('10.100.0.0/29'))
+
+        for asn in range(5): table.mapIxAddress(65000 + asn)
+
+        with self.assertRaises(AssertionError): table.mapIxAddress(65100)
+
+class AddressPlannerTestCase(unittest.TestCase):
+    """!
+    @brief tests for the address planner.
+    """
+
+    def testAsBlocks(self):
+        planner = AddressPlanner(asPool = '16.0.0.0/12', asPrefixLength = 20)
+        base = Base().setAddressPlanner(planner)
+
+        as1000 = base.createAutonomousSystem(1000)
+        as2000 = base.createAutonomousSystem(2000)
+        base.createAutonomousSystem(3000)
+
+        # blocks are allocated with the first network.
+        self.assertIsNone(as1000.getAddressBlock())
+
+        as2000.createNetwork('net0')
+        as1000.createNetwork('net0')
+        as1000.createNetwork('net1')
+
+        self.assertEqual(as2000.getAddressBlock(), IPv4Network('16.0.0.0/20'))
+        self.assertEqual(as1000.getAddressBlock(), IPv4Network('16.0.16.0/20'))
+        self.assertEqual(as1000.getNetwork('net1').getPrefix(), IPv4Network('16.0.17.0/24'))
+        self.assertEqual(planner.allocateAsBlock(3000), IPv4Network('16.0.32.0/20'))
+
+    def testLargeAsBlock(self):
+        planner = AddressPlanner(asPool = '16.0.0.0/12')
+        base = Base().setAddressPlanner(planner)
+
+        planner.allocateAsBlock(1000, 16)
+        base.createAutonomousSystem(1000).createNetwork('net0')
+
+        self.assertEqual(base.getAutonomousSystem(1000).getAddressBlock(), IPv4Network('16.0.0.0/16'))
+
+    def testIxPrefix(self):
+        planner = AddressPlanner(ixPool = '100.0.0.0/16')
+        base = Base().setAddressPlanner(planner)
+
+        planner.allocateIxPrefix(2000, 22)
+        ix1000 = base.createInternetExchange(1000)
+        ix2000 = base.createInternetExchange(2000)
+
+        self.assertEqual(ix1000.getPeeringLan().getPrefix(), IPv4Network('100.0.4.0/24'))
+        self.assertEqual(ix2000.getPeeringLan().getPrefix(), IPv4Network('100.0.0.0/22'))
+
+    def testLoopbacks(self):
+        planner = AddressPlanner(loopbackPool = '10.0.0.0/29')
+
+        addresses = [planner.allocateLoopback() for _ in range(6)]
+        self.assertEqual(addresses, [IPv4Address('10.0.0.{}'.format(i)) for i in range(1, 7)])
+
+        with self.assertRaises(AssertionError): planner.allocateLoopback()
+
+        planner.releaseLoopback(IPv4Address('10.0.0.3'))
+        self.assertEqual(planner.allocateLoopback(), IPv4Address('10.0.0.3'))
+
+    def testReserve(self):
+        planner = AddressPlanner(linkPool = '32.0.0.0/16', loopbackPool = '10.0.0.0/24')
+
+        self.assertIs(planner.reserve('32.0.0.0/24'), planner)
+        planner.reserve('10.0.0.1/32')
+
+        self.assertEqual(planner.allocateLinkPrefix(), IPv4Network('32.0.1.0/24'))
+        self.assertEqual(planner.allocateLoopback(), IPv4Address('10.0.0.2'))
+
+    def testIxExplicitAddress(self):
+        emu = Emulator()
+        base = Base().setAddressPlanner(AddressPlanner())
+
+        lan = base.createInternetExchange(5000).getPeeringLan().getPrefix()
+
+        for asn in [70000, 70001]:
+            asobj = base.createAutonomousSystem(asn)
+            asobj.createNetwork('net0')
+            asobj.createRouter('router0').joinNetwork('net0')
+
+        base.getAutonomousSystem(70000).getRouter('router0').joinNetwork('ix5000', str(lan.network_address + 3))
+        base.getAutonomousSystem(70001).getRouter('router0').joinNetwork('ix5000')
+
+        emu.addLayer(base)
+        emu.addLayer(Routing())
+        emu.render()
+
+        registry = emu.getRegistry()
+        addresses = [registry.get('ix', 'rs', 'ix5000').getInterfaces()[0].getAddress()]
+        for asn in [70000, 70001]:
+            addresses += [iface.getAddress() for iface in registry.get(str(asn), 'rnode', 'router0').getInterfaces() if iface.getAddress() in lan]
+
+        # the address set by hand is skipped by the table.
+        self.assertEqual(addresses, [lan.network_address + 2, lan.network_address + 3, lan.network_address + 4])
+
+    def testRender(self):
+        emu = Emulator()
+        base = Base().setAddressPlanner(AddressPlanner())
+
+        ix = base.createInternetExchange(1000)
+
+        for asn in [65000, 65001]:
+            asobj = base.createAutonomousSystem(asn)
+            asobj.createNetwork('net0')
+            asobj.createRouter('router0').joinNetwork('net0').joinNetwork('ix1000')
+            asobj.createHost('host0').joinNetwork('net0')
+
+        emu.addLayer(base)
+        emu.addLayer(Routing())
+        emu.render()
+
+        registry = emu.getRegistry()
+        ixAddresses = set()
+        loopbacks = set()
+
+        for asn in [65000, 65001]:
+            router = registry.get(str(asn), 'rnode', 'router0')
+            block = base.getAutonomousSystem(asn).getAddressBlock()
+
+            for iface in router.getInterfaces():
+                if iface.getNet() == ix.getPeeringLan(): ixAddresses.add(iface.getAddress())
+                else: self.assertIn(iface.getAddress(), block)
+
+            loopbacks.add(str(router.getLoopbackAddress()))
+
+        self.assertEqual(len(ixAddresses), 2)
+        self.assertEqual(loopbacks, {'10.0.0.1', '10.0.0.2'})
+
+if __name__ == '__main__':
+    unittest.main()
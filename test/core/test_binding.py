@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from seedemu.core import Binding, Filter, Action, VirtualNodeIndex, CandidateIndex, Emulator
+from seedemu.layers import Base
+
+class BindingPatternTestCase(unittest.TestCase):
+    """!
+    @brief tests for compiled binding patterns and the virtual node index.
+    """
+
+    def testSourcePattern(self):
+        binding = Binding('web.*')
+
+        pattern = binding.getSourcePattern()
+        self.assertIs(binding.getSourcePattern(), pattern)
+        self.assertTrue(binding.shoudBind('web0'))
+        self.assertFalse(binding.shoudBind('dns0'))
+
+        # changing the source recompiles the pattern.
+        binding.source = 'dns.*'
+        self.assertIsNot(binding.getSourcePattern(), pattern)
+        self.assertTrue(binding.shoudBind('dns0'))
+
+    def testLiteralSource(self):
+        self.assertEqual(Binding('web0').getLiteralSource(), 'web0')
+        self.assertIsNone(Binding('web[0-9]').getLiteralSource())
+        self.assertIsNone(Binding('web.*').getLiteralSource())
+
+    def testNodeNamePattern(self):
+        filter = Filter(nodeName = 'host_.*')
+
+        pattern = filter.getNodeNamePattern()
+        self.assertIs(filter.getNodeNamePattern(), pattern)
+        self.assertTrue(pattern.match('host_0'))
+
+        filter.nodeName = 'router.*'
+        self.assertTrue(filter.getNodeNamePattern().match('router0'))
+        self.assertIsNone(Filter().getNodeNamePattern())
+
+    def testVirtualNodeIndex(self):
+        vnodes = ['web1', 'dns0', 'web0', 'web10', 'webx', 'ldns']
+        index = VirtualNodeIndex(vnodes)
+
+        # literal sources are prefix matches, same as shoudBind.
+        self.assertEqual(index.match(Binding('web1')), ['web1', 'web10'])
+        self.assertEqual(index.match(Binding('web')), ['web1', 'web0', 'web10', 'webx'])
+        self.assertEqual(index.match(Binding('ftp')), [])
+
+        self.assertEqual(index.match(Binding('web[0-9]+$')), ['web1', 'web0', 'web10'])
+        self.assertEqual(index.match(Binding('.*dns')), ['dns0', 'ldns'])
+
+        for source in ['web1', 'web', 'web[0-9]+$', '.*dns', 'ftp']:
+            binding = Binding(source)
+            self.assertEqual(index.match(binding), [v for v in vnodes if binding.shoudBind(v)])
+
+class CandidateIndexTestCase(unittest.TestCase):
+    """!
+    @brief tests for the host candidate index.
+    """
+
+    def setUp(self):
+        self.emu = Emulator()
+        self.base = Base()
+
+        for asn in [150, 151]:
+            asobj = self.base.createAutonomousSystem(asn)
+            asobj.createNetwork('net0')
+            asobj.createRouter('router0').joinNetwork('net0')
+            for i in range(3): asobj.createHost('host{}'.format(i)).joinNetwork('net0')
+
+        self.emu.addLayer(self.base)
+        self.emu.render()
+
+        self.index = CandidateIndex(self.emu.getRegistry())
+
+    def names(self, filter: Filter):
+        return [(node.getAsn(), node.getName()) for node in self.index.getCandidates(filter)]
+
+    def testAllHosts(self):
+        self.assertEqual(self.names(Filter()), [
+            (150, 'host0'), (150, 'host1'), (150, 'host2'),
+            (151, 'host0'), (151, 'host1'), (151, 'host2')
+        ])
+
+    def testConditions(self):
+        self.assertEqual(self.names(Filter(asn = 151)), [(151, 'host0'), (151, 'host1'), (151, 'host2')])
+        self.assertEqual(self.names(Filter(ip = '10.150.0.72')), [(150, 'host1')])
+        self.assertEqual(self.names(Filter(prefix = '10.151.0.72/31')), [(151, 'host1'), (151, 'host2')])
+        self.assertEqual(self.names(Filter(nodeName = 'host2')), [(150, 'host2'), (151, 'host2')])
+        self.assertEqual(self.names(Filter(asn = 150, nodeName = 'host')), [(150, 'host0'), (150, 'host1'), (150, 'host2')])
+        self.assertEqual(self.names(Filter(asn = 150, ip = '10.151.0.71')), [])
+        self.assertEqual(self.names(Filter(asn = 152)), [])
+        self.assertEqual(self.names(Filter(prefix = '10.150.0.0/24', nodeName = 'host1')), [(150, 'host1')])
+        self.assertEqual(self.names(Filter(ip = '10.151.0.73', prefix = '10.151.0.0/24')), [(151, 'host2')])
+        self.assertEqual(self.names(Filter(ip = '10.151.0.73', prefix = '10.150.0.0/24')), [])
+
+    def testFirstIsLazy(self):
+        tested = []
+        filter = Filter(custom = lambda vnode, node: tested.append(node.getName()) or True)
+
+        node = Binding('web', filter = filter, action = Action.FIRST).getCandidate('web', self.emu, True)
+
+        # candidates after the first match are never produced.
+        self.assertEqual((node.getAsn(), node.getName()), (150, 'host0'))
+        self.assertEqual(tested, ['host0'])
+        self.assertNotIsInstance(self.index.getCandidates(Filter()), list)
+
+    def testRegexpNameNotIndexed(self):
+        # regexp names are left to the caller.
+        self.assertEqual(len(self.names(Filter(nodeName = 'host[01]'))), 6)
+
+    def testStale(self):
+        registry = self.emu.getRegistry()
+        self.assertFalse(self.index.isStale())
+
+        version = registry.getVersion()
+        registry.get('150', 'hnode', 'host0')
+        registry.getByType('150', 'hnode')
+        self.assertEqual(registry.getVersion(), version)
+        self.assertFalse(self.index.isStale())
+
+        host = self.base.getAutonomousSystem(150).createHost('host3')
+        registry.register('150', 'hnode', 'host3', host)
+        self.assertTrue(self.index.isStale())
+
+        self.index.add(host)
+        self.assertFalse(self.index.isStale())
+        self.assertEqual(self.names(Filter(nodeName = 'host3')), [(150, 'host3')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import unittest
+from threading import Barrier, Lock
+from typing import List
+
+from seedemu.core import Emulator, Layer
+from seedemu.layers import Base
+
+class RecordingLayer(Layer):
+    """!
+    @brief layer that records when it is configured and rendered.
+    """
+
+    def __init__(self, name: str, log: List, depends: List[str] = [], barrier: Barrier = None):
+        super().__init__()
+        self.__name = name
+        self.__log = log
+        self.__barrier = barrier
+        self.__lock = Lock()
+
+        for dep in depends: self.addDependency(dep, False, False)
+
+    def getName(self) -> str:
+        return self.__name
+
+    def configure(self, emulator: Emulator):
+        with self.__lock: self.__log.append(('configure', self.__name))
+
+    def render(self, emulator: Emulator):
+        # only passes if the other layer waiting on the barrier runs at the
+        # same time.
+        if self.__barrier != None: self.__barrier.wait()
+        with self.__lock: self.__log.append(('render', self.__name))
+
+class LayerSchedulerTestCase(unittest.TestCase):
+    """!
+    @brief tests for scheduling layers from their dependencies.
+    """
+
+    def makeEmulator(self, log: List, barrier: Barrier = None) -> Emulator:
+        emu = Emulator()
+        emu.addLayer(Base())
+
+        # added out of dependency order on purpose.
+        emu.addLayer(RecordingLayer('D', log, ['C']))
+        emu.addLayer(RecordingLayer('C', log, ['A', 'B']))
+        emu.addLayer(RecordingLayer('B', log, [], barrier))
+        emu.addLayer(RecordingLayer('A', log, [], barrier))
+
+        return emu
+
+    def checkOrder(self, log: List):
+        for phase in ['configure', 'render']:
+            order = [name for (p, name) in log if p == phase]
+
+            self.assertEqual(sorted(order), ['A', 'B', 'C', 'D'])
+            self.assertEqual(order[2:], ['C', 'D'])
+
+        # every layer is configured before any layer is rendered.
+        self.assertEqual([p for (p, _) in log], ['configure'] * 4 + ['render'] * 4)
+
+    def testDependencyOrder(self):
+        log = []
+        self.makeEmulator(log).render()
+        self.checkOrder(log)
+
+    def testParallel(self):
+        log = []
+        self.makeEmulator(log, Barrier(2, timeout = 10)).render(workers = 2, deterministic = False)
+        self.checkOrder(log)
+
+    def testDeterministic(self):
+        logs = []
+
+        for _ in range(3):
+            log = []
+            self.makeEmulator(log).render(workers = 4)
+            self.checkOrder(log)
+            logs.append(log)
+
+        self.assertEqual(logs[0], logs[1])
+        self.assertEqual(logs[0], logs[2])
+
+    def testMissingDependency(self):
+        emu = Emulator()
+        emu.addLayer(Base())
+        emu.addLayer(RecordingLayer('A', [], ['B']))
+
+        with self.assertRaises(AssertionError): emu.render()
+
+    def testCycle(self):
+        emu = Emulator()
+        emu.addLayer(Base())
+        emu.addLayer(RecordingLayer('A', [], ['B']))
+        emu.addLayer(RecordingLayer('B', [], ['A']))
+
+        with self.assertRaises(AssertionError): emu.render()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+from seedemu.core import Logger, getLogger, setLogLevel
+from seedemu.core.enums import LogLevel
+
+class Formatted(object):
+    """!
+    @brief format argument that counts how often it is formatted.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __format__(self, spec: str) -> str:
+        self.count += 1
+        return 'formatted'
+
+class LoggerTestCase(unittest.TestCase):
+    """!
+    @brief tests for the level-gated logger.
+    """
+
+    def testLevels(self):
+        logger = Logger(LogLevel.Warning)
+
+        self.assertFalse(logger.isEnabled(LogLevel.Debug))
+        self.assertFalse(logger.isEnabled(LogLevel.Info))
+        self.assertTrue(logger.isEnabled(LogLevel.Warning))
+        self.assertTrue(logger.isEnabled(LogLevel.Error))
+
+        self.assertIs(logger.setLevel(LogLevel.Debug), logger)
+        self.assertEqual(logger.getLevel(), LogLevel.Debug)
+        self.assertTrue(logger.isEnabled(LogLevel.Debug))
+
+    def testLog(self):
+        logger = Logger(LogLevel.Info)
+        arg = Formatted()
+        err = StringIO()
+
+        with redirect_stderr(err):
+            logger.log(LogLevel.Debug, 'source', 'dropped: {}', arg)
+            logger.log(LogLevel.Info, 'source', 'printed: {}', arg)
+            logger.log(LogLevel.Info, 'source', 'no {} args')
+
+        # dropped messages are not formatted.
+        self.assertEqual(arg.count, 1)
+        self.assertEqual(err.getvalue(), 'source: printed: formatted\nsource: no {} args\n')
+
+    def testSharedLogger(self):
+        level = getLogger().getLevel()
+
+        try:
+            setLogLevel(LogLevel.Error)
+            self.assertEqual(getLogger().getLevel(), LogLevel.Error)
+        finally:
+            setLogLevel(level)
+
+if __name__ == '__main__':
+    unittest.main()
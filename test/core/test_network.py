@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+import unittest
+from ipaddress import IPv4Address, IPv4Network
+
+from seedemu.core import Emulator, Network, AddressAssignmentConstraint, Assigner
+from seedemu.core.AddressAssignmentConstraint import AddressBitmap
+from seedemu.core.enums import NetworkType, NodeRole
+from seedemu.layers import Base, Routing
+
+class AddressBitmapTestCase(unittest.TestCase):
+    """!
+    @brief tests for the used address bitmap.
+    """
+
+    def testUseFree(self):
+        bitmap = AddressBitmap(256)
+
+        self.assertEqual(bitmap.getSize(), 256)
+        self.assertFalse(bitmap.isUsed(9))
+
+        bitmap.use(9)
+        bitmap.use(255)
+        self.assertTrue(bitmap.isUsed(9))
+        self.assertTrue(bitmap.isUsed(255))
+        self.assertFalse(bitmap.isUsed(8))
+        self.assertFalse(bitmap.isUsed(10))
+
+        bitmap.free(9)
+        self.assertFalse(bitmap.isUsed(9))
+        self.assertTrue(bitmap.isUsed(255))
+
+    def testErrors(self):
+        bitmap = AddressBitmap(4)
+        bitmap.use(0)
+
+        with self.assertRaises(AssertionError): bitmap.use(0)
+        with self.assertRaises(AssertionError): bitmap.use(4)
+        with self.assertRaises(AssertionError): bitmap.use(-1)
+
+class AssignerTestCase(unittest.TestCase):
+    """!
+    @brief tests for the offset assigner.
+    """
+
+    def testNext(self):
+        assigner = Assigner(254, 200, -1)
+
+        self.assertEqual([assigner.next() for _ in range(3)], [254, 253, 252])
+
+        assigner = Assigner(1, 2, 1)
+        self.assertEqual([assigner.next(), assigner.next()], [1, 2])
+        with self.assertRaises(AssertionError): assigner.next()
+
+    def testStepZero(self):
+        assigner = Assigner(1, 1, 0)
+
+        self.assertEqual(assigner.next(), 1)
+        with self.assertRaises(AssertionError): assigner.next()
+
+        assigner.release(1)
+        self.assertEqual(assigner.next(), 1)
+
+    def testRelease(self):
+        assigner = Assigner(71, 99, 1)
+        for _ in range(5): assigner.next()
+
+        assigner.release(74)
+        assigner.release(72)
+        assigner.release(72)
+        self.assertEqual([assigner.next(), assigner.next()], [72, 74])
+
+        # values never handed out are ignored, and values after a released
+        # one are not handed out again.
+        assigner.release(90)
+        self.assertEqual(assigner.next(), 76)
+
+        assigner = Assigner(254, 200, -1)
+        for _ in range(3): assigner.next()
+
+        assigner.release(253)
+        self.assertEqual(assigner.next(), 253)
+
+class NetworkAddressTestCase(unittest.TestCase):
+    """!
+    @brief tests for tracking used addresses in networks.
+    """
+
+    def setUp(self):
+        self.net = Network('net0', NetworkType.Local, IPv4Network('10.150.0.0/24'))
+
+    def testAssign(self):
+        self.assertEqual(self.net.assign(NodeRole.Host), IPv4Address('10.150.0.71'))
+        self.assertEqual(self.net.assign(NodeRole.Host), IPv4Address('10.150.0.72'))
+        self.assertEqual(self.net.assign(NodeRole.Router), IPv4Address('10.150.0.254'))
+
+        self.assertTrue(self.net.isAddressUsed(IPv4Address('10.150.0.72')))
+        self.assertFalse(self.net.isAddressUsed(IPv4Address('10.150.0.73')))
+        self.assertFalse(self.net.isAddressUsed(IPv4Address('10.151.0.71')))
+
+    def testReserve(self):
+        self.assertIs(self.net.reserve(IPv4Address('10.150.0.71')), self.net)
+        self.net.reserve(IPv4Address('10.150.0.72'))
+
+        # reserved addresses are skipped.
+        self.assertEqual(self.net.assign(NodeRole.Host), IPv4Address('10.150.0.73'))
+
+        with self.assertRaises(AssertionError): self.net.reserve(IPv4Address('10.150.0.73'))
+
+    def testRelease(self):
+        addresses = [self.net.assign(NodeRole.Host) for _ in range(3)]
+
+        self.assertIs(self.net.release(addresses[1]), self.net)
+        self.assertFalse(self.net.isAddressUsed(addresses[1]))
+
+        # the released address is handed out again, then assignment continues
+        # after the addresses still in use.
+        self.assertEqual(self.net.assign(NodeRole.Host), addresses[1])
+        self.assertEqual(self.net.assign(NodeRole.Host), IPv4Address('10.150.0.74'))
+
+        # a released address that was reserved again is skipped.
+        self.net.release(addresses[0])
+        self.net.reserve(addresses[0])
+        self.assertEqual(self.net.assign(NodeRole.Host), IPv4Address('10.150.0.75'))
+
+    def testRange(self):
+        net = Network('net0', NetworkType.Local, IPv4Network('10.150.0.0/24'), AddressAssignmentConstraint(hostStart = 2, hostEnd = 3))
+
+        net.assign(NodeRole.Host)
+        net.assign(NodeRole.Host)
+
+        with self.assertRaises(AssertionError): net.assign(NodeRole.Host)
+
+    def testIxAddress(self):
+        ix = Network('ix100', NetworkType.InternetExchange, IPv4Network('10.100.0.0/24'))
+
+        self.assertEqual(ix.assign(NodeRole.Router, 150), IPv4Address('10.100.0.150'))
+        with self.assertRaises(AssertionError): ix.assign(NodeRole.Router, 150)
+
+    def testExplicitAddress(self):
+        emu = Emulator()
+        base = Base()
+
+        asobj = base.createAutonomousSystem(150)
+        asobj.createNetwork('net0')
+        asobj.createRouter('router0').joinNetwork('net0')
+        asobj.createHost('host0').joinNetwork('net0', '10.150.0.71')
+        asobj.createHost('host1').joinNetwork('net0', '10.150.0.71')
+
+        emu.addLayer(base)
+        emu.addLayer(Routing())
+
+        with self.assertRaises(AssertionError): emu.render()
+
+    def testExplicitAddressSkipped(self):
+        emu = Emulator()
+        base = Base()
+
+        asobj = base.createAutonomousSystem(150)
+        asobj.createNetwork('net0')
+        asobj.createRouter('router0').joinNetwork('net0')
+        asobj.createHost('host0').joinNetwork('net0', '10.150.0.71')
+        asobj.createHost('host1').joinNetwork('net0')
+
+        emu.addLayer(base)
+        emu.addLayer(Routing())
+        emu.render()
+
+        host = emu.getRegistry().get('150', 'hnode', 'host1')
+        self.assertEqual(host.getInterfaces()[0].getAddress(), IPv4Address('10.150.0.72'))
+
+if __name__ == '__main__':
+    unittest.main()
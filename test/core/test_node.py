@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import pickle
+import unittest
+from ipaddress import IPv4Address, IPv4Network
+
+from seedemu.core import File, Interface, Network, Node, Registrable
+from seedemu.core.enums import NetworkType, NodeRole
+
+class CompactNodeTestCase(unittest.TestCase):
+    """!
+    @brief tests for the slotted file, interface and registry info classes.
+    """
+
+    def setUp(self):
+        self.net = Network('net0', NetworkType.Local, IPv4Network('10.150.0.0/24'))
+
+    def testNoInstanceDict(self):
+        self.assertFalse(hasattr(File('/a', 'b'), '__dict__'))
+        self.assertFalse(hasattr(Interface(self.net), '__dict__'))
+
+    def testPickle(self):
+        iface = Interface(self.net)
+        iface.setAddress(IPv4Address('10.150.0.71'))
+        iface.setLinkProperties(latency = 10, bandwidth = 1000000, packetDrop = 1)
+
+        (file, iface) = pickle.loads(pickle.dumps((File('/a', 'b'), iface)))
+
+        self.assertEqual(file.get(), ('/a', 'b'))
+        self.assertEqual(iface.getAddress(), IPv4Address('10.150.0.71'))
+        self.assertEqual(iface.getLinkProperties(), (10, 1000000, 1))
+        self.assertEqual(iface.getNet().getPrefix(), IPv4Network('10.150.0.0/24'))
+
+    def testDictState(self):
+        # objects pickled before the classes had slots carry an instance dict.
+        file = File.__new__(File)
+        file.__setstate__({ '_File__path': '/a', '_File__content': 'b' })
+        self.assertEqual(file.get(), ('/a', 'b'))
+
+        iface = Interface.__new__(Interface)
+        iface.__setstate__({
+            '_Interface__network': self.net,
+            '_Interface__address': IPv4Address('10.150.0.71'),
+            '_Interface__latency': 0,
+            '_Interface__bandwidth': 0,
+            '_Interface__drop': 0
+        })
+        self.assertEqual(iface.getAddress(), IPv4Address('10.150.0.71'))
+
+        obj = Registrable.__new__(Registrable)
+        obj.__setstate__({ '_rscope': '150', '_rtype': 'hnode', '_rname': 'host0', '_attrs': {} })
+        self.assertEqual(obj.getRegistryInfo(), ('150', 'hnode', 'host0'))
+
+    def testAttributes(self):
+        obj = Registrable()
+
+        self.assertFalse(obj.hasAttribute('bound'))
+        self.assertIsNone(obj.getAttribute('bound'))
+
+        obj.setAttribute('bound', True)
+        self.assertTrue(obj.getAttribute('bound'))
+        self.assertEqual(obj.getAttribute('list', []), [])
+
+    def testLazyCollections(self):
+        node = Node('host0', NodeRole.Host, 150)
+
+        self.assertEqual(node.getClasses(), [])
+        self.assertEqual(node.getLabel(), {})
+        self.assertEqual(node.getPorts(), [])
+        self.assertEqual(node.getSharedFolders(), {})
+        self.assertEqual(node.getPersistentStorages(), [])
+
+        node.addPort(8080, 80)
+        node.appendClassName('web')
+        node.setLabel('key', 'value')
+        node.addSharedFolder('/node', '/host')
+        node.addPersistentStorage('/data')
+
+        node = pickle.loads(pickle.dumps(node))
+
+        self.assertEqual(node.getPorts(), [(8080, 80, 'tcp')])
+        self.assertEqual(node.getClasses(), ['web'])
+        self.assertEqual(node.getLabel(), { 'key': 'value' })
+        self.assertEqual(node.getSharedFolders(), { '/node': '/host' })
+        self.assertEqual(node.getPersistentStorages(), ['/data'])
+
+class FileContentTestCase(unittest.TestCase):
+    """!
+    @brief tests for building file content with appends.
+    """
+
+    def testAppend(self):
+        file = File('/etc/bird/bird.conf', 'a')
+
+        self.assertIs(file.appendContent('b'), file)
+        file.appendContent('c')
+        self.assertEqual(file.get(), ('/etc/bird/bird.conf', 'abc'))
+
+        # appending after a read keeps the content read so far.
+        file.appendContent('d')
+        self.assertEqual(file.get()[1], 'abcd')
+
+    def testSetContent(self):
+        file = File('/a')
+        file.appendContent('x').appendContent('y')
+
+        file.setContent('z')
+        self.assertEqual(file.get()[1], 'z')
+
+        file.appendContent('z')
+        self.assertEqual(file.get()[1], 'zz')
+
+    def testManyAppends(self):
+        file = File('/a')
+        for i in range(10000): file.appendContent('{}\n'.format(i))
+
+        self.assertEqual(file.get()[1], ''.join('{}\n'.format(i) for i in range(10000)))
+
+    def testPickleWithFragments(self):
+        file = File('/a', 'x')
+        file.appendContent('y')
+
+        file = pickle.loads(pickle.dumps(file))
+        self.assertEqual(file.get()[1], 'xy')
+
+    def testNodeFiles(self):
+        node = Node('host0', NodeRole.Host, 150)
+
+        node.appendFile('/a', 'x')
+        node.appendFile('/a', 'y')
+        node.setFile('/b', 'z')
+
+        self.assertEqual(sorted(file.get() for file in node.getFiles()), [('/a', 'xy'), ('/b', 'z')])
+
+if __name__ == '__main__':
+    unittest.main()
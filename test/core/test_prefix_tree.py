@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from seedemu.core import PrefixTree, Emulator
+from seedemu.layers import Base
+
+class PrefixTreeTestCase(unittest.TestCase):
+    """!
+    @brief tests for the prefix tree.
+    """
+
+    def setUp(self):
+        self.tree = PrefixTree()
+        self.tree.insert('10.0.0.0/8', 'a')
+        self.tree.insert('10.150.0.0/16', 'b')
+        self.tree.insert('10.150.0.0/24', 'c')
+        self.tree.insert('10.150.1.0/24', 'd')
+        self.tree.insert('10.150.0.0/24', 'e')
+        self.tree.insert('192.168.0.0/16', 'f')
+
+    def testLen(self):
+        self.assertEqual(len(self.tree), 6)
+        self.assertEqual(len(PrefixTree()), 0)
+
+    def testGetExact(self):
+        self.assertEqual(self.tree.getExact('10.150.0.0/24'), ['c', 'e'])
+        self.assertEqual(self.tree.getExact('10.150.0.0/23'), [])
+        self.assertEqual(self.tree.getExact('172.16.0.0/12'), [])
+
+    def testGetContaining(self):
+        self.assertEqual(self.tree.getContaining('10.150.0.71'), ['a', 'b', 'c', 'e'])
+        self.assertEqual(self.tree.getContaining('10.150.2.1'), ['a', 'b'])
+        self.assertEqual(self.tree.getContaining('172.16.0.1'), [])
+
+    def testLookup(self):
+        self.assertEqual(self.tree.lookup('10.150.1.10'), ['d'])
+        self.assertEqual(self.tree.lookup('10.150.0.10'), ['c', 'e'])
+        self.assertEqual(self.tree.lookup('10.151.0.10'), ['a'])
+        self.assertEqual(self.tree.lookup('8.8.8.8'), [])
+
+        self.tree.insert('0.0.0.0/0', 'default')
+        self.assertEqual(self.tree.lookup('8.8.8.8'), ['default'])
+
+    def testGetOverlapping(self):
+        self.assertEqual(self.tree.getOverlapping('10.150.0.0/23'), ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(self.tree.getOverlapping('10.150.1.128/25'), ['a', 'b', 'd'])
+        self.assertEqual(self.tree.getOverlapping('192.0.0.0/2'), ['f'])
+        self.assertEqual(self.tree.getOverlapping('172.16.0.0/12'), [])
+
+class BasePrefixTreeTestCase(unittest.TestCase):
+    """!
+    @brief tests for the prefix tree of the base layer.
+    """
+
+    def testNetworks(self):
+        emu = Emulator()
+        base = Base()
+
+        base.createInternetExchange(100)
+        asobj = base.createAutonomousSystem(150)
+        asobj.createNetwork('net0')
+        asobj.createNetwork('net1')
+        asobj.createRouter('router0').joinNetwork('net0').joinNetwork('ix100')
+
+        emu.addLayer(base)
+        emu.render()
+
+        tree = base.getPrefixTree()
+
+        self.assertEqual([(scope, name) for (scope, name, _) in tree.lookup('10.150.1.5')], [('150', 'net1')])
+        self.assertEqual([(scope, name) for (scope, name, _) in tree.lookup('10.100.0.150')], [('ix', 'ix100')])
+        self.assertEqual(tree.lookup('10.151.0.1'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import json
+import unittest
+
+from seedemu.core import Emulator, Profiler, Registry, Registrable
+from seedemu.layers import Base, Routing
+
+class ProfilerTestCase(unittest.TestCase):
+    """!
+    @brief tests for the render profiler.
+    """
+
+    def testSections(self):
+        registry = Registry()
+        registry.register('150', 'hnode', 'host0', Registrable())
+
+        profiler = Profiler(memory = False).start(registry)
+
+        with profiler.section('outer'):
+            for _ in range(2):
+                with profiler.section('inner'): registry.get('150', 'hnode', 'host0')
+
+        profiler.stop()
+
+        [outer] = profiler.getRoot().getChildren()
+        [inner] = outer.getChildren()
+
+        self.assertEqual((outer.getName(), outer.calls, outer.touched), ('outer', 1, 2))
+        self.assertEqual((inner.getName(), inner.calls, inner.touched), ('inner', 2, 2))
+        self.assertGreaterEqual(outer.wall, inner.wall)
+        self.assertGreaterEqual(outer.getSelfWall(), 0.0)
+
+    def testCounting(self):
+        registry = Registry()
+        registry.register('150', 'hnode', 'host0', Registrable())
+        registry.get('150', 'hnode', 'host0')
+
+        # nothing is counted without a profiler.
+        self.assertEqual(registry.getTouchCount(), 0)
+
+        profiler = Profiler(memory = False).start(registry)
+        registry.get('150', 'hnode', 'host0')
+        profiler.stop()
+
+        registry.get('150', 'hnode', 'host0')
+        self.assertEqual(registry.getTouchCount(), 1)
+
+    def testRender(self):
+        emu = Emulator()
+        base = Base()
+
+        asobj = base.createAutonomousSystem(150)
+        asobj.createNetwork('net0')
+        asobj.createRouter('router0').joinNetwork('net0')
+        asobj.createHost('host0').joinNetwork('net0')
+
+        emu.addLayer(base)
+        emu.addLayer(Routing())
+        emu.enableProfiling(memory = False)
+        emu.render()
+
+        profile = emu.getProfiler().toDict()
+        phases = { child['name']: child for child in profile['children'] }
+
+        self.assertIn('configure', phases)
+        self.assertIn('render', phases)
+        self.assertEqual([layer['name'] for layer in phases['render']['children']], ['Base', 'Routing'])
+        self.assertGreater(profile['touched'], 0)
+
+        self.assertEqual(json.loads(emu.getProfiler().toJson()), json.loads(json.dumps(profile)))
+
+        for line in emu.getProfiler().toFoldedStacks().splitlines():
+            (stack, value) = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith('emulator;'))
+            self.assertGreater(int(value), 0)
+
+        self.assertIn('Routing', emu.getProfiler().getReport())
+
+    def testDisabled(self):
+        emu = Emulator()
+        emu.addLayer(Base())
+        emu.render()
+
+        self.assertIsNone(emu.getProfiler())
+
+if __name__ == '__main__':
+    unittest.main()
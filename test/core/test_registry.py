@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import pickle
+import unittest
+
+from seedemu.core import Registry, Registrable
+
+class RegistryTestCase(unittest.TestCase):
+    """!
+    @brief tests for the registry indexes.
+    """
+
+    def setUp(self):
+        self.registry = Registry()
+        self.objects = {}
+
+        for (scope, type, name) in [
+            ('150', 'net', 'net0'),
+            ('150', 'hnode', 'host0'),
+            ('151', 'hnode', 'host0'),
+            ('150', 'rnode', 'router0'),
+            ('ix', 'net', 'ix100'),
+            ('150', 'hnode', 'host1')
+        ]:
+            self.objects[(scope, type, name)] = self.registry.register(scope, type, name, Registrable())
+
+    def testRegister(self):
+        obj = self.objects[('150', 'hnode', 'host0')]
+
+        self.assertEqual(obj.getRegistryInfo(), ('150', 'hnode', 'host0'))
+        self.assertIs(self.registry.get('150', 'hnode', 'host0'), obj)
+        self.assertTrue(self.registry.has('151', 'hnode', 'host0'))
+        self.assertFalse(self.registry.has('151', 'hnode', 'host1'))
+
+        with self.assertRaises(AssertionError):
+            self.registry.register('150', 'hnode', 'host0', Registrable())
+
+    def testGetByType(self):
+        self.assertEqual(self.registry.getByType('150', 'hnode'), [
+            self.objects[('150', 'hnode', 'host0')],
+            self.objects[('150', 'hnode', 'host1')]
+        ])
+        self.assertEqual(self.registry.getByType('151', 'rnode'), [])
+        self.assertEqual(self.registry.getByType('152', 'hnode'), [])
+
+    def testGetByScope(self):
+        self.assertEqual(self.registry.getByScope('150'), [
+            self.objects[key] for key in self.objects.keys() if key[0] == '150'
+        ])
+        self.assertEqual(self.registry.getByScope('152'), [])
+        self.assertEqual(set(self.registry.getScopes()), {'150', '151', 'ix'})
+
+    def testIndexesNewObjects(self):
+        obj = self.registry.register('151', 'hnode', 'host1', Registrable())
+
+        self.assertEqual(self.registry.getByType('151', 'hnode'), [self.objects[('151', 'hnode', 'host0')], obj])
+        self.assertEqual(self.registry.getByScope('151')[-1], obj)
+
+    def testIterByType(self):
+        keys = [key for (key, _) in self.registry.iterByType({'hnode', 'net'})]
+
+        # registration order, across types.
+        self.assertEqual(keys, [key for key in self.objects.keys() if key[1] in {'hnode', 'net'}])
+
+        keys = [key for (key, _) in self.registry.iterByType({'hnode', 'net'}, '150')]
+        self.assertEqual(keys, [('150', 'net', 'net0'), ('150', 'hnode', 'host0'), ('150', 'hnode', 'host1')])
+
+        self.assertEqual(list(self.registry.iterByType({'snode'})), [])
+
+    def testIterNodes(self):
+        nodes = [key for (key, _) in self.registry.iterNodes()]
+        self.assertEqual(nodes, [key for key in self.objects.keys() if key[1] in {'hnode', 'rnode'}])
+
+        nodes = [obj for (_, obj) in self.registry.iterNodes({'rnode'}, '150')]
+        self.assertEqual(nodes, [self.objects[('150', 'rnode', 'router0')]])
+
+    def testPickle(self):
+        registry = pickle.loads(pickle.dumps(self.registry))
+
+        self.assertEqual(len(registry.getAll()), len(self.objects))
+        self.assertEqual([o.getRegistryInfo() for o in registry.getByType('150', 'hnode')], [
+            ('150', 'hnode', 'host0'),
+            ('150', 'hnode', 'host1')
+        ])
+
+    def testLoadUnindexedDump(self):
+        # dumps from before the indexes only carry the objects dict.
+        registry = Registry.__new__(Registry)
+        registry.__setstate__({ '_Registry__objects': dict(self.registry.getAll()) })
+
+        self.assertEqual(len(registry.getByType('150', 'hnode')), 2)
+        self.assertEqual(set(registry.getScopes()), {'150', '151', 'ix'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import unittest
+from os import listdir
+from tempfile import TemporaryDirectory
+
+from seedemu.core import Emulator, Layer, RenderCache, Binding, Filter
+from seedemu.layers import Base, Routing
+
+## names of the layers rendered so far, kept out of the emulation so it does
+## not change the cache key.
+rendered = []
+
+class CountingLayer(Layer):
+    """!
+    @brief layer that records when it is rendered.
+    """
+
+    def getName(self) -> str:
+        return 'Counting'
+
+    def render(self, emulator: Emulator):
+        rendered.append(self.getName())
+
+def makeEmulator(hosts: int = 1) -> Emulator:
+    """!
+    @brief build a small emulation.
+
+    @param hosts (optional) number of hosts. Default to 1.
+
+    @returns emulator.
+    """
+    emu = Emulator()
+    base = Base()
+
+    asobj = base.createAutonomousSystem(150)
+    asobj.createNetwork('net0')
+    asobj.createRouter('router0').joinNetwork('net0')
+    for i in range(hosts): asobj.createHost('host{}'.format(i)).joinNetwork('net0')
+
+    emu.addLayer(base)
+    emu.addLayer(Routing())
+    emu.addLayer(CountingLayer())
+
+    return emu
+
+class RenderCacheTestCase(unittest.TestCase):
+    """!
+    @brief tests for the render cache.
+    """
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        rendered.clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def testHit(self):
+        first = makeEmulator().enableRenderCache(self.tmp.name).render()
+        self.assertEqual(rendered, ['Counting'])
+        self.assertEqual(len(listdir(self.tmp.name)), 1)
+
+        second = makeEmulator().enableRenderCache(self.tmp.name).render()
+        self.assertEqual(rendered, ['Counting'])
+        self.assertTrue(second.rendered())
+
+        self.assertEqual(set(second.getRegistry().getAll().keys()), set(first.getRegistry().getAll().keys()))
+
+        host = second.getRegistry().get('150', 'hnode', 'host0')
+        self.assertEqual(str(host.getInterfaces()[0].getAddress()), '10.150.0.71')
+
+    def testMiss(self):
+        makeEmulator().enableRenderCache(self.tmp.name).render()
+        makeEmulator(hosts = 2).enableRenderCache(self.tmp.name).render()
+
+        self.assertEqual(rendered, ['Counting', 'Counting'])
+        self.assertEqual(len(listdir(self.tmp.name)), 2)
+
+    def testKey(self):
+        cache = RenderCache(self.tmp.name)
+
+        self.assertEqual(cache.getKey({ 'a', 'b', 'c' }), cache.getKey({ 'c', 'b', 'a' }))
+        self.assertNotEqual(cache.getKey([1, 2]), cache.getKey([2, 1]))
+        self.assertFalse(cache.has(cache.getKey([1, 2])))
+
+    def testNotPicklable(self):
+        emu = makeEmulator()
+        emu.addBinding(Binding('web', filter = Filter(custom = lambda vnode, node: True)))
+        emu.enableRenderCache(self.tmp.name).render()
+
+        self.assertTrue(emu.rendered())
+        self.assertEqual(rendered, ['Counting'])
+        self.assertEqual(listdir(self.tmp.name), [])
+        self.assertIsNone(RenderCache(self.tmp.name).getKey(lambda: None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import pickle
+import unittest
+from ipaddress import IPv4Address, IPv4Network, IPv4Interface
+from os import listdir
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from seedemu.core import Emulator, Snapshot
+from seedemu.core.Snapshot import SNAPSHOT_MAGIC, SNAPSHOT_VERSION, SnapshotCodecs, _header
+from seedemu.layers import Base, Routing
+
+def hasModule(name: str) -> bool:
+    """!
+    @brief test if an optional module is installed.
+
+    @param name module name.
+
+    @returns True if installed.
+    """
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+
+    return True
+
+class SnapshotTestCase(unittest.TestCase):
+    """!
+    @brief tests for the binary snapshot format.
+    """
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.path = join(self.tmp.name, 'snapshot.bin')
+
+        self.obj = {
+            'address': IPv4Address('10.150.0.71'),
+            'networks': [IPv4Network('10.150.0.0/24'), IPv4Network('10.150.0.0/24')],
+            'interface': IPv4Interface('10.150.0.254/24'),
+            'nested': { 'list': [1, 2, 3], 'str': 'as150' }
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def testRoundTrip(self):
+        Snapshot.write(self.path, self.obj)
+
+        obj = Snapshot.read(self.path)
+
+        self.assertEqual(obj, self.obj)
+        self.assertEqual(Snapshot.getVersion(self.path), SNAPSHOT_VERSION)
+
+        # equal networks share one object.
+        self.assertIs(obj['networks'][0], obj['networks'][1])
+
+    def testOverwrite(self):
+        Snapshot.write(self.path, self.obj)
+        Snapshot.write(self.path, { 'other': True })
+
+        self.assertEqual(Snapshot.read(self.path), { 'other': True })
+
+        # no temporary files are left behind, even if writing fails.
+        with self.assertRaises(Exception): Snapshot.write(self.path, { 'lambda': lambda: None })
+
+        self.assertEqual(listdir(self.tmp.name), ['snapshot.bin'])
+        self.assertEqual(Snapshot.read(self.path), { 'other': True })
+
+    def testPlainPickle(self):
+        with open(self.path, 'wb') as f: pickle.dump(self.obj, f)
+
+        self.assertEqual(Snapshot.getVersion(self.path), 0)
+        self.assertEqual(Snapshot.read(self.path), self.obj)
+
+    def testNewerVersion(self):
+        with open(self.path, 'wb') as f:
+            f.write(_header.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION + 1, SnapshotCodecs['none'], pickle.HIGHEST_PROTOCOL))
+
+        with self.assertRaises(AssertionError): Snapshot.read(self.path)
+
+    def testUnknownCodec(self):
+        with self.assertRaises(AssertionError): Snapshot.write(self.path, self.obj, 'gzip')
+
+    @unittest.skipUnless(hasModule('zstandard'), 'needs the zstandard package.')
+    def testZstd(self):
+        Snapshot.write(self.path, self.obj, 'zstd')
+        self.assertEqual(Snapshot.read(self.path), self.obj)
+
+    @unittest.skipUnless(hasModule('lz4'), 'needs the lz4 package.')
+    def testLz4(self):
+        Snapshot.write(self.path, self.obj, 'lz4')
+        self.assertEqual(Snapshot.read(self.path), self.obj)
+
+class EmulatorDumpTestCase(unittest.TestCase):
+    """!
+    @brief tests for dumping and loading emulations.
+    """
+
+    def makeEmulator(self) -> Emulator:
+        emu = Emulator()
+        base = Base()
+
+        asobj = base.createAutonomousSystem(150)
+        asobj.createNetwork('net0')
+        asobj.createRouter('router0').joinNetwork('net0')
+        asobj.createHost('host0').joinNetwork('net0')
+
+        emu.addLayer(base)
+        emu.addLayer(Routing())
+
+        return emu
+
+    def testDumpLoad(self):
+        with TemporaryDirectory() as tmp:
+            path = join(tmp, 'emulation.bin')
+
+            self.makeEmulator().dump(path)
+            self.assertEqual(Snapshot.getVersion(path), SNAPSHOT_VERSION)
+
+            emu = Emulator().load(path)
+            emu.render()
+
+            expected = self.makeEmulator().render()
+
+            self.assertEqual(set(emu.getRegistry().getAll().keys()), set(expected.getRegistry().getAll().keys()))
+
+            host = emu.getRegistry().get('150', 'hnode', 'host0')
+            self.assertEqual(host.getInterfaces()[0].getAddress(), IPv4Address('10.150.0.71'))
+
+    def testDumpRendered(self):
+        with TemporaryDirectory() as tmp:
+            with self.assertRaises(AssertionError): self.makeEmulator().render().dump(join(tmp, 'emulation.bin'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+
+import re
+import unittest
+from os.path import join
+from tempfile import TemporaryDirectory
+from typing import Set, Tuple
+
+from seedemu.core import Emulator
+from seedemu.layers import Base, Routing, Ebgp, PeerRelationship, PeeringTable
+from seedemu.mergers import DefaultEbgpMerger
+
+def makeEmulator(ebgp: Ebgp) -> Emulator:
+    """!
+    @brief build an emulation with two IXes, and configure it.
+
+    AS 150 has r1 on IX 100, and r2 on both IXes. AS 151 is on IX 100 and AS
+    152 is on IX 101.
+
+    @param ebgp ebgp layer.
+
+    @returns emulator.
+    """
+    emu = Emulator()
+    base = Base()
+
+    base.createInternetExchange(100)
+    base.createInternetExchange(101)
+
+    as150 = base.createAutonomousSystem(150)
+    as150.createNetwork('net0')
+    as150.createRouter('r1').joinNetwork('net0').joinNetwork('ix100')
+    as150.createRouter('r2').joinNetwork('net0').joinNetwork('ix100', '10.100.0.250').joinNetwork('ix101')
+
+    for (asn, ix) in [(151, 100), (152, 101)]:
+        asobj = base.createAutonomousSystem(asn)
+        asobj.createNetwork('net0')
+        asobj.createRouter('router0').joinNetwork('net0').joinNetwork('ix{}'.format(ix))
+
+    emu.addLayer(base)
+    emu.addLayer(Routing())
+    emu.addLayer(ebgp)
+
+    emu.render()
+
+    return emu
+
+def getNeighbors(emu: Emulator, scope: str, type: str, name: str) -> Set[Tuple[str, int]]:
+    """!
+    @brief get bgp neighbors of a router.
+
+    @param emu rendered emulator.
+    @param scope scope of the router.
+    @param type type of the router.
+    @param name name of the router.
+
+    @returns set of tuples of (address, asn).
+    """
+    (_, conf) = emu.getRegistry().get(scope, type, name).getFile('/etc/bird/bird.conf').get()
+
+    return set((address, int(asn)) for (address, asn) in re.findall(r'neighbor (\S+) as (\d+);', conf))
+
+class EbgpIxIndexTestCase(unittest.TestCase):
+    """!
+    @brief tests for resolving IX peerings with the IX member index.
+    """
+
+    def testRsPeers(self):
+        emu = makeEmulator(Ebgp().addRsPeers(100, [150, 151]))
+
+        # the first router of an AS on an IX is used.
+        self.assertEqual(getNeighbors(emu, 'ix', 'rs', 'ix100'), { ('10.100.0.150', 150), ('10.100.0.151', 151) })
+        self.assertEqual(getNeighbors(emu, '150', 'rnode', 'r1'), { ('10.100.0.100', 100) })
+        self.assertEqual(getNeighbors(emu, '150', 'rnode', 'r2'), set())
+
+    def testPrivatePeers(self):
+        ebgp = Ebgp()
+        ebgp.addPrivatePeering(101, 150, 152, PeerRelationship.Provider)
+        ebgp.addPrivatePeering(100, 151, 150)
+
+        emu = makeEmulator(ebgp)
+
+        self.assertEqual(getNeighbors(emu, '150', 'rnode', 'r1'), { ('10.100.0.151', 151) })
+        self.assertEqual(getNeighbors(emu, '150', 'rnode', 'r2'), { ('10.101.0.152', 152) })
+        self.assertEqual(getNeighbors(emu, '152', 'rnode', 'router0'), { ('10.101.0.150', 150) })
+
+    def testNotMember(self):
+        with self.assertRaisesRegex(AssertionError, 'not in ix'): makeEmulator(Ebgp().addRsPeer(101, 151))
+        with self.assertRaisesRegex(AssertionError, 'not in ix'): makeEmulator(Ebgp().addPrivatePeering(100, 150, 152))
+
+class PeeringTableTestCase(unittest.TestCase):
+    """!
+    @brief tests for the compact peering table.
+    """
+
+    def setUp(self):
+        self.table = PeeringTable(100).add((asn, asn + 1000, PeerRelationship.Peer) for asn in range(1, 101))
+
+    def testAdd(self):
+        table = PeeringTable(100)
+
+        self.assertIs(table.add([(150, 151, PeerRelationship.Provider), (152, 150, PeerRelationship.Unfiltered)]), table)
+
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.getIx(), 100)
+        self.assertTrue(table.has(151, 150))
+        self.assertFalse(table.has(151, 152))
+
+        # peerings are returned as added, in either direction.
+        self.assertEqual(table.get(151, 150), (150, 151, PeerRelationship.Provider))
+        self.assertEqual(table.get(150, 152), (152, 150, PeerRelationship.Unfiltered))
+        self.assertIsNone(table.get(151, 152))
+
+        self.assertEqual(list(table), [(150, 151, PeerRelationship.Provider), (152, 150, PeerRelationship.Unfiltered)])
+
+    def testSmallBatch(self):
+        self.table.add([(2000, 1, PeerRelationship.Provider), (50, 51, PeerRelationship.Peer)])
+
+        self.assertEqual(len(self.table), 102)
+        self.assertEqual(self.table.get(1, 2000), (2000, 1, PeerRelationship.Provider))
+        self.assertEqual(self.table.get(51, 50), (50, 51, PeerRelationship.Peer))
+        self.assertEqual(self.table.get(1001, 1), (1, 1001, PeerRelationship.Peer))
+
+    def testDuplicates(self):
+        # existing peering, in a small and in a large batch.
+        with self.assertRaises(AssertionError): self.table.add([(1050, 50, PeerRelationship.Peer)])
+        with self.assertRaises(AssertionError): self.table.add([(asn, asn + 2000, PeerRelationship.Peer) for asn in range(1, 100)] + [(1001, 1, PeerRelationship.Peer)])
+
+        # duplicates in the batch.
+        with self.assertRaises(AssertionError): self.table.add([(3000, 3001, PeerRelationship.Peer), (3001, 3000, PeerRelationship.Peer)])
+        with self.assertRaises(AssertionError): PeeringTable(100).add([(150, 151, PeerRelationship.Peer), (151, 150, PeerRelationship.Peer)])
+
+        # nothing is added from a rejected batch.
+        self.assertEqual(len(self.table), 100)
+        self.assertFalse(self.table.has(3000, 3001))
+        self.assertFalse(self.table.has(1, 2001))
+
+    def testInvalid(self):
+        with self.assertRaises(AssertionError): self.table.add([(150, 150, PeerRelationship.Peer)])
+        with self.assertRaises(AssertionError): self.table.add([(0, 150, PeerRelationship.Peer)])
+        with self.assertRaises(AssertionError): self.table.add([(150, 151, 'Peer')])
+
+        self.assertEqual(len(self.table), 100)
+
+    def testSetRelationship(self):
+        self.assertIs(self.table.setRelationship(1, 1001, PeerRelationship.Provider), self.table)
+        self.assertEqual(self.table.get(1, 1001), (1, 1001, PeerRelationship.Provider))
+
+        with self.assertRaises(AssertionError): self.table.setRelationship(1001, 1, PeerRelationship.Peer)
+        with self.assertRaises(AssertionError): self.table.setRelationship(1, 2, PeerRelationship.Peer)
+
+    def testCopy(self):
+        copy = self.table.copy(101)
+        copy.add([(3000, 3001, PeerRelationship.Peer)])
+        copy.setRelationship(1, 1001, PeerRelationship.Provider)
+
+        self.assertEqual(copy.getIx(), 101)
+        self.assertEqual(len(copy), 101)
+        self.assertFalse(self.table.has(3000, 3001))
+        self.assertEqual(self.table.get(1, 1001)[2], PeerRelationship.Peer)
+
+class EbgpBulkPeeringTestCase(unittest.TestCase):
+    """!
+    @brief tests for adding private peerings in bulk.
+    """
+
+    def testBulk(self):
+        ebgp = Ebgp().addPrivatePeering(100, 150, 151)
+
+        self.assertIs(ebgp.addBulkPrivatePeerings(100, [(150, 152, PeerRelationship.Provider)]), ebgp)
+        ebgp.addBulkPrivatePeerings(101, [(151, 152, PeerRelationship.Peer)])
+
+        self.assertEqual(ebgp.getPrivatePeerings(False), { (100, 150, 151): PeerRelationship.Peer })
+        self.assertEqual(ebgp.getPrivatePeerings(), {
+            (100, 150, 151): PeerRelationship.Peer,
+            (100, 150, 152): PeerRelationship.Provider,
+            (101, 151, 152): PeerRelationship.Peer
+        })
+        self.assertEqual(sorted(ebgp.getPeeringTables().keys()), [100, 101])
+
+    def testConflicts(self):
+        ebgp = Ebgp().addPrivatePeering(100, 150, 151)
+        ebgp.addBulkPrivatePeerings(100, [(150, 152, PeerRelationship.Peer)])
+
+        with self.assertRaises(AssertionError): ebgp.addBulkPrivatePeerings(100, [(151, 150, PeerRelationship.Peer)])
+        with self.assertRaises(AssertionError): ebgp.addPrivatePeering(100, 152, 150)
+
+        # the same ASes can peer in another IX.
+        ebgp.addPrivatePeering(101, 152, 150)
+
+    def testTable(self):
+        table = PeeringTable(1).add([(150, 151, PeerRelationship.Peer)])
+        ebgp = Ebgp().addBulkPrivatePeerings(100, table)
+
+        # the table is copied.
+        table.add([(150, 152, PeerRelationship.Peer)])
+
+        self.assertEqual(ebgp.getPeeringTables()[100].getIx(), 100)
+        self.assertEqual(list(ebgp.getPeeringTables()[100]), [(150, 151, PeerRelationship.Peer)])
+
+    def testFile(self):
+        with TemporaryDirectory() as tmp:
+            path = join(tmp, 'as-rel.txt')
+            with open(path, 'w') as f: f.write('# source: test\n150|151|-1\n\n151|152|0|bgp\n')
+
+            ebgp = Ebgp().addPrivatePeeringsFromFile(100, path)
+            self.assertEqual(list(ebgp.getPeeringTables()[100]), [(150, 151, PeerRelationship.Provider), (151, 152, PeerRelationship.Peer)])
+
+            with open(path, 'w') as f: f.write('150|151|2\n')
+            with self.assertRaises(AssertionError): Ebgp().addPrivatePeeringsFromFile(100, path)
+
+    def testMatrix(self):
+        ebgp = Ebgp().addPrivatePeeringMatrix(100, [150, 151, 152], [
+            [0, 2, 0],
+            [0, 0, 1],
+            [3, 0, 0]
+        ])
+
+        self.assertEqual(list(ebgp.getPeeringTables()[100]), [
+            (150, 151, PeerRelationship.Provider),
+            (151, 152, PeerRelationship.Peer),
+            (152, 150, PeerRelationship.Unfiltered)
+        ])
+
+        with self.assertRaises(AssertionError): Ebgp().addPrivatePeeringMatrix(100, [150, 151], [[0, 1], [1, 0]])
+        with self.assertRaises(AssertionError): Ebgp().addPrivatePeeringMatrix(100, [150, 151], [[0, 4], [0, 0]])
+        with self.assertRaises(AssertionError): Ebgp().addPrivatePeeringMatrix(100, [150, 151], [[0, 1]])
+        with self.assertRaises(AssertionError): Ebgp().addPrivatePeeringMatrix(100, [150, 151], [[0, 1, 0], [0, 0]])
+
+    def testRender(self):
+        ebgp = Ebgp().addBulkPrivatePeerings(101, [(150, 152, PeerRelationship.Provider)])
+        emu = makeEmulator(ebgp)
+
+        self.assertEqual(getNeighbors(emu, '150', 'rnode', 'r2'), { ('10.101.0.152', 152) })
+
+class EbgpMergerTestCase(unittest.TestCase):
+    """!
+    @brief tests for merging ebgp layers with peerings added in bulk.
+    """
+
+    def merge(self, a: Ebgp, b: Ebgp) -> Ebgp:
+        return DefaultEbgpMerger(lambda ix, a, b, relA, relB: relB).doMerge(a, b)
+
+    def testTables(self):
+        a = Ebgp().addBulkPrivatePeerings(100, [(150, 151, PeerRelationship.Peer)])
+        b = Ebgp().addBulkPrivatePeerings(100, [(150, 151, PeerRelationship.Provider), (150, 152, PeerRelationship.Peer)])
+        b.addBulkPrivatePeerings(101, [(151, 152, PeerRelationship.Peer)])
+
+        merged = self.merge(a, b)
+
+        self.assertEqual(list(merged.getPeeringTables()[100]), [(150, 151, PeerRelationship.Provider), (150, 152, PeerRelationship.Peer)])
+        self.assertEqual(list(merged.getPeeringTables()[101]), [(151, 152, PeerRelationship.Peer)])
+        self.assertEqual(merged.getPrivatePeerings(False), {})
+
+        # the merged layer does not share tables with the layers merged.
+        self.assertEqual(list(a.getPeeringTables()[100]), [(150, 151, PeerRelationship.Peer)])
+
+    def testTableAndPrivate(self):
+        a = Ebgp().addPrivatePeering(100, 150, 151)
+        a.addBulkPrivatePeerings(101, [(150, 152, PeerRelationship.Peer)])
+
+        b = Ebgp().addBulkPrivatePeerings(100, [(150, 151, PeerRelationship.Unfiltered), (151, 152, PeerRelationship.Peer)])
+        b.addPrivatePeering(101, 150, 152, PeerRelationship.Provider)
+
+        merged = self.merge(a, b)
+
+        self.assertEqual(merged.getPrivatePeerings(False), { (100, 150, 151): PeerRelationship.Unfiltered })
+        self.assertEqual(merged.getPrivatePeerings(), {
+            (100, 150, 151): PeerRelationship.Unfiltered,
+            (100, 151, 152): PeerRelationship.Peer,
+            (101, 150, 152): PeerRelationship.Provider
+        })
+
+    def testDefaultHandler(self):
+        a = Ebgp().addBulkPrivatePeerings(100, [(150, 151, PeerRelationship.Peer)])
+        b = Ebgp().addBulkPrivatePeerings(100, [(150, 151, PeerRelationship.Provider)])
+
+        merged = DefaultEbgpMerger().doMerge(a, b)
+
+        self.assertEqual(list(merged.getPeeringTables()[100]), [(150, 151, PeerRelationship.Peer)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import re
+import unittest
+from typing import Dict
+
+from seedemu.core import Emulator
+from seedemu.layers import Base, Routing, Ibgp, Ospf
+
+def makeEmulator(ibgp: Ibgp) -> Emulator:
+    """!
+    @brief build and render an AS with a chain of routers, r1 and r2 in the
+    middle and r3, r4 at the ends, and a router r5 on a network of its own.
+
+    @param ibgp ibgp layer.
+
+    @returns emulator.
+    """
+    emu = Emulator()
+    base = Base()
+
+    asobj = base.createAutonomousSystem(150)
+    for i in range(4): asobj.createNetwork('net{}'.format(i))
+
+    asobj.createRouter('r1').joinNetwork('net0').joinNetwork('net1')
+    asobj.createRouter('r2').joinNetwork('net1').joinNetwork('net2')
+    asobj.createRouter('r3').joinNetwork('net0')
+    asobj.createRouter('r4').joinNetwork('net2')
+    asobj.createRouter('r5').joinNetwork('net3')
+
+    emu.addLayer(base)
+    emu.addLayer(Routing())
+    emu.addLayer(Ospf())
+    emu.addLayer(ibgp)
+
+    return emu.render()
+
+def getPeers(emu: Emulator, name: str) -> Dict[str, bool]:
+    """!
+    @brief get ibgp peers of a router.
+
+    @param emu rendered emulator.
+    @param name router name.
+
+    @returns dict of peer name to whether the peer is a route reflector client.
+    """
+    routers = emu.getRegistry().getByType('150', 'rnode')
+    names = { str(router.getLoopbackAddress()): router.getName() for router in routers }
+
+    (_, conf) = emu.getRegistry().get('150', 'rnode', name).getFile('/etc/bird/bird.conf').get()
+    peers = {}
+
+    for body in re.findall(r'protocol bgp ibgp\d+ \{(.*?)\n\}', conf, re.S):
+        peer = re.search(r'neighbor (\S+) as 150;', body).group(1)
+        peers[names[peer]] = 'rr client;' in body
+
+    return peers
+
+class IbgpTestCase(unittest.TestCase):
+    """!
+    @brief tests for full mesh and route reflection in the ibgp layer.
+    """
+
+    def testFullMesh(self):
+        emu = makeEmulator(Ibgp())
+
+        self.assertEqual(getPeers(emu, 'r3'), { 'r1': False, 'r2': False, 'r4': False })
+        self.assertEqual(getPeers(emu, 'r5'), {})
+
+    def testReflectorSelection(self):
+        ibgp = Ibgp()
+        self.assertIs(ibgp.enableRouteReflection(150), ibgp)
+
+        emu = makeEmulator(ibgp)
+
+        # r1 and r2 have the most neighbors, ties are broken by name.
+        self.assertEqual(getPeers(emu, 'r1'), { 'r2': True, 'r3': True, 'r4': True })
+        self.assertEqual(getPeers(emu, 'r2'), { 'r1': False })
+        self.assertEqual(getPeers(emu, 'r4'), { 'r1': False })
+        self.assertEqual(getPeers(emu, 'r5'), {})
+
+    def testMultipleReflectors(self):
+        emu = makeEmulator(Ibgp().enableRouteReflection(reflectors = 2))
+
+        self.assertEqual(getPeers(emu, 'r1'), { 'r2': False, 'r3': True, 'r4': True })
+        self.assertEqual(getPeers(emu, 'r2'), { 'r1': False, 'r3': True, 'r4': True })
+        self.assertEqual(getPeers(emu, 'r3'), { 'r1': False, 'r2': False })
+
+    def testSetReflector(self):
+        ibgp = Ibgp()
+        self.assertIs(ibgp.setRouteReflector(150, 'r4'), ibgp)
+
+        emu = makeEmulator(ibgp)
+
+        self.assertEqual(getPeers(emu, 'r4'), { 'r1': True, 'r2': True, 'r3': True })
+        self.assertEqual(getPeers(emu, 'r1'), { 'r4': False })
+
+    def testSettings(self):
+        ibgp = Ibgp().enableRouteReflection(reflectors = 2).enableRouteReflection(150, 0)
+        ibgp.setRouteReflector(151, 'r1')
+
+        self.assertEqual(ibgp.getRouteReflectorCounts(), { None: 2, 150: 0 })
+        self.assertEqual(ibgp.getRouteReflectors(), { 151: { 'r1' } })
+
+        # an AS set back to full mesh.
+        emu = makeEmulator(ibgp)
+        self.assertEqual(getPeers(emu, 'r3'), { 'r1': False, 'r2': False, 'r4': False })
+
+        with self.assertRaises(AssertionError): Ibgp().enableRouteReflection(reflectors = -1)
+
+    def testUnknownReflector(self):
+        with self.assertRaises(AssertionError): makeEmulator(Ibgp().setRouteReflector(150, 'r9'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+from seedemu import *
+from seedemu.core.enums import LogLevel
+from math import ceil
+from time import perf_counter
+
+import argparse
+import resource
+import sys
+
+def createEmulation(asCount: int, asEachIx: int, routerEachAs: int, hostEachNet: int) -> Emulator:
+    ixCount = ceil(asCount / asEachIx)
+
+    assert hostEachNet <= 29, 'too many hosts.'
+    assert routerEachAs <= 16, 'too many routers.'
+
+    emu = Emulator()
+    base = Base()
+    ebgp = Ebgp()
+    planner = AddressPlanner()
+
+    base.setAddressPlanner(planner)
+
+    # peering LANs large enough for all members.
+    ixPrefixLength = min(24, 32 - (asEachIx + 2).bit_length())
+
+    ixes = []
+    for ix in range(1000, ixCount + 1000):
+        planner.allocateIxPrefix(ix, ixPrefixLength)
+        ixes.append(base.createInternetExchange(ix).getPeeringLan().getName())
+
+    for i in range(0, asCount):
+        asn = 5000 + i
+        asObject = base.createAutonomousSystem(asn)
+
+        routers = []
+        for j in range(0, routerEachAs):
+            netname = 'net{}'.format(j)
+            asObject.createNetwork(netname)
+
+            router = asObject.createRouter('router{}'.format(j)).joinNetwork(netname)
+            routers.append(router)
+
+            for k in range(0, hostEachNet):
+                asObject.createHost('host{}_{}'.format(j, k)).joinNetwork(netname)
+
+        for j in range(1, len(routers)):
+            linkname = 'link_{}_{}'.format(j - 1, j)
+            asObject.createNetwork(linkname, str(planner.allocateLinkPrefix()))
+            routers[j - 1].joinNetwork(linkname)
+            routers[j].joinNetwork(linkname)
+
+        routers[0].joinNetwork(ixes[i // asEachIx])
+        ebgp.addRsPeer(i // asEachIx + 1000, asn)
+
+    emu.addLayer(base)
+    emu.addLayer(Routing())
+    emu.addLayer(ebgp)
+    emu.addLayer(Ibgp())
+    emu.addLayer(Ospf())
+
+    return emu
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Measure time and peak memory of building and rendering a large emulation.')
+    parser.add_argument('--ases', help = 'Number of ASes to generate.', type = int, default = 500)
+    parser.add_argument('--ixs', help = 'Number of ASes in each IX.', type = int, default = 50)
+    parser.add_argument('--routers', help = 'Number of routers in each AS.', type = int, default = 4)
+    parser.add_argument('--hosts', help = 'Number of hosts in each network.', type = int, default = 10)
+
+    args = parser.parse_args()
+    setLogLevel(LogLevel.Warning)
+
+    start = perf_counter()
+    emu = createEmulation(args.ases, args.ixs, args.routers, args.hosts)
+    built = perf_counter()
+    emu.render()
+    rendered = perf_counter()
+
+    nodes = 0
+    interfaces = 0
+    for (_, node) in emu.getRegistry().iterNodes():
+        nodes += 1
+        interfaces += len(node.getInterfaces())
+
+    # ru_maxrss is in KiB on linux, and in bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin': rss //= 1024
+
+    print('nodes: {}, interfaces: {}'.format(nodes, interfaces))
+    print('build: {:.2f} s, render: {:.2f} s'.format(built - start, rendered - built))
+    print('peak rss: {:.1f} MiB'.format(rss / 1024))
+
+if __name__ == '__main__':
+    main()